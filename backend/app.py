@@ -1,4 +1,4 @@
-from flask import Flask, jsonify
+from flask import Flask
 from flask_cors import CORS
 from routes.startup import startup_bp
 from routes.research import research_bp
@@ -6,6 +6,17 @@ from routes.IPR import ipr_bp
 from routes.user import user_bp
 from routes.export import export_bp
 from routes.innovation import innovation_bp
+from routes.analytics import analytics_bp
+from routes.health import health_bp
+from routes.admin import admin_bp
+from routes.storage import storage_bp
+from utils.metrics import init_metrics
+from utils.compression import init_compression
+from utils.querycheck import init_query_checker
+from utils.replicas import init_replica_routing
+from utils.pooling import init_disconnect_handler
+from database import engine, reset_request_sessions, close_request_sessions
+from config import STORAGE_BACKEND
 
 def create_app():
     app = Flask(__name__)
@@ -13,9 +24,18 @@ def create_app():
          supports_credentials=True,
          origins=["http://localhost:5173","https://riise-project.vercel.app", "*"])
 
-    @app.route("/health", methods=["GET"]) 
-    def health_check():
-        return jsonify({"status": "healthy"})
+    # gzip/brotli for large JSON and PDF responses (runs after the hooks below)
+    init_compression(app)
+    # Request latency, SQL and outbound timings (/metrics + Server-Timing header)
+    init_metrics(app)
+    # N+1 / slow query / query budget warnings when QUERY_DEBUG is set
+    init_query_checker(app, engine)
+    # Read-your-writes cookie for read replica routing
+    init_replica_routing(app)
+    # Dropped database connections become a 503 with Retry-After
+    init_disconnect_handler(app, reset_request_sessions)
+    # Give every request's database connections back to the pool
+    app.teardown_appcontext(close_request_sessions)
 
     # Register all blueprints
     app.register_blueprint(startup_bp)
@@ -24,6 +44,12 @@ def create_app():
     app.register_blueprint(innovation_bp)
     app.register_blueprint(export_bp)
     app.register_blueprint(ipr_bp)
+    app.register_blueprint(analytics_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(admin_bp)
+    # Signed uploads and file serving of the local storage stand-in
+    if STORAGE_BACKEND == "local":
+        app.register_blueprint(storage_bp)
 
     return app
 
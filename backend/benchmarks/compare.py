@@ -0,0 +1,42 @@
+# benchmarks/compare.py
+# Compare two benchmark result files and flag latency regressions.
+# Usage (from backend/): python -m benchmarks.compare OLD.json NEW.json [--threshold 10]
+import argparse
+import json
+import sys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--metric", default="p95_ms", choices=["mean_ms", "p50_ms", "p95_ms", "p99_ms"])
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent slowdown counted as regression")
+    args = parser.parse_args(argv)
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']} ({args.metric})")
+    regressions = []
+    for name, result in new["scenarios"].items():
+        before = old["scenarios"].get(name)
+        if not before:
+            print(f"{name:32} {'new':>10} {result[args.metric]:>10}")
+            continue
+        change = (result[args.metric] - before[args.metric]) / before[args.metric] * 100 if before[args.metric] else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  <-- regression"
+            regressions.append(name)
+        print(f"{name:32} {before[args.metric]:>10} {result[args.metric]:>10} {change:>+8.1f}%{flag}")
+
+    if regressions:
+        print(f"{len(regressions)} scenario(s) slower than {args.threshold}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/compression.py
+# Bytes on the wire and latency of the large responses (admin listings with
+# abstracts/descriptions and the PDF exports) per Content-Encoding. End-to-end
+# latency is estimated for a few network profiles from the measured server time,
+# the round-trip time and the transfer time of the encoded body.
+#
+# Usage (from backend/):
+#   python -m benchmarks.compression
+#   python -m benchmarks.compression --users 200 --papers 40 --requests 20
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.run import prepare_environment, percentile, git_commit, RESULTS_DIR  # noqa: E402
+
+SCENARIOS = [
+    ("research.list.admin", "/api/v1/research/", "admin"),
+    ("ipr.list.admin", "/api/v1/ipr/", "admin"),
+    ("innovations.list.admin", "/api/v1/innovations/", "admin"),
+    ("startups.list.admin", "/api/v1/startups/", "admin"),
+    ("export.user", "/api/v1/export/user", "user"),
+    ("export.admin_all", "/api/v1/export/admin/all", "admin"),
+]
+
+# name -> (bandwidth in Mbit/s, round-trip time in seconds)
+NETWORKS = {
+    "mobile_3g": (1.6, 0.150),
+    "dsl": (8.0, 0.050),
+    "broadband": (50.0, 0.020),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Response size and latency per Content-Encoding")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--papers", type=int, default=20, help="research papers per user")
+    parser.add_argument("--requests", type=int, default=10, help="requests per scenario and encoding")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<commit>-compression-<time>.json)")
+    args = parser.parse_args(argv)
+
+    prepare_environment(os.path.join(tempfile.mkdtemp(prefix="riise-compression-"), "bench.db"))
+    from database import SessionLocal
+    import create_table  # noqa: F401 - registers and creates every table
+    from app import app
+    from benchmarks import fakes
+    from benchmarks.seed import seed, ADMIN_EMAIL
+    from utils.compression import ENCODINGS
+
+    db = SessionLocal()
+    try:
+        emails = seed(db, args.users, args.papers)
+    finally:
+        db.close()
+    tokens = fakes.register_users([emails[0], ADMIN_EMAIL])
+    fakes.install()
+
+    results = {}
+    client = app.test_client()
+    for name, path, role in SCENARIOS:
+        email = ADMIN_EMAIL if role == "admin" else emails[0]
+        client.set_cookie("access_token", tokens[email])
+        for encoding in ["identity"] + ENCODINGS:
+            latencies = []
+            size = None
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                response = client.get(path, headers={"Accept-Encoding": encoding})
+                latencies.append(time.perf_counter() - start)
+                size = len(response.get_data())
+                assert response.status_code == 200, (name, response.status_code)
+            latencies.sort()
+            server = statistics.median(latencies)
+            r = results[f"{name}.{encoding}"] = {
+                "requests": args.requests,
+                "bytes": size,
+                "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+                "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+                "end_to_end_ms": {
+                    network: round((server + rtt + size * 8 / (mbit * 1_000_000)) * 1000, 1)
+                    for network, (mbit, rtt) in NETWORKS.items()
+                },
+            }
+            print(f"{name + '.' + encoding:32} {r['bytes']:>10} B  server p50 {r['p50_ms']:>9} ms  "
+                  + "  ".join(f"{n} {ms:>8} ms" for n, ms in r["end_to_end_ms"].items()))
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "benchmark": "compression",
+            "networks": NETWORKS,
+            "params": vars(args),
+        },
+        "scenarios": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}-compression-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
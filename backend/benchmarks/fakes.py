@@ -0,0 +1,109 @@
+# benchmarks/fakes.py
+# Offline setup for benchmarks: accounts in the local auth backend (AUTH_BACKEND=local,
+# see utils/local_auth.py) with optional simulated latency, and a SerpAPI stand-in.
+import itertools
+import sys
+import time
+from types import SimpleNamespace
+
+# Password of every seeded account
+PASSWORD = "benchmark"
+
+
+class SlowAuth:
+    """Wraps the auth client so every call first waits `latency` seconds, like a round trip to Supabase"""
+
+    def __init__(self, auth, latency):
+        self._auth = auth
+        self._latency = latency
+
+    def __getattr__(self, name):
+        attr = getattr(self._auth, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            time.sleep(self._latency)
+            return attr(*args, **kwargs)
+        return call
+
+
+def register_users(emails, password=PASSWORD):
+    """Create auth accounts for seeded users and sign them in; {email: access token}"""
+    import database
+    from utils.local_auth import LocalAuthError
+    tokens = {}
+    for email in emails:
+        try:
+            database.supabase.auth.admin.create_user({"email": email, "password": password, "email_confirm": True})
+        except LocalAuthError:
+            pass  # Registered by an earlier run on the same --db
+        session = database.supabase.auth.sign_in_with_password({"email": email, "password": password}).session
+        tokens[email] = session.access_token
+    return tokens
+
+
+class FakeSerpAPIResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+_result_ids = itertools.count()
+
+
+def fake_serpapi_get(latency=0.0, articles=10):
+    """Build an http.get replacement answering both SerpAPI engines used by the app"""
+
+    def get(url, params=None, **kwargs):
+        if latency:
+            time.sleep(latency)
+        params = params or {}
+        papers = [{
+            "title": f"Benchmark paper {i}",
+            "authors": [{"name": "Ada Lovelace"}, {"name": "Charles Babbage"}],
+            "year": str(2000 + i),
+            "link": f"https://doi.org/10.0/bench.{i}",
+            "cited_by": {"value": i * 3},
+            "result_id": f"bench{next(_result_ids)}",
+            "snippet": "A benchmark abstract.",
+        } for i in range(articles)]
+        if params.get("engine") == "google_scholar_author":
+            payload = {
+                "search_metadata": {"status": "Success"},
+                "author": {
+                    "name": "Ada Lovelace",
+                    "affiliations": "Analytical Engine Lab",
+                    "cited_by": {"table": [{"h_index": 7, "i10_index": 5, "citations": {"all": 135}}]},
+                },
+                "articles": papers,
+            }
+        else:
+            payload = {
+                "search_metadata": {"status": "Success"},
+                "organic_results": [dict(p, author_info={"author_id": "BENCH000001"}) for p in papers],
+            }
+        return FakeSerpAPIResponse(payload)
+
+    return get
+
+
+def install(supabase_latency=0.0, serpapi_latency=0.0):
+    """Delay the local auth backend's calls and swap the SerpAPI HTTP calls of every loaded app module"""
+    import database
+    from utils.local_auth import LocalClient
+    if not isinstance(database.supabase, LocalClient):
+        raise RuntimeError("Benchmarks need AUTH_BACKEND=local (see benchmarks.run.prepare_environment)")
+    if supabase_latency:
+        database.supabase.auth = SlowAuth(database.supabase.auth, supabase_latency)
+
+    serp_get = fake_serpapi_get(serpapi_latency)
+    for name in ("routes.research", "routes.user"):
+        module = sys.modules.get(name)
+        if module is not None:
+            module.http = SimpleNamespace(get=serp_get)
+            module.SERPAPI_KEY = "benchmark"
@@ -0,0 +1,149 @@
+# benchmarks/pool_checkout.py
+# Connection checkout latency for each pool profile in utils/pooling.py.
+#
+# Against SQLite the network is simulated: every new connection costs
+# --connect-latency (TCP + TLS + auth) and every statement, including the
+# pre-ping, costs --rtt. Pass --url to measure a real Postgres server or pooler.
+#
+# Usage (from backend/):
+#   python -m benchmarks.pool_checkout
+#   python -m benchmarks.pool_checkout --concurrency 16 --checkouts 2000 --rtt 0.002
+#   python -m benchmarks.pool_checkout --url postgresql+psycopg2://user:pw@host:6543/postgres
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import create_engine, text  # noqa: E402
+from benchmarks.run import percentile, git_commit, RESULTS_DIR  # noqa: E402
+from utils.pooling import POOL_PROFILES, engine_options  # noqa: E402
+
+
+class SlowCursor:
+    def __init__(self, cursor, rtt):
+        self._cursor = cursor
+        self._rtt = rtt
+
+    def execute(self, *args):
+        time.sleep(self._rtt)
+        return self._cursor.execute(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SlowConnection:
+    """sqlite3 connection that behaves like one across a network"""
+
+    def __init__(self, path, connect_latency, rtt):
+        time.sleep(connect_latency)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._rtt = rtt
+
+    def cursor(self, *args):
+        return SlowCursor(self._connection.cursor(*args), self._rtt)
+
+    def rollback(self):
+        time.sleep(self._rtt)
+        self._connection.rollback()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def build_engine(profile, url, connect_latency, rtt):
+    options = engine_options(url or "sqlite://", profile)
+    if url:
+        return create_engine(url, **options)
+    path = os.path.join(tempfile.mkdtemp(prefix="riise-pool-"), "pool.db")
+    return create_engine("sqlite://", creator=lambda: SlowConnection(path, connect_latency, rtt), **options)
+
+
+def run_profile(engine, checkouts, concurrency):
+    lock = threading.Lock()
+    checkout_times = []
+    request_times = []
+
+    def one(_):
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            checked_out = time.perf_counter()
+            conn.execute(text("SELECT 1"))
+        done = time.perf_counter()
+        with lock:
+            checkout_times.append(checked_out - start)
+            request_times.append(done - start)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(checkouts)))
+    wall = time.perf_counter() - started
+
+    checkout_times.sort()
+    request_times.sort()
+    return {
+        "pool": type(engine.pool).__name__,
+        "requests": checkouts,
+        "concurrency": concurrency,
+        "errors": 0,
+        "throughput_rps": round(checkouts / wall, 2) if wall else None,
+        # Time until a usable connection was handed out (connect/pre-ping/queue wait)
+        "mean_ms": round(sum(checkout_times) / len(checkout_times) * 1000, 3),
+        "p50_ms": round(percentile(checkout_times, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(checkout_times, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(checkout_times, 0.99) * 1000, 3),
+        # Checkout plus one statement
+        "query_p50_ms": round(percentile(request_times, 0.50) * 1000, 3),
+        "query_p95_ms": round(percentile(request_times, 0.95) * 1000, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Connection pool checkout latency per profile")
+    parser.add_argument("--profiles", default=",".join(POOL_PROFILES), help="comma-separated profile names")
+    parser.add_argument("--url", help="database URL to measure (default: simulated SQLite)")
+    parser.add_argument("--checkouts", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--connect-latency", type=float, default=0.02, help="simulated connect cost (s)")
+    parser.add_argument("--rtt", type=float, default=0.001, help="simulated statement round-trip (s)")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<commit>-pool-<time>.json)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "benchmark": "pool_checkout",
+            "url": "simulated sqlite" if not args.url else args.url.split("@")[-1],
+            "connect_latency": args.connect_latency,
+            "rtt": args.rtt,
+        },
+        "scenarios": {},
+    }
+
+    for profile in args.profiles.split(","):
+        engine = build_engine(profile, args.url, args.connect_latency, args.rtt)
+        try:
+            result = run_profile(engine, args.checkouts, args.concurrency)
+        finally:
+            engine.dispose()
+        report["scenarios"][f"pool.{profile}"] = result
+        print(f"{profile:8} {result['pool']:15} checkout p50 {result['p50_ms']:8.3f} ms  "
+              f"p95 {result['p95_ms']:8.3f} ms  query p95 {result['query_p95_ms']:8.3f} ms  "
+              f"{result['throughput_rps']:9.1f} rps")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['meta']['commit']}-pool-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
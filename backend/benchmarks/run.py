@@ -0,0 +1,304 @@
+# benchmarks/run.py
+# Seeds a throwaway SQLite database, runs the app on the local auth and storage
+# backends with a SerpAPI stand-in and drives every blueprint route with
+# concurrent clients.
+#
+# Usage (from backend/):
+#   python -m benchmarks.run                                  # defaults
+#   python -m benchmarks.run --users 200 --papers 50 --concurrency 16 --requests 500
+#   python -m benchmarks.run --only research --output /tmp/research.json
+#   python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def prepare_environment(db_path):
+    """Point the app at a local database before any app module is imported"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "bench.bench.bench")
+    # Auth and files stay on this machine; the account store sits next to the
+    # database so server workers started for the same file share it
+    os.environ["AUTH_BACKEND"] = "local"
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["LOCAL_AUTH_DB"] = f"{os.path.splitext(db_path)[0]}-auth.db"
+    os.environ["STORAGE_LOCAL_DIR"] = os.path.join(os.path.dirname(os.path.abspath(db_path)), "storage")
+    os.environ.setdefault("LOCAL_AUTH_SECRET", "benchmark-secret-not-for-production")
+    os.environ.setdefault("STORAGE_SIGNING_SECRET", "benchmark-storage-secret-not-for-production")
+    # Password hashing is Supabase's cost; --supabase-latency stands in for it
+    os.environ.setdefault("LOCAL_AUTH_HASH_ITERATIONS", "1000")
+    # Scenarios send many requests per user; measure the routes, not the limiter
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    # Measure with the response and token caches on, also for the multi-worker serving runs
+    os.environ.setdefault("RESPONSE_CACHE_ENABLED", "true")
+    os.environ.setdefault("AUTH_TOKEN_CACHE_ENABLED", "true")
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def build_scenarios(ids, emails):
+    """
+    (name, method, path(i), role, json(i), request weight) for every route.
+    `ids` holds the seeded id ranges; deletes consume ids from the end of each range.
+    """
+    counter = itertools.count()
+
+    def cycle(values):
+        values = list(values)
+        return lambda i: values[i % len(values)]
+
+    paper = cycle(ids["research"])
+    ipr = cycle(ids["ipr"])
+    innovation = cycle(ids["innovation"])
+    startup = cycle(ids["startup"])
+    email = cycle(emails)
+    deletable = {entity: iter(reversed(values)) for entity, values in ids.items()}
+
+    def next_deletable(entity):
+        return lambda i: next(deletable[entity])
+
+    return [
+        # System
+        ("health", "GET", lambda i: "/health", None, None, 1),
+        ("metrics", "GET", lambda i: "/metrics", None, None, 0.2),
+        # Users
+        ("users.login", "POST", lambda i: "/api/v1/users/login", None,
+         lambda i: {"email": email(i), "password": "benchmark"}, 1),
+        ("users.signup", "POST", lambda i: "/api/v1/users/signup", None,
+         lambda i: {"email": f"new{next(counter)}@bench.local", "password": "benchmark", "name": "New"}, 0.5),
+        ("users.signup.existing", "POST", lambda i: "/api/v1/users/signup", None,
+         lambda i: {"email": email(i), "password": "benchmark", "name": "Taken"}, 0.5),
+        ("users.login.with_session", "POST", lambda i: "/api/v1/users/login", "user",
+         lambda i: {"email": email(i), "password": "benchmark"}, 0.5),
+        ("users.profile", "GET", lambda i: "/api/v1/users/profile", "user", None, 1),
+        ("users.dashboard", "GET", lambda i: "/api/v1/users/dashboard", "user", None, 1),
+        ("users.id_card_upload_url", "POST", lambda i: "/api/v1/users/id-card/upload-url", "user",
+         lambda i: {"filename": "card.png"}, 0.3),
+        ("users.contributions", "GET", lambda i: "/api/v1/users/contributions", "user", None, 0.5),
+        ("users.update_profile_field", "PATCH", lambda i: "/api/v1/users/update_profile_field", "user",
+         lambda i: {"name": f"Bench User {i}"}, 0.5),
+        ("users.update_profile", "PUT", lambda i: "/api/v1/users/update_profile", "user",
+         lambda i: {"scholar_id": "BENCH000001"}, 0.3),
+        # Research
+        ("research.list.user", "GET", lambda i: "/api/v1/research/", "user", None, 1),
+        ("research.list.admin", "GET", lambda i: "/api/v1/research/", "admin", None, 0.3),
+        ("research.add", "POST", lambda i: "/api/v1/research/add-paper", "user",
+         lambda i: {"title": f"Benchmark insert {i}", "authors": "Ada Lovelace, Alan Turing",
+                    "allow_duplicate": True}, 0.5),
+        ("research.update", "PUT", lambda i: f"/api/v1/research/update-paper/{paper(i)}", "admin",
+         lambda i: {"status": "Published"}, 0.5),
+        ("research.by_author", "GET", lambda i: "/api/v1/research/by-author?name=Asha%20Sharma", "admin", None, 1),
+        ("research.coauthors", "GET", lambda i: "/api/v1/research/coauthors?name=Asha%20Sharma", "admin", None, 1),
+        ("research.fetch_by_name", "GET", lambda i: "/api/v1/research/fetch-by-name?name=Ada%20Lovelace",
+         "user", None, 0.5),
+        ("research.fetch_by_id", "GET", lambda i: "/api/v1/research/fetch-by-id/BENCH000001", "user", None, 0.5),
+        ("research.fetch_by_id.distinct", "GET", lambda i: f"/api/v1/research/fetch-by-id/BENCH{i:06d}", "user",
+         None, 0.5),
+        # IPR
+        ("ipr.list.user", "GET", lambda i: "/api/v1/ipr/", "user", None, 1),
+        ("ipr.list.admin", "GET", lambda i: "/api/v1/ipr/", "admin", None, 0.3),
+        ("ipr.add", "POST", lambda i: "/api/v1/ipr/add-ipr", "user",
+         lambda i: {"title": f"Benchmark IPR {i}", "ipr_type": "Patent"}, 0.5),
+        ("ipr.update", "PUT", lambda i: f"/api/v1/ipr/update-ipr/{ipr(i)}", "admin",
+         lambda i: {"status": "Granted"}, 0.5),
+        # Innovations
+        ("innovations.list.user", "GET", lambda i: "/api/v1/innovations/", "user", None, 1),
+        ("innovations.list.admin", "GET", lambda i: "/api/v1/innovations/", "admin", None, 0.3),
+        ("innovations.add", "POST", lambda i: "/api/v1/innovations/add-innovation", "user",
+         lambda i: {"title": f"Benchmark innovation {i}", "domain": "energy"}, 0.5),
+        ("innovations.update", "PUT", lambda i: f"/api/v1/innovations/update-innovation/{innovation(i)}",
+         "admin", lambda i: {"status": "approved"}, 0.5),
+        # Startups
+        ("startups.list.user", "GET", lambda i: "/api/v1/startups/", "user", None, 1),
+        ("startups.list.admin", "GET", lambda i: "/api/v1/startups/", "admin", None, 0.3),
+        ("startups.with_iprs", "GET", lambda i: "/api/v1/startups/with-iprs", "admin", None, 0.5),
+        ("startups.get", "GET", lambda i: f"/api/v1/startups/{startup(i)}", "admin", None, 0.5),
+        ("startups.add", "POST", lambda i: "/api/v1/startups/add-startup", "user",
+         lambda i: {"name": f"Benchmark startup {i}", "industry": "EdTech"}, 0.5),
+        ("startups.update", "PUT", lambda i: f"/api/v1/startups/update-startup/{startup(i)}", "admin",
+         lambda i: {"status": "Active"}, 0.5),
+        # Analytics
+        ("analytics.summary", "GET", lambda i: "/api/v1/analytics/summary", "admin", None, 1),
+        ("analytics.group", "GET", lambda i: "/api/v1/analytics/ipr/by/ipr_type", "admin", None, 1),
+        ("analytics.top_cited", "GET", lambda i: "/api/v1/analytics/research/top-cited", "admin", None, 1),
+        ("analytics.citations", "GET", lambda i: "/api/v1/analytics/research/citation-distribution",
+         "admin", None, 1),
+        # Exports (PDF rendering is slow; fewer requests)
+        ("export.user", "GET", lambda i: "/api/v1/export/user", "user", None, 0.1),
+        ("export.admin_user", "GET", lambda i: f"/api/v1/export/admin/user/{email(i)}", "admin", None, 0.1),
+        ("export.admin_all", "GET", lambda i: "/api/v1/export/admin/all", "admin", None, 0.02),
+        # Deletes last, so the other scenarios still see the full dataset
+        ("research.delete", "DELETE", lambda i: f"/api/v1/research/delete-paper/{next_deletable('research')(i)}",
+         "admin", None, 0.2),
+        ("ipr.delete", "DELETE", lambda i: f"/api/v1/ipr/delete-ipr/{next_deletable('ipr')(i)}", "admin", None, 0.2),
+        ("innovations.delete", "DELETE",
+         lambda i: f"/api/v1/innovations/delete-innovation/{next_deletable('innovation')(i)}", "admin", None, 0.2),
+        ("startups.delete", "DELETE",
+         lambda i: f"/api/v1/startups/delete-startup/{next_deletable('startup')(i)}", "admin", None, 0.2),
+    ]
+
+
+def external_calls():
+    """Outbound calls made so far, per service"""
+    from utils.metrics import registry
+    return {dict(labels)["service"]: h.count for (name, labels), h in list(registry.histograms.items())
+            if name == "riise_external_request_seconds"}
+
+
+def run_scenario(app, scenario, requests, concurrency, emails, admin_email, tokens):
+    name, method, path, role, payload, _ = scenario
+    local = threading.local()
+    lock = threading.Lock()  # paths may consume shared iterators
+    latencies = []
+    statuses = {}
+
+    def one(i):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        if role == "admin":
+            client.set_cookie("access_token", tokens[admin_email])
+        elif role == "user":
+            client.set_cookie("access_token", tokens[emails[i % len(emails)]])
+        else:
+            client.delete_cookie("access_token")
+
+        with lock:
+            url = path(i)
+            body = payload(i) if payload else None
+        start = time.perf_counter()
+        response = client.open(url, method=method, json=body)
+        elapsed = time.perf_counter() - start
+        response.close()
+        with lock:
+            latencies.append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    calls_before = external_calls()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    upstream = {service: count - calls_before.get(service, 0) for service, count in external_calls().items()}
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if status >= 500)
+    return {
+        "method": method,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "status_counts": {str(k): v for k, v in sorted(statuses.items())},
+        "throughput_rps": round(requests / wall, 2) if wall else None,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "upstream_calls": {service: count for service, count in upstream.items() if count},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RIISE endpoint benchmarks")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--papers", type=int, default=20, help="research papers per user")
+    parser.add_argument("--iprs", type=int, default=5, help="IPRs per user")
+    parser.add_argument("--innovations", type=int, default=5, help="innovations per user")
+    parser.add_argument("--startups", type=int, default=2, help="startups per user")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario (before weighting)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--supabase-latency", type=float, default=0.0, help="simulated auth latency (s)")
+    parser.add_argument("--serpapi-latency", type=float, default=0.0, help="simulated SerpAPI latency (s)")
+    parser.add_argument("--only", help="run scenarios whose name contains this text")
+    parser.add_argument("--db", help="SQLite file to use (default: a temporary file)")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<commit>-<time>.json)")
+    args = parser.parse_args(argv)
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="riise-bench-"), "bench.db")
+    prepare_environment(db_path)
+
+    # App modules read the environment at import time
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database import Base, engine, SessionLocal
+    import create_table  # noqa: F401 - registers and creates every table
+    from app import app
+    from benchmarks import fakes
+    from benchmarks.seed import seed, ADMIN_EMAIL
+    from models.research import ResearchPaper
+    from models.IPR import IPR
+    from models.innovation import Innovation
+    from models.startup import Startup
+
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        print(f"Seeding {db_path} ...")
+        started = time.perf_counter()
+        emails = seed(db, args.users, args.papers, args.iprs, args.innovations, args.startups)
+        ids = {
+            "research": [r for r, in db.query(ResearchPaper.paper_id).order_by(ResearchPaper.paper_id)],
+            "ipr": [r for r, in db.query(IPR.ipr_id).order_by(IPR.ipr_id)],
+            "innovation": [r for r, in db.query(Innovation.innovation_id).order_by(Innovation.innovation_id)],
+            "startup": [r for r, in db.query(Startup.startup_id).order_by(Startup.startup_id)],
+        }
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+    tokens = fakes.register_users(emails + [ADMIN_EMAIL])
+    fakes.install(args.supabase_latency, args.serpapi_latency)
+
+    results = {}
+    for scenario in build_scenarios(ids, emails):
+        name, weight = scenario[0], scenario[5]
+        if args.only and args.only not in name:
+            continue
+        requests = max(1, int(args.requests * weight))
+        results[name] = run_scenario(app, scenario, requests, args.concurrency, emails, ADMIN_EMAIL, tokens)
+        r = results[name]
+        print(f"{name:32} {r['throughput_rps']:>9} req/s  p50 {r['p50_ms']:>8} ms  "
+              f"p95 {r['p95_ms']:>8} ms  p99 {r['p99_ms']:>8} ms  {r['status_counts']}  upstream {r['upstream_calls']}")
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": vars(args),
+        },
+        "scenarios": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/seed.py
+# Fills a database with deterministic, realistic-looking fixture data.
+import random
+from datetime import date, timedelta
+from sqlalchemy import insert, select
+from models.users import User
+from models.research import ResearchPaper
+from models.IPR import IPR
+from models.innovation import Innovation
+from models.startup import Startup
+from utils.stats import refresh_all_stats
+from utils.authors import sync_paper_authors
+from utils.dedup import index_paper_signature
+
+WORDS = (
+    "adaptive learning network graph quantum secure federated edge sensor robust "
+    "efficient neural model analysis energy smart grid health imaging language "
+    "vision control optimization distributed blockchain materials battery water"
+).split()
+FIRST_NAMES = ["Asha", "Ravi", "Meera", "John", "Li", "Sara", "Omar", "Priya", "Ken", "Ana"]
+LAST_NAMES = ["Sharma", "Singh", "Gupta", "Smith", "Chen", "Khan", "Iyer", "Rao", "Tanaka", "Silva"]
+STATUSES = {
+    "research": ["Published", "Under Review", "Draft"],
+    "ipr": ["Filed", "Granted", "Rejected", "Pending"],
+    "innovation": ["draft", "submitted", "approved"],
+    "startup": ["Active", "Acquired", "Stealth", "Closed"],
+}
+
+ADMIN_EMAIL = "admin@bench.local"
+
+
+def user_email(i):
+    return f"user{i}@bench.local"
+
+
+def _title(rng, words=6):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _date(rng):
+    return date(2010, 1, 1) + timedelta(days=rng.randrange(15 * 365))
+
+
+def _person(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def seed(db, users=50, papers=20, iprs=5, innovations=5, startups=2, random_seed=42):
+    """
+    Insert one verified admin plus `users` users, each with the given number of
+    papers, IPRs, innovations and startups. Returns the list of user emails.
+    """
+    rng = random.Random(random_seed)
+
+    db.execute(insert(User), [{
+        "name": "Benchmark Admin", "email": ADMIN_EMAIL, "role": "admin", "is_verified": True,
+    }] + [{
+        "name": _person(rng), "email": user_email(i), "role": "user", "is_verified": rng.random() < 0.7,
+        "scholar_id": f"BENCH{i:06d}",
+    } for i in range(users)])
+    user_ids = [uid for uid, in db.execute(select(User.user_id).where(User.role == "user")).all()]
+
+    db.execute(insert(Startup), [{
+        "name": f"{_title(rng, 2)} Labs", "description": _title(rng, 30), "founder": _person(rng),
+        "industry": rng.choice(["EdTech", "HealthTech", "FinTech", "AgriTech", "CleanTech"]),
+        "founded_date": _date(rng), "status": rng.choice(STATUSES["startup"]),
+        "funding": rng.choice(["Bootstrapped", "Seed - $200K", "Series A - $1M"]), "user_id": uid,
+    } for uid in user_ids for _ in range(startups)])
+    startup_ids = [sid for sid, in db.execute(select(Startup.startup_id)).all()]
+
+    db.execute(insert(ResearchPaper), [{
+        "title": _title(rng, 8), "abstract": _title(rng, 120),
+        "authors": ", ".join(_person(rng) for _ in range(rng.randint(1, 5))),
+        "publication_date": _date(rng), "doi": f"10.5555/bench.{uid}.{n}",
+        "status": rng.choice(STATUSES["research"]), "citations": int(rng.paretovariate(1.2)) - 1,
+        "source": "manual", "user_id": uid,
+    } for uid in user_ids for n in range(papers)])
+
+    db.execute(insert(IPR), [{
+        "ipr_type": rng.choice(["Patent", "Trademark", "Copyright", "Design"]), "title": _title(rng, 5),
+        "ipr_number": f"IN{rng.randrange(10**9):09d}", "filing_date": _date(rng),
+        "status": rng.choice(STATUSES["ipr"]),
+        "related_startup_id": rng.choice(startup_ids) if startup_ids and rng.random() < 0.3 else None,
+        "user_id": uid,
+    } for uid in user_ids for _ in range(iprs)])
+
+    db.execute(insert(Innovation), [{
+        "title": _title(rng, 5), "description": _title(rng, 60), "domain": rng.choice(WORDS),
+        "level": rng.choice(["institute", "state", "national"]), "status": rng.choice(STATUSES["innovation"]),
+        "submitted_on": _date(rng), "user_id": uid,
+    } for uid in user_ids for _ in range(innovations)])
+
+    # Derived tables normally maintained by the write routes
+    for paper_id, user_id, title, authors in db.execute(select(
+        ResearchPaper.paper_id, ResearchPaper.user_id, ResearchPaper.title, ResearchPaper.authors
+    )).all():
+        sync_paper_authors(db, paper_id, authors)
+        index_paper_signature(db, paper_id, user_id, title)
+    db.commit()
+    refresh_all_stats(db)
+
+    return [user_email(i) for i in range(users)]
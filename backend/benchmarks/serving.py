@@ -0,0 +1,170 @@
+# benchmarks/serving.py
+# Compares gunicorn worker classes under I/O-bound load: the same seeded app is
+# served with sync workers and with gevent workers, then hit over real HTTP by
+# many concurrent clients doing scholar lookups and list requests.
+#
+# Usage (from backend/):
+#   python -m benchmarks.serving
+#   python -m benchmarks.serving --concurrency 64 --requests 500 --serpapi-latency 0.5
+#   python -m benchmarks.serving --modes gevent --worker-connections 200
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+from benchmarks.run import prepare_environment, percentile, git_commit, RESULTS_DIR  # noqa: E402
+
+WORKER_CLASSES = {"gevent": "utils.green.GeventWorker"}
+
+SCENARIOS = [
+    ("research.fetch_by_name", "/api/v1/research/fetch-by-name?name=Ada%20Lovelace"),
+    ("research.fetch_by_id", "/api/v1/research/fetch-by-id/BENCH000001"),
+    ("research.list.user", "/api/v1/research/"),
+    ("users.profile", "/api/v1/users/profile"),
+]
+
+
+def seed_database(db_path, users, papers):
+    prepare_environment(db_path)
+    from database import SessionLocal
+    import create_table  # noqa: F401 - registers and creates every table
+    from benchmarks import fakes
+    from benchmarks.seed import seed
+
+    db = SessionLocal()
+    try:
+        emails = seed(db, users, papers, iprs=2, innovations=2, startups=1)
+    finally:
+        db.close()
+    # The servers read the same account store and signing secret (see prepare_environment)
+    return emails, fakes.register_users(emails)
+
+
+def start_server(mode, args, db_path):
+    env = dict(os.environ, BENCH_DB=db_path,
+               BENCH_SUPABASE_LATENCY=str(args.supabase_latency),
+               BENCH_SERPAPI_LATENCY=str(args.serpapi_latency))
+    server = subprocess.Popen([
+        sys.executable, "-m", "gunicorn", "benchmarks.wsgi:app",
+        "--worker-class", WORKER_CLASSES.get(mode, mode), "--workers", str(args.workers),
+        "--worker-connections", str(args.worker_connections),
+        "--bind", f"127.0.0.1:{args.port}", "--timeout", "120", "--log-level", "warning",
+    ], cwd=BACKEND_DIR, env=env)
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn ({mode}) exited with {server.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{args.port}/health", timeout=1).status_code == 200:
+                return server
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"gunicorn ({mode}) did not become healthy")
+
+
+def run_scenario(base_url, path, total, concurrency, emails, tokens):
+    local = threading.local()
+    lock = threading.Lock()
+    latencies = []
+    statuses = {}
+
+    def one(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            status = session.get(base_url + path, cookies={"access_token": tokens[emails[i % len(emails)]]},
+                                 timeout=120).status_code
+        except requests.RequestException:
+            status = 599
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "method": "GET",
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": sum(count for status, count in statuses.items() if status >= 500),
+        "status_counts": {str(k): v for k, v in sorted(statuses.items())},
+        "throughput_rps": round(total / wall, 2) if wall else None,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sync vs gevent gunicorn workers under I/O-bound load")
+    parser.add_argument("--modes", default="sync,gevent", help="comma-separated gunicorn worker classes")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--worker-connections", type=int, default=100, help="greenlets per gevent worker")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--supabase-latency", type=float, default=0.05, help="simulated auth latency (s)")
+    parser.add_argument("--serpapi-latency", type=float, default=0.3, help="simulated SerpAPI latency (s)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--papers", type=int, default=20, help="research papers per user")
+    parser.add_argument("--only", help="run scenarios whose name contains this text")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<commit>-serving-<time>.json)")
+    args = parser.parse_args(argv)
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="riise-serving-"), "bench.db")
+    print(f"Seeding {db_path} ...")
+    emails, tokens = seed_database(db_path, args.users, args.papers)
+
+    results = {}
+    for mode in args.modes.split(","):
+        server = start_server(mode, args, db_path)
+        try:
+            for name, path in SCENARIOS:
+                if args.only and args.only not in name:
+                    continue
+                r = results[f"{mode}.{name}"] = run_scenario(
+                    f"http://127.0.0.1:{args.port}", path, args.requests, args.concurrency, emails, tokens)
+                print(f"{mode + '.' + name:32} {r['throughput_rps']:>9} req/s  p50 {r['p50_ms']:>9} ms  "
+                      f"p95 {r['p95_ms']:>9} ms  {r['status_counts']}")
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "benchmark": "serving",
+            "params": vars(args),
+        },
+        "scenarios": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}-serving-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
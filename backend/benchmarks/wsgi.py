@@ -0,0 +1,17 @@
+# benchmarks/wsgi.py
+# WSGI entry point that serves the app against an already seeded benchmark
+# database on the local auth backend, for running under a real server:
+#   BENCH_DB=/tmp/bench.db gunicorn benchmarks.wsgi:app -k gevent
+# BENCH_SUPABASE_LATENCY / BENCH_SERPAPI_LATENCY set the simulated latencies (s).
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.run import prepare_environment  # noqa: E402
+
+prepare_environment(os.environ["BENCH_DB"])
+
+from app import app  # noqa: E402,F401
+from benchmarks import fakes  # noqa: E402
+
+fakes.install(float(os.getenv("BENCH_SUPABASE_LATENCY", "0")), float(os.getenv("BENCH_SERPAPI_LATENCY", "0")))
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
 load_dotenv()
@@ -16,7 +17,158 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
-# Construct the SQLAlchemy connection URL
-SQLALCHEMY_DATABASE_URL = (
+# Construct the SQLAlchemy connection URL (DATABASE_URL overrides it, e.g. a local
+# sqlite:///bench.db for benchmarks)
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL") or (
     f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?sslmode=require"
 )
+
+# How long (in seconds) aggregated analytics results are cached in-process
+ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", "60"))
+
+# Optional bearer token required to scrape /metrics (open when unset)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Development/test query checks (see utils/querycheck.py)
+QUERY_DEBUG = os.getenv("QUERY_DEBUG", "false").lower() in ("1", "true", "yes")
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+# Readiness probe: how long check results are reused and how long the auth check may take
+HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", "5"))
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+
+# Read replicas (comma-separated SQLAlchemy URLs). GET/HEAD requests read from a
+# replica that is at most REPLICA_MAX_LAG_SECONDS behind; a client that just wrote
+# keeps reading from the primary for READ_YOUR_WRITES_SECONDS.
+REPLICA_DATABASE_URLS = [url.strip() for url in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if url.strip()]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "5"))
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+
+# Connection pool profile (see utils/pooling.py): "pooler" for PgBouncer/Supabase
+# transaction pooler URLs, "direct" for a direct Postgres connection, "legacy" for
+# the previous pre-ping settings, "auto" picks pooler or direct from the URL.
+DB_POOL_PROFILE = os.getenv("DB_POOL_PROFILE", "auto").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test connections with a round-trip on checkout in the direct profile (off: a dropped
+# idle connection costs one request a 503 instead of every checkout a round-trip)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+# Retry-After (seconds) sent with the 503 returned when the database connection drops
+DB_RETRY_AFTER = int(os.getenv("DB_RETRY_AFTER", "1"))
+
+# Outbound HTTP (SerpAPI, auth health): per-request timeout and keep-alive connections per host
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "50"))
+
+# Shared cache for all workers (response cache, session tokens, rate limits)
+REDIS_URL = os.getenv("REDIS_URL")
+# Without REDIS_URL every worker caches on its own, and an invalidation only reaches
+# the worker that made it. "auto" settings therefore only cache with REDIS_URL or a
+# single worker (WEB_CONCURRENCY, as in gunicorn.conf.py).
+SINGLE_WORKER = int(os.getenv("WEB_CONCURRENCY", "2")) == 1
+
+
+def _cache_setting(name):
+    value = os.getenv(name, "auto").lower()
+    return bool(REDIS_URL) or SINGLE_WORKER if value == "auto" else value in ("1", "true", "yes")
+
+
+# Response cache for the list and profile endpoints (see utils/response_cache.py).
+# "true" without REDIS_URL accepts up to RESPONSE_CACHE_TTL of stale data from other workers.
+RESPONSE_CACHE_ENABLED = _cache_setting("RESPONSE_CACHE_ENABLED")
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+
+# add-paper answers 409 with the matching papers when a new paper looks like one the
+# user already has (override per request with "allow_duplicate": true or
+# ?allow_duplicate=true). Off by default: the paper is created and the matches are
+# returned as "possible_duplicates".
+REJECT_DUPLICATE_PAPERS = os.getenv("REJECT_DUPLICATE_PAPERS", "false").lower() in ("1", "true", "yes")
+
+# Update routes check the `updated_at` a client sends against the row and answer 409
+# when someone else changed it meanwhile. Opt-in per request by default, since older
+# clients do not send it; when set, updates without `updated_at` are refused with 428.
+REQUIRE_UPDATE_VERSION = os.getenv("REQUIRE_UPDATE_VERSION", "false").lower() in ("1", "true", "yes")
+
+# Delta sync (?updated_since=) only works this far back; older clients reload the full list
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("TOMBSTONE_RETENTION_DAYS", "90"))
+
+# Response compression (gzip, or brotli when the package is installed)
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+# Bulk deletes (see utils/bulk.py): ids per DELETE statement and transaction, and the
+# largest request handled inline; bigger ones run as a background job
+BULK_DELETE_CHUNK_SIZE = int(os.getenv("BULK_DELETE_CHUNK_SIZE", "500"))
+BULK_DELETE_SYNC_LIMIT = int(os.getenv("BULK_DELETE_SYNC_LIMIT", "500"))
+BULK_DELETE_MAX_IDS = int(os.getenv("BULK_DELETE_MAX_IDS", "50000"))
+
+# Background jobs (see utils/jobs.py): threads per worker and how long a job's status is kept
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+
+# Auth provider (see utils/local_auth.py): "supabase", or "local" for a self-contained
+# stand-in that signs its own JWTs and keeps accounts in LOCAL_AUTH_DB (":memory:" or
+# a SQLite file shared by all workers); benchmarks and offline development use it
+AUTH_BACKEND = os.getenv("AUTH_BACKEND", "supabase").lower()
+LOCAL_AUTH_DB = os.getenv("LOCAL_AUTH_DB", ":memory:")
+# Signs the local backend's access tokens; required with AUTH_BACKEND=local and the
+# same for all workers (the benchmarks and tests set their own)
+LOCAL_AUTH_SECRET = os.getenv("LOCAL_AUTH_SECRET")
+LOCAL_AUTH_TOKEN_TTL = int(os.getenv("LOCAL_AUTH_TOKEN_TTL", "3600"))
+LOCAL_AUTH_HASH_ITERATIONS = int(os.getenv("LOCAL_AUTH_HASH_ITERATIONS", "200000"))
+
+# ID card storage (see utils/storage.py): "supabase", or "local" to keep files in
+# STORAGE_LOCAL_DIR and accept the signed uploads in this app (development and tests).
+# Defaults to "local" with the local auth backend, so nothing needs Supabase.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local" if AUTH_BACKEND == "local" else "supabase").lower()
+STORAGE_LOCAL_DIR = os.getenv("STORAGE_LOCAL_DIR", os.path.join(tempfile.gettempdir(), "riise-storage"))
+# Key for the local backend's signed upload URLs; required with STORAGE_BACKEND=local
+# and the same for all workers, as any of them may receive the upload
+STORAGE_SIGNING_SECRET = os.getenv("STORAGE_SIGNING_SECRET")
+# Lifetime (seconds) of the local backend's signed upload URLs; Supabase's are fixed at 2 hours
+UPLOAD_URL_TTL = int(os.getenv("UPLOAD_URL_TTL", "600"))
+
+# ID card uploads (see utils/uploads.py): largest accepted file, longest side of the
+# stored image and of its thumbnail (pixels) and their JPEG quality
+ID_CARD_MAX_BYTES = int(os.getenv("ID_CARD_MAX_BYTES", str(8 * 1024 * 1024)))
+ID_CARD_MAX_DIMENSION = int(os.getenv("ID_CARD_MAX_DIMENSION", "1600"))
+ID_CARD_THUMB_DIMENSION = int(os.getenv("ID_CARD_THUMB_DIMENSION", "320"))
+ID_CARD_JPEG_QUALITY = int(os.getenv("ID_CARD_JPEG_QUALITY", "82"))
+# Largest image (width x height) decoded from an ID card; far below Pillow's own
+# limit, as only JPEGs can be decoded at a reduced scale
+ID_CARD_MAX_PIXELS = int(os.getenv("ID_CARD_MAX_PIXELS", "25000000"))
+
+# Verified session tokens (see utils/auth.py): how long a token checked with Supabase
+# is trusted without asking again, and how many are kept per worker without Redis.
+# "true" without REDIS_URL lets other workers accept a token for up to
+# AUTH_TOKEN_CACHE_TTL after logout or a role change.
+AUTH_TOKEN_CACHE_ENABLED = _cache_setting("AUTH_TOKEN_CACHE_ENABLED")
+AUTH_TOKEN_CACHE_TTL = int(os.getenv("AUTH_TOKEN_CACHE_TTL", "60"))
+AUTH_TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
+# Rate limiting (see utils/ratelimit.py) of expensive routes, per user and route class:
+# sustained requests per minute and burst size of the token bucket, and how many
+# requests of the class may run at once per worker and per user. Requests over a
+# limit get 429 with Retry-After. Buckets are shared through REDIS_URL when it is set.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_SCHOLAR_PER_MINUTE = float(os.getenv("RATE_LIMIT_SCHOLAR_PER_MINUTE", "20"))
+RATE_LIMIT_SCHOLAR_BURST = int(os.getenv("RATE_LIMIT_SCHOLAR_BURST", "10"))
+RATE_LIMIT_EXPORT_PER_MINUTE = float(os.getenv("RATE_LIMIT_EXPORT_PER_MINUTE", "6"))
+RATE_LIMIT_EXPORT_BURST = int(os.getenv("RATE_LIMIT_EXPORT_BURST", "3"))
+CONCURRENCY_LIMIT_SCHOLAR = int(os.getenv("CONCURRENCY_LIMIT_SCHOLAR", "32"))
+CONCURRENCY_LIMIT_SCHOLAR_PER_USER = int(os.getenv("CONCURRENCY_LIMIT_SCHOLAR_PER_USER", "2"))
+CONCURRENCY_LIMIT_EXPORT = int(os.getenv("CONCURRENCY_LIMIT_EXPORT", "2"))
+CONCURRENCY_LIMIT_EXPORT_PER_USER = int(os.getenv("CONCURRENCY_LIMIT_EXPORT_PER_USER", "1"))
+
+# Coalescing of identical upstream lookups (see utils/singleflight.py): how long a
+# SerpAPI result is reused, and how long a request waits for another request's
+# lookup of the same thing before making its own
+COALESCE_RESULT_TTL = int(os.getenv("COALESCE_RESULT_TTL", "30"))
+COALESCE_WAIT_SECONDS = float(os.getenv("COALESCE_WAIT_SECONDS", str(HTTP_TIMEOUT + 5)))
@@ -5,6 +5,10 @@ from models.startup import Startup
 from models.IPR import IPR
 from models.research import ResearchPaper
 from models.innovation import Innovation
+from models.stats import ContributionStat
+from models.author import Author, PaperAuthor
+from models.signature import PaperSignature
+from models.tombstone import Tombstone
 
 
 Base.metadata.create_all(bind=engine)
@@ -1,22 +1,115 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
-from config import SQLALCHEMY_DATABASE_URL
-
-# Database Setup with appropriate pooling settings for transaction pooler
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,  # Check connection validity before using it
-    pool_size=10,        # Start with 10 connections in the pool
-    max_overflow=20,     # Allow up to 20 additional connections
-    pool_recycle=3600,   # Recycle connections after an hour
-    pool_timeout=30      # Wait up to 30 seconds for a connection
-)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+from flask import g, has_app_context
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from config import SQLALCHEMY_DATABASE_URL, REPLICA_DATABASE_URLS
+from utils.metrics import instrument_engine
+from utils.pooling import engine_options, install_disconnect_handling
+from utils.replicas import ReplicaSet, mark_request_wrote
+
+
+def make_engine(url):
+    # Pool settings come from the DB_POOL_PROFILE (pooler / direct / legacy)
+    new_engine = create_engine(url, **engine_options(url))
+    instrument_engine(new_engine)  # Query count/time for /metrics and Server-Timing
+    install_disconnect_handling(new_engine)
+
+    # Local SQLite databases (benchmarks, tests) have no schemas: attach a second
+    # database file as "RIISE" so the models work unchanged.
+    if new_engine.dialect.name == "sqlite":
+        @event.listens_for(new_engine, "connect")
+        def _attach_riise_schema(dbapi_connection, connection_record):
+            database = new_engine.url.database
+            schema_file = f"{database}.RIISE" if database and database != ":memory:" else ":memory:"
+            dbapi_connection.execute(f"ATTACH DATABASE '{schema_file}' AS RIISE")
+            dbapi_connection.execute("PRAGMA foreign_keys = ON")
+    return new_engine
+
+
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
+replicas = ReplicaSet(make_engine(url) for url in REPLICA_DATABASE_URLS)
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to a replica and everything else to the primary.
+    Reads use a replica when the session was opened with info={"read_only": True}
+    (export jobs, scripts) or while serving a GET/HEAD request from a client that
+    has not written recently. After a write the transaction stays on the primary.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Closed at the end of the request (see close_request_sessions)
+        if has_app_context():
+            g.setdefault("_db_sessions", []).append(self)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("wrote") or self._flushing or (clause is not None and not clause.is_select):
+            self.info["wrote"] = True
+            return engine
+        if not replicas.engines:
+            return engine
+        read_only = self.info.get("read_only")
+        if read_only is None:
+            # Request sessions use the replica chosen for the request (GET/HEAD from a client
+            # that has not written recently), otherwise the primary
+            return replicas.for_request() or engine
+        if read_only and "replica" not in self.info:
+            # One replica per transaction so consecutive reads see the same data
+            self.info["replica"] = replicas.choose()
+        return self.info.get("replica") or engine
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_write(session):
+    if session.info.pop("wrote", False):
+        mark_request_wrote()
+    session.info.pop("replica", None)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
+    session.info.pop("replica", None)
+
+
+def close_request_sessions(exc=None):
+    """
+    Teardown hook: return the connections of the sessions opened during the
+    request. Routes do not close their sessions, so without this a connection
+    stays checked out until the garbage collector finds the session, which
+    exhausts the pool when a gevent worker serves many requests at once.
+    """
+    for session in g.pop("_db_sessions", []):
+        session.close()
+
+
+def reset_request_sessions():
+    """
+    Roll back the sessions of the current request after its connection was lost.
+    Sessions of other requests are left to their own request: their connections were
+    invalidated with the pool and fail, and get rolled back, when they are next used.
+    """
+    for session in g.get("_db_sessions", []):
+        session.rollback()
+
+
+def upsert_insert(table):
+    """INSERT for `table` with on_conflict_do_nothing/do_update on the configured dialect"""
+    from sqlalchemy.dialects import postgresql, sqlite
+    return (postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert)(table)
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-# Supabase Setup (if still needed for other features)
-from supabase import create_client
-from config import SUPABASE_URL, SUPABASE_KEY
+# Supabase Setup (if still needed for other features). AUTH_BACKEND=local swaps in
+# a self-contained stand-in, so nothing needs a live Supabase project.
+from config import SUPABASE_URL, SUPABASE_KEY, AUTH_BACKEND
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+if AUTH_BACKEND == "local":
+    from utils.local_auth import LocalClient
+    supabase = LocalClient()
+else:
+    from supabase import create_client
+    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
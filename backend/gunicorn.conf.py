@@ -0,0 +1,14 @@
+# gunicorn.conf.py
+# Loaded automatically by `gunicorn app:app` when started from backend/.
+# Requests mostly wait on Supabase, Postgres and SerpAPI, so the default is the
+# gevent worker: each process serves up to GEVENT_WORKER_CONNECTIONS requests
+# concurrently, switching greenlets whenever one waits on the network.
+import os
+
+# utils.green.GeventWorker is gunicorn's gevent worker adjusted for this app
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "utils.green.GeventWorker")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_connections = int(os.getenv("GEVENT_WORKER_CONNECTIONS", "100"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = 5
+
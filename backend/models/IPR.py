@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, TIMESTAMP, ForeignKey, func
 from database import Base
 
 class IPR(Base):
@@ -11,9 +11,9 @@ class IPR(Base):
     ipr_number = Column(String, nullable=True)
     filing_date = Column(Date, nullable=True)
     status = Column(String, nullable=True)
-    related_startup_id = Column(Integer, ForeignKey("RIISE.startup.startup_id"), nullable=True)
-    created_at = Column(TIMESTAMP, nullable=True)
-    updated_at = Column(TIMESTAMP, nullable=True)
+    related_startup_id = Column(Integer, ForeignKey("RIISE.startup.startup_id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(TIMESTAMP, nullable=True, default=func.now())
+    updated_at = Column(TIMESTAMP, nullable=True, default=func.now(), onupdate=func.now(), index=True)
     user_id = Column(Integer, ForeignKey("RIISE.users.user_id"), nullable=False)
 
     def to_dict(self):
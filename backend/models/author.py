@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from database import Base
+
+class Author(Base):
+    __tablename__ = "author"
+    __table_args__ = {"schema": "RIISE"}
+
+    author_id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
+    name = Column(String, nullable=False)  # Name as first seen, e.g. "J. K. Rowling"
+    normalized_name = Column(String, nullable=False, unique=True, index=True)  # e.g. "j k rowling"
+
+    def to_dict(self):
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+
+
+class PaperAuthor(Base):
+    __tablename__ = "paper_author"
+    __table_args__ = (
+        Index("ix_paper_author_author_id", "author_id"),
+        {"schema": "RIISE"},
+    )
+
+    paper_id = Column(Integer, ForeignKey("RIISE.research_paper.paper_id", ondelete="CASCADE"), primary_key=True)
+    author_id = Column(Integer, ForeignKey("RIISE.author.author_id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, nullable=False, default=0)  # Order of the author on the paper
+
+    def to_dict(self):
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
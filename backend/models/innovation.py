@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, TIMESTAMP, ForeignKey, func
 from database import Base
 
 class Innovation(Base):
@@ -12,8 +12,8 @@ class Innovation(Base):
     level = Column(String, nullable=True)  # e.g. "institute", "state", "national"
     status = Column(String, nullable=True)  # e.g. "draft", "submitted", "approved"
     submitted_on = Column(Date, nullable=True)
-    created_at = Column(TIMESTAMP, nullable=True)
-    updated_at = Column(TIMESTAMP, nullable=True)
+    created_at = Column(TIMESTAMP, nullable=True, default=func.now())
+    updated_at = Column(TIMESTAMP, nullable=True, default=func.now(), onupdate=func.now(), index=True)
     user_id = Column(Integer, ForeignKey("RIISE.users.user_id"), nullable=True)
 
     def to_dict(self):
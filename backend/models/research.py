@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, TIMESTAMP, ForeignKey, func
 from database import Base
 
 class ResearchPaper(Base):
@@ -8,16 +8,16 @@ class ResearchPaper(Base):
     paper_id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     title = Column(String, nullable=False)
     abstract = Column(Text, nullable=True)
-    authors = Column(String, nullable=True)  # Comma-separated names (or move to separate table for 1:N)
+    authors = Column(String, nullable=True)  # Comma-separated names, mirrored into RIISE.author / RIISE.paper_author
     publication_date = Column(Date, nullable=True)
-    doi = Column(String, nullable=True)
+    doi = Column(String, nullable=True, index=True)
     status = Column(String, nullable=True)  # e.g., Published, Under Review
     citations = Column(Integer, nullable=True)
-    scholar_id = Column(String, nullable=True)  # Google Scholar unique paper ID
+    scholar_id = Column(String, nullable=True, index=True)  # Google Scholar unique paper ID
     source = Column(String, nullable=True, default="manual")  # manual, scholarly, or imported
 
-    created_at = Column(TIMESTAMP, nullable=True)
-    updated_at = Column(TIMESTAMP, nullable=True)
+    created_at = Column(TIMESTAMP, nullable=True, default=func.now())
+    updated_at = Column(TIMESTAMP, nullable=True, default=func.now(), onupdate=func.now(), index=True)
 
     # FK to users table in RIISE schema
     user_id = Column(Integer, ForeignKey("RIISE.users.user_id", ondelete="CASCADE"), nullable=False)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, Index
+from database import Base
+
+class PaperSignature(Base):
+    """MinHash LSH band buckets of a research paper title, used to find duplicate candidates"""
+    __tablename__ = "paper_signature"
+    __table_args__ = (
+        Index("ix_paper_signature_lookup", "user_id", "band", "bucket"),
+        {"schema": "RIISE"},
+    )
+
+    paper_id = Column(Integer, ForeignKey("RIISE.research_paper.paper_id", ondelete="CASCADE"), primary_key=True)
+    band = Column(Integer, primary_key=True)
+    bucket = Column(BigInteger, nullable=False)
+    user_id = Column(Integer, nullable=False)  # Copied from the paper so lookups stay per user
+
+    def to_dict(self):
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
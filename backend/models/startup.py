@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, Date, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, TIMESTAMP, ForeignKey, func
+from sqlalchemy.orm import relationship
 from database import Base
+from models.IPR import IPR
 
 class Startup(Base):
     __tablename__ = "startup"
@@ -13,11 +15,14 @@ class Startup(Base):
     founded_date = Column(Date, nullable=True)
     status = Column(String, nullable=True)  # Active, Acquired, Stealth, Closed, etc.
     funding = Column(String, nullable=True)  # e.g. "Series A - $1M", "Bootstrapped"
-    created_at = Column(TIMESTAMP, nullable=True)
-    updated_at = Column(TIMESTAMP, nullable=True)
+    created_at = Column(TIMESTAMP, nullable=True, default=func.now())
+    updated_at = Column(TIMESTAMP, nullable=True, default=func.now(), onupdate=func.now(), index=True)
 
     # FK to users table in RIISE schema
     user_id = Column(Integer, ForeignKey("RIISE.users.user_id", ondelete="SET NULL"), nullable=True)
 
+    # Read-only: IPRs are linked and unlinked through IPR.related_startup_id
+    iprs = relationship(IPR, viewonly=True, order_by=IPR.ipr_id)
+
     def to_dict(self):
         return {c.name: getattr(self, c.name) for c in self.__table__.columns}
\ No newline at end of file
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, Index, func, literal_column
+from database import Base
+
+class ContributionStat(Base):
+    __tablename__ = "contribution_stats"
+    __table_args__ = (
+        Index("ix_contribution_stats_user_entity", "user_id", "entity"),
+        {"schema": "RIISE"},
+    )
+
+    stat_id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("RIISE.users.user_id", ondelete="CASCADE"), nullable=False)
+    entity = Column(String, nullable=False)  # ipr, research, innovation, startup
+    year = Column(Integer, nullable=True)    # NULL when the record has no date
+    total = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(TIMESTAMP, nullable=True, server_default=func.now())
+
+    def to_dict(self):
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+
+
+# One row per (user, entity, year); records without a date share year NULL, kept
+# distinct here through coalesce. Refreshes upsert against it (see utils/stats.py),
+# so the ON CONFLICT target must be this exact expression list.
+STAT_KEY = (
+    ContributionStat.user_id,
+    ContributionStat.entity,
+    func.coalesce(ContributionStat.year, literal_column("0")),
+)
+Index("ux_contribution_stats_user_entity_year", *STAT_KEY, unique=True)
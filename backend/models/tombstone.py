@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP, Index, func
+from database import Base
+
+class Tombstone(Base):
+    """Marker left behind by a delete so delta-syncing clients can drop the record"""
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_entity_deleted_at", "entity", "deleted_at"),
+        Index("ix_tombstones_entity_user_deleted_at", "entity", "user_id", "deleted_at"),
+        {"schema": "RIISE"},
+    )
+
+    tombstone_id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
+    entity = Column(String, nullable=False)  # ipr, research, innovation, startup
+    record_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=True)  # Owner of the deleted record (startups and innovations may have none)
+    deleted_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+
+    def to_dict(self):
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
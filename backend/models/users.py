@@ -1,10 +1,23 @@
 # models/users.py
-from sqlalchemy import Column, String, Boolean, Integer
+from sqlalchemy import Column, String, Boolean, Integer, TIMESTAMP, Index, text
+from sqlalchemy.orm import relationship
 from database import Base
+from models.research import ResearchPaper
+from models.IPR import IPR
+from models.innovation import Innovation
+from models.startup import Startup
 
 class User(Base):
     __tablename__ = "users"
-    __table_args__ = {"schema": "RIISE"}
+    __table_args__ = (
+        # Covers only the admin review queue, so it stays small however many users there are
+        Index(
+            "ix_users_pending_verification", "id_card_submitted_at", "user_id",
+            postgresql_where=text("verification_status = 'pending'"),
+            sqlite_where=text("verification_status = 'pending'"),
+        ),
+        {"schema": "RIISE"},
+    )
 
     user_id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
@@ -15,7 +28,16 @@ class User(Base):
     i10_index = Column(Integer, nullable=True)
     total_citations = Column(Integer, nullable=True)
     id_card_url = Column(String, nullable=True)
+    id_card_thumb_url = Column(String, nullable=True)  # Small preview for the admin review list
     is_verified = Column(Boolean, default=False)
+    verification_status = Column(String, nullable=True)  # None (no ID card), pending, approved, rejected
+    id_card_submitted_at = Column(TIMESTAMP, nullable=True)  # Orders the review queue
+
+    # Read-only contribution collections; records are written through their own models
+    research_papers = relationship(ResearchPaper, viewonly=True, order_by=ResearchPaper.paper_id)
+    iprs = relationship(IPR, viewonly=True, order_by=IPR.ipr_id)
+    innovations = relationship(Innovation, viewonly=True, order_by=Innovation.innovation_id)
+    startups = relationship(Startup, viewonly=True, order_by=Startup.startup_id)
 
     def to_dict(self):
         return {c.name: getattr(self, c.name) for c in self.__table__.columns}
@@ -2,6 +2,12 @@ from flask import Blueprint, request, jsonify
 from database import SessionLocal
 from models.IPR import IPR
 from utils.auth import token_required, role_required
+from utils.querycheck import query_budget
+from utils.stats import refresh_user_stats
+from utils.response_cache import cached_response, invalidate_responses
+from utils.sync import delta_response
+from utils.bulk import bulk_delete, bulk_delete_response
+from utils.updates import update_owned_record, parse_version
 
 ipr_bp = Blueprint("ipr", __name__, url_prefix="/api/v1/ipr")
 
@@ -13,11 +19,31 @@ def get_db():
     finally:
         db.close()
 
+def ipr_to_json(i):
+    return {
+        "ipr_id": i.ipr_id,
+        "ipr_type": i.ipr_type,
+        "title": i.title,
+        "ipr_number": i.ipr_number,
+        "filing_date": str(i.filing_date) if i.filing_date else None,
+        "status": i.status,
+        "related_startup_id": i.related_startup_id,
+        "created_at": str(i.created_at) if i.created_at else None,
+        "updated_at": str(i.updated_at) if i.updated_at else None,
+        "user_id": i.user_id,
+    }
+
 # Admin or User: View IPR entries
 @ipr_bp.route("/", methods=["GET"])
+@query_budget(4)
 @token_required
+@cached_response("ipr")
 def get_all_ipr():
     db = next(get_db())
+    # Incremental sync: only what changed since the client's last sync
+    if "updated_since" in request.args:
+        return delta_response(db, IPR, IPR.ipr_id, "ipr", ipr_to_json, request.user)
+
     role = request.user["role"]
     user_id = request.user["id"]
 
@@ -26,18 +52,7 @@ def get_all_ipr():
     else:
         iprs = db.query(IPR).filter(IPR.user_id == user_id).all()
 
-    return jsonify([{
-        "ipr_id": i.ipr_id,
-        "ipr_type": i.ipr_type,
-        "title": i.title,
-        "ipr_number": i.ipr_number,
-        "filing_date": str(i.filing_date) if i.filing_date else None,
-        "status": i.status,
-        "related_startup_id": i.related_startup_id,
-        "created_at": str(i.created_at) if i.created_at else None,
-        "updated_at": str(i.updated_at) if i.updated_at else None,
-        "user_id": i.user_id,
-    } for i in iprs])
+    return jsonify([ipr_to_json(i) for i in iprs])
 
 # Add IPR
 @ipr_bp.route("/add-ipr", methods=["POST"])
@@ -55,11 +70,12 @@ def add_ipr():
         status=data.get("status"),
         related_startup_id=data.get("related_startup_id"),
         created_at=data.get("created_at"),
-        updated_at=data.get("updated_at"),
         user_id=user_id
     )
     db.add(new_ipr)
+    refresh_user_stats(db, user_id)
     db.commit()
+    invalidate_responses(user_id, "ipr", "profile")
     db.refresh(new_ipr)
 
     return jsonify({"message": "IPR record created", "ipr_id": new_ipr.ipr_id})
@@ -70,28 +86,37 @@ def add_ipr():
 @role_required("admin")
 def update_ipr(ipr_id):
     db = next(get_db())
-    user_id = request.user["id"]
-    role = request.user["role"]
-
-    ipr = db.query(IPR).filter(IPR.ipr_id == ipr_id).first()
-    if not ipr:
-        return jsonify({"error": "IPR record not found"}), 404
-
-    if role != "admin" and ipr.user_id != user_id:
-        return jsonify({"error": "Unauthorized"}), 403
-
     data = request.json
-    allowed_fields = ["ipr_type", "title", "ipr_number", "filing_date", "status", "related_startup_id", "created_at", "updated_at"]
+
+    # `updated_at` is not writable: it carries the version the client last saw
+    allowed_fields = ["ipr_type", "title", "ipr_number", "filing_date", "status", "related_startup_id"]
+    values = {}
     for key, value in data.items():
         if key in allowed_fields:
-            setattr(ipr, key, value)
-        else:
+            values[key] = value
+        elif key != "updated_at":
             return jsonify({"error": f"Invalid Field - Cannot update: {key}"}), 400
 
+    try:
+        expected_updated_at = parse_version(data.get("updated_at"))
+    except ValueError:
+        return jsonify({"error": "Invalid updated_at"}), 400
+
+    ipr, error = update_owned_record(
+        db, IPR, IPR.ipr_id, ipr_id, values, request.user,
+        expected_updated_at=expected_updated_at, not_found="IPR record not found"
+    )
+    if error:
+        db.rollback()
+        return error
+
+    # The yearly stats only depend on the date column
+    if "filing_date" in values:
+        refresh_user_stats(db, ipr.user_id)
     db.commit()
-    db.refresh(ipr)
+    invalidate_responses(ipr.user_id, "ipr")
 
-    return jsonify({"message": "IPR record updated"})
+    return jsonify({"message": "IPR record updated", "updated_at": str(ipr.updated_at) if ipr.updated_at else None})
 
 # Delete IPR (Admin only)
 @ipr_bp.route("/delete-ipr/<int:ipr_id>", methods=["DELETE"])
@@ -99,10 +124,15 @@ def update_ipr(ipr_id):
 @role_required("admin")
 def delete_ipr(ipr_id):
     db = next(get_db())
-    ipr = db.query(IPR).filter(IPR.ipr_id == ipr_id).first()
-    if not ipr:
+    result = bulk_delete(db, "ipr", [ipr_id])
+    if not result["deleted"]:
         return jsonify({"error": "IPR record not found"}), 404
-
-    db.delete(ipr)
-    db.commit()
     return jsonify({"message": "IPR record deleted"})
+
+# Bulk delete IPR records (Admin only); large batches run as a background job
+@ipr_bp.route("/bulk-delete", methods=["POST"])
+@token_required
+@role_required("admin")
+def bulk_delete_ipr_records():
+    db = next(get_db())
+    return bulk_delete_response(db, "ipr")
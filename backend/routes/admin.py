@@ -0,0 +1,80 @@
+from flask import Blueprint, request, jsonify
+from database import SessionLocal
+from utils.auth import token_required, role_required
+from utils.jobs import get_job as find_job
+from utils.pagination import encode_cursor, decode_cursor, MAX_PAGE_SIZE
+from utils.querycheck import query_budget
+from utils.verification import pending_page, pending_count, review
+
+admin_bp = Blueprint("admin", __name__, url_prefix="/api/v1/admin")
+
+MAX_REVIEW_BATCH = 1000
+
+# Get DB session
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Status of a background job (e.g. a large bulk delete)
+@admin_bp.route("/jobs/<job_id>", methods=["GET"])
+@token_required
+@role_required("admin")
+def get_job(job_id):
+    job = find_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+# Users waiting for ID card verification, oldest submission first.
+# Pass the returned next_cursor as ?after= for the next page.
+@admin_bp.route("/verifications/pending", methods=["GET"])
+@query_budget(3)
+@token_required
+@role_required("admin")
+def get_pending_verifications():
+    db = next(get_db())
+    limit = max(1, min(request.args.get("limit", 50, type=int), MAX_PAGE_SIZE))
+    try:
+        after = decode_cursor(request.args["after"], 2) if request.args.get("after") else None
+        rows, has_more = pending_page(db, limit, after)
+    except (ValueError, TypeError, IndexError):
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    items = [{
+        "user_id": r.user_id,
+        "name": r.name,
+        "email": r.email,
+        "id_card_url": r.id_card_url,
+        "id_card_thumb_url": r.id_card_thumb_url,
+        "submitted_at": str(r.id_card_submitted_at) if r.id_card_submitted_at else None,
+    } for r in rows]
+    next_cursor = encode_cursor(rows[-1].id_card_submitted_at, rows[-1].user_id) if has_more else None
+    return jsonify({"items": items, "next_cursor": next_cursor, "pending_total": pending_count(db)})
+
+# Approve and/or reject pending users in one transaction:
+# {"approve": [user_id, ...], "reject": [user_id, ...]}
+@admin_bp.route("/verifications/review", methods=["POST"])
+@token_required
+@role_required("admin")
+def review_verifications():
+    data = request.get_json(silent=True) or {}
+    approve, reject = data.get("approve") or [], data.get("reject") or []
+    for ids in (approve, reject):
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return jsonify({"error": "approve and reject must be lists of user ids"}), 400
+    if not approve and not reject:
+        return jsonify({"error": "Nothing to review"}), 400
+    if set(approve) & set(reject):
+        return jsonify({"error": "A user cannot be both approved and rejected"}), 400
+    if len(approve) + len(reject) > MAX_REVIEW_BATCH:
+        return jsonify({"error": f"At most {MAX_REVIEW_BATCH} users per review"}), 400
+
+    db = next(get_db())
+    result = review(db, approve, reject)
+    # Ids that were not pending (already reviewed, no ID card or unknown)
+    reviewed = set(result["approved"]) | set(result["rejected"])
+    result["skipped"] = sorted((set(approve) | set(reject)) - reviewed)
+    return jsonify(result)
@@ -0,0 +1,174 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy import select, func, case, extract, cast, Integer
+from database import SessionLocal
+from models.IPR import IPR
+from models.research import ResearchPaper
+from models.innovation import Innovation
+from models.startup import Startup
+from utils.stats import STAT_SOURCES
+from utils.auth import token_required, role_required
+from utils.cache import ttl_cache
+from config import ANALYTICS_CACHE_TTL
+
+analytics_bp = Blueprint("analytics", __name__, url_prefix="/api/v1/analytics")
+
+# entity -> (model, columns admins may group by). "year" buckets by the date column in
+# STAT_SOURCES; like the others it counts every row, also those without an owner.
+GROUPABLE_FIELDS = {
+    "research": (ResearchPaper, {"status": ResearchPaper.status}),
+    "ipr": (IPR, {"status": IPR.status, "ipr_type": IPR.ipr_type}),
+    "innovation": (Innovation, {"status": Innovation.status, "domain": Innovation.domain, "level": Innovation.level}),
+    "startup": (Startup, {"status": Startup.status, "industry": Startup.industry}),
+}
+
+# (label, lower bound, upper bound) for the citation histogram; None means open-ended
+CITATION_BUCKETS = [
+    ("0", 0, 0),
+    ("1-9", 1, 9),
+    ("10-49", 10, 49),
+    ("50-99", 50, 99),
+    ("100-499", 100, 499),
+    ("500+", 500, None),
+]
+
+MAX_TOP_CITED = 100
+
+
+@ttl_cache(ANALYTICS_CACHE_TTL)
+def _summary():
+    db = SessionLocal()
+    try:
+        row = db.execute(select(
+            select(func.count()).select_from(ResearchPaper).scalar_subquery(),
+            select(func.count()).select_from(IPR).scalar_subquery(),
+            select(func.count()).select_from(Innovation).scalar_subquery(),
+            select(func.count()).select_from(Startup).scalar_subquery(),
+        )).one()
+        return dict(zip(["research", "ipr", "innovation", "startup"], row))
+    finally:
+        db.close()
+
+
+@ttl_cache(ANALYTICS_CACHE_TTL)
+def _group_counts(entity, field):
+    db = SessionLocal()
+    try:
+        if field == "year":
+            model, date_col = STAT_SOURCES[entity]
+            year = cast(extract("year", date_col), Integer)
+            rows = db.execute(
+                select(year, func.count()).select_from(model).group_by(year).order_by(year)
+            ).all()
+        else:
+            model, fields = GROUPABLE_FIELDS[entity]
+            column = fields[field]
+            rows = db.execute(
+                select(column, func.count())
+                .select_from(model)
+                .group_by(column)
+                .order_by(func.count().desc())
+            ).all()
+        return [{"value": value, "count": int(count or 0)} for value, count in rows]
+    finally:
+        db.close()
+
+
+@ttl_cache(ANALYTICS_CACHE_TTL)
+def _top_cited(limit):
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(
+                ResearchPaper.paper_id,
+                ResearchPaper.title,
+                ResearchPaper.citations,
+                ResearchPaper.user_id,
+                cast(extract("year", ResearchPaper.publication_date), Integer),
+            )
+            .where(ResearchPaper.citations.isnot(None))
+            .order_by(ResearchPaper.citations.desc())
+            .limit(limit)
+        ).all()
+        return [{
+            "paper_id": paper_id,
+            "title": title,
+            "citations": citations,
+            "user_id": user_id,
+            "year": year,
+        } for paper_id, title, citations, user_id, year in rows]
+    finally:
+        db.close()
+
+
+@ttl_cache(ANALYTICS_CACHE_TTL)
+def _citation_distribution():
+    db = SessionLocal()
+    try:
+        citations = func.coalesce(ResearchPaper.citations, 0)
+        bucket_columns = []
+        for label, low, high in CITATION_BUCKETS:
+            condition = citations >= low if high is None else citations.between(low, high)
+            bucket_columns.append(func.sum(case((condition, 1), else_=0)).label(label))
+
+        row = db.execute(select(
+            func.count(),
+            func.sum(citations),
+            func.avg(citations),
+            func.max(citations),
+            *bucket_columns,
+        ).select_from(ResearchPaper)).one()
+
+        total, citation_sum, citation_avg, citation_max = row[:4]
+        return {
+            "papers": int(total or 0),
+            "total_citations": int(citation_sum or 0),
+            "average_citations": round(float(citation_avg or 0), 2),
+            "max_citations": int(citation_max or 0),
+            "buckets": [
+                {"range": label, "count": int(count or 0)}
+                for (label, _, _), count in zip(CITATION_BUCKETS, row[4:])
+            ],
+        }
+    finally:
+        db.close()
+
+
+# Admin: totals per entity
+@analytics_bp.route("/summary", methods=["GET"])
+@token_required
+@role_required("admin")
+def get_summary():
+    return jsonify(_summary())
+
+
+# Admin: counts of an entity grouped by one field, e.g. /ipr/by/ipr_type or /research/by/year
+@analytics_bp.route("/<string:entity>/by/<string:field>", methods=["GET"])
+@token_required
+@role_required("admin")
+def get_group_counts(entity, field):
+    if entity not in GROUPABLE_FIELDS:
+        return jsonify({"error": f"Unknown entity: {entity}"}), 404
+
+    allowed_fields = list(GROUPABLE_FIELDS[entity][1]) + ["year"]
+    if field not in allowed_fields:
+        return jsonify({"error": f"Cannot group {entity} by {field}", "allowed_fields": allowed_fields}), 400
+
+    return jsonify({"entity": entity, "field": field, "groups": _group_counts(entity, field)})
+
+
+# Admin: most cited research papers
+@analytics_bp.route("/research/top-cited", methods=["GET"])
+@token_required
+@role_required("admin")
+def get_top_cited():
+    limit = request.args.get("limit", 10, type=int)
+    limit = max(1, min(limit, MAX_TOP_CITED))
+    return jsonify(_top_cited(limit))
+
+
+# Admin: histogram and summary statistics of research paper citations
+@analytics_bp.route("/research/citation-distribution", methods=["GET"])
+@token_required
+@role_required("admin")
+def get_citation_distribution():
+    return jsonify(_citation_distribution())
@@ -15,6 +15,9 @@ from models.users import User
 from models.IPR import IPR
 from models.research import ResearchPaper
 from utils.auth import token_required, role_required
+from utils.ratelimit import rate_limited
+from utils.stats import get_user_counts, get_all_user_counts, get_user_timeline, get_entity_totals
+from utils.querycheck import query_budget
 from datetime import datetime
 
 export_bp = Blueprint("export", __name__, url_prefix="/api/v1/export")
@@ -27,6 +30,13 @@ def get_db():
     finally:
         db.close()
 
+# Group ORM rows by their user_id
+def group_by_user(rows):
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row.user_id, []).append(row)
+    return grouped
+
 # Helper function to generate a chart
 def generate_chart(data, title, chart_type="bar"):
     plt.figure(figsize=(7, 4))
@@ -207,8 +217,10 @@ def generate_professional_report(user_data, title, charts=None):
 
 # Admin: Export all users data with detailed contributions
 @export_bp.route("/admin/all", methods=["GET"])
+@query_budget(10)
 @token_required
 @role_required("admin")
+@rate_limited("export")
 def export_all_users_data():
     db = next(get_db())
 
@@ -217,11 +229,13 @@ def export_all_users_data():
     if not users:
         return Response("No users found", status=404)
     
-    # Get total counts
-    total_iprs = db.query(IPR).count()
-    total_papers = db.query(ResearchPaper).count()
-    total_innovations = db.query(Innovation).count()
-    total_startups = db.query(Startup).count()
+    # Per-user counts from the stats table; the totals also count records without an owner
+    user_counts = get_all_user_counts(db)
+    totals = get_entity_totals(db)
+    total_iprs = totals["ipr"]
+    total_papers = totals["research"]
+    total_innovations = totals["innovation"]
+    total_startups = totals["startup"]
     
     # Get date for the report
     current_date = datetime.now().strftime("%d %B, %Y")
@@ -232,20 +246,28 @@ def export_all_users_data():
     # Store detailed data for all users
     all_users_detailed = {}
     
+    # Load each entity once for all users instead of four queries per user
+    user_ids = [user.user_id for user in users]
+    iprs_by_user = group_by_user(db.query(IPR).filter(IPR.user_id.in_(user_ids)).all())
+    papers_by_user = group_by_user(db.query(ResearchPaper).filter(ResearchPaper.user_id.in_(user_ids)).all())
+    innovations_by_user = group_by_user(db.query(Innovation).filter(Innovation.user_id.in_(user_ids)).all())
+    startups_by_user = group_by_user(db.query(Startup).filter(Startup.user_id.in_(user_ids)).all())
+
     for user in users:
-        user_iprs = db.query(IPR).filter_by(user_id=user.user_id).all()
-        user_papers = db.query(ResearchPaper).filter_by(user_id=user.user_id).all()
-        user_innovations = db.query(Innovation).filter_by(user_id=user.user_id).all()
-        user_startups = db.query(Startup).filter_by(user_id=user.user_id).all()
+        user_iprs = iprs_by_user.get(user.user_id, [])
+        user_papers = papers_by_user.get(user.user_id, [])
+        user_innovations = innovations_by_user.get(user.user_id, [])
+        user_startups = startups_by_user.get(user.user_id, [])
+        counts = user_counts.get(user.user_id, {"ipr": 0, "research": 0, "innovation": 0, "startup": 0})
         
         all_users_data.append({
             "name": user.name,
             "email": user.email,
-            "ipr_count": len(user_iprs),
-            "paper_count": len(user_papers),
-            "innovation_count": len(user_innovations),
-            "startup_count": len(user_startups),
-            "total_contributions": len(user_iprs) + len(user_papers) + len(user_innovations) + len(user_startups)
+            "ipr_count": counts["ipr"],
+            "paper_count": counts["research"],
+            "innovation_count": counts["innovation"],
+            "startup_count": counts["startup"],
+            "total_contributions": sum(counts.values())
         })
         
         # Store detailed data for this user
@@ -388,8 +410,10 @@ def export_all_users_data():
 
 # Admin: Export single user data by email
 @export_bp.route("/admin/user/<email>", methods=["GET"])
+@query_budget(9)
 @token_required
 @role_required("admin")
+@rate_limited("export")
 def export_user_data_by_admin(email):
     db = next(get_db())
     
@@ -404,11 +428,12 @@ def export_user_data_by_admin(email):
     user_innovations = db.query(Innovation).filter_by(user_id=user.user_id).all()
     user_startups = db.query(Startup).filter_by(user_id=user.user_id).all()
     
-    # Get counts
-    ipr_count = len(user_iprs)
-    paper_count = len(user_papers)
-    innovation_count = len(user_innovations)
-    startup_count = len(user_startups)
+    # Get counts from the stats table
+    counts = get_user_counts(db, user.user_id)
+    ipr_count = counts["ipr"]
+    paper_count = counts["research"]
+    innovation_count = counts["innovation"]
+    startup_count = counts["startup"]
     
     # Get date for the report
     current_date = datetime.now().strftime("%d %B, %Y")
@@ -423,23 +448,8 @@ def export_user_data_by_admin(email):
     
     pie_chart = generate_chart(contribution_data, f"{user.name}'s Contribution Distribution", "pie")
     
-    # Prepare timeline data if dates are available
-    timeline_data = {}
-    
-    # Add data with dates to timeline
-    for ipr in user_iprs:
-        if ipr.filing_date:
-            year = ipr.filing_date.year
-            if year not in timeline_data:
-                timeline_data[year] = {"IPRs": 0, "Papers": 0, "Innovations": 0, "Startups": 0}
-            timeline_data[year]["IPRs"] += 1
-            
-    for paper in user_papers:
-        if paper.publication_date:
-            year = paper.publication_date.year
-            if year not in timeline_data:
-                timeline_data[year] = {"IPRs": 0, "Papers": 0, "Innovations": 0, "Startups": 0}
-            timeline_data[year]["Papers"] += 1
+    # Prepare timeline data from the per-year stats
+    timeline_data = get_user_timeline(db, user.user_id, entities=["ipr", "research"])
     
     # Generate timeline chart if we have timeline data
     timeline_chart = None
@@ -447,8 +457,8 @@ def export_user_data_by_admin(email):
         plt.figure(figsize=(8, 4))
         years = sorted(timeline_data.keys())
         
-        iprs = [timeline_data[year]["IPRs"] for year in years]
-        papers = [timeline_data[year]["Papers"] for year in years]
+        iprs = [timeline_data[year]["ipr"] for year in years]
+        papers = [timeline_data[year]["research"] for year in years]
         
         plt.plot(years, iprs, marker='o', label='IPRs')
         plt.plot(years, papers, marker='s', label='Papers')
@@ -540,7 +550,9 @@ def export_user_data_by_admin(email):
 
 # User: Export own data
 @export_bp.route("/user", methods=["GET"])
+@query_budget(9)
 @token_required
+@rate_limited("export")
 def export_own_data():
     db = next(get_db())
     user_id = request.user["id"]
@@ -556,11 +568,12 @@ def export_own_data():
     user_innovations = db.query(Innovation).filter_by(user_id=user_id).all()
     user_startups = db.query(Startup).filter_by(user_id=user_id).all()
     
-    # Get counts
-    ipr_count = len(user_iprs)
-    paper_count = len(user_papers)
-    innovation_count = len(user_innovations)
-    startup_count = len(user_startups)
+    # Get counts from the stats table
+    counts = get_user_counts(db, user.user_id)
+    ipr_count = counts["ipr"]
+    paper_count = counts["research"]
+    innovation_count = counts["innovation"]
+    startup_count = counts["startup"]
     
     # Get date for the report
     current_date = datetime.now().strftime("%d %B, %Y")
@@ -575,23 +588,8 @@ def export_own_data():
     
     pie_chart = generate_chart(contribution_data, "My Contribution Distribution", "pie")
     
-    # Prepare timeline data if dates are available (consistent with admin view)
-    timeline_data = {}
-    
-    # Add data with dates to timeline
-    for ipr in user_iprs:
-        if ipr.filing_date:
-            year = ipr.filing_date.year
-            if year not in timeline_data:
-                timeline_data[year] = {"IPRs": 0, "Papers": 0, "Innovations": 0, "Startups": 0}
-            timeline_data[year]["IPRs"] += 1
-            
-    for paper in user_papers:
-        if paper.publication_date:
-            year = paper.publication_date.year
-            if year not in timeline_data:
-                timeline_data[year] = {"IPRs": 0, "Papers": 0, "Innovations": 0, "Startups": 0}
-            timeline_data[year]["Papers"] += 1
+    # Prepare timeline data from the per-year stats (consistent with admin view)
+    timeline_data = get_user_timeline(db, user.user_id, entities=["ipr", "research"])
     
     # Generate timeline chart if we have timeline data
     timeline_chart = None
@@ -599,8 +597,8 @@ def export_own_data():
         plt.figure(figsize=(8, 4))
         years = sorted(timeline_data.keys())
         
-        iprs = [timeline_data[year]["IPRs"] for year in years]
-        papers = [timeline_data[year]["Papers"] for year in years]
+        iprs = [timeline_data[year]["ipr"] for year in years]
+        papers = [timeline_data[year]["research"] for year in years]
         
         plt.plot(years, iprs, marker='o', label='IPRs')
         plt.plot(years, papers, marker='s', label='Papers')
@@ -0,0 +1,125 @@
+from flask import Blueprint, jsonify
+from sqlalchemy import text
+from datetime import datetime, timezone
+import threading
+import time
+from database import engine, replicas
+from config import SUPABASE_URL, SUPABASE_KEY, AUTH_BACKEND, HEALTH_CACHE_TTL, HEALTH_CHECK_TIMEOUT
+from utils.cache import TTLCache, cache_stats
+from utils.metrics import track_external
+from utils.http import http
+from utils.pooling import engine_options
+
+health_bp = Blueprint("health", __name__)
+
+# Probe results are reused for HEALTH_CACHE_TTL seconds so frequent load balancer
+# checks do not add load to the database or Supabase
+_probe_cache = TTLCache(HEALTH_CACHE_TTL, max_entries=1)
+_probe_lock = threading.Lock()
+
+
+def pool_stats():
+    """Connection pool usage; NullPool and friends do not expose these counters"""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"class": type(pool).__name__}
+    capacity = pool.size() + max(engine_options(engine.url).get("max_overflow", 0), 0)
+    checked_out = pool.checkedout()
+    return {
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": checked_out,
+        "overflow": pool.overflow(),
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 2) if capacity else None,
+    }
+
+
+def check_database():
+    stats = pool_stats()
+    # An exhausted pool would make the probe itself wait for pool_timeout
+    if stats.get("capacity") and stats["checked_out"] >= stats["capacity"]:
+        return {"ok": False, "error": "connection pool exhausted", "pool": stats}
+
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return {"ok": False, "error": str(e), "pool": stats}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 1), "pool": stats}
+
+
+def check_auth():
+    if AUTH_BACKEND == "local":
+        return {"ok": True, "backend": "local"}
+    if not SUPABASE_URL:
+        return {"ok": False, "error": "SUPABASE_URL not configured"}
+
+    start = time.perf_counter()
+    try:
+        with track_external("supabase"):
+            response = http.get(
+                f"{SUPABASE_URL.rstrip('/')}/auth/v1/health",
+                headers={"apikey": SUPABASE_KEY or ""},
+                timeout=HEALTH_CHECK_TIMEOUT,
+            )
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+    latency_ms = round((time.perf_counter() - start) * 1000, 1)
+    if response.status_code >= 500:
+        return {"ok": False, "status_code": response.status_code, "latency_ms": latency_ms}
+    return {"ok": True, "status_code": response.status_code, "latency_ms": latency_ms}
+
+
+def check_replicas():
+    # Lagging or unreachable replicas only mean reads fall back to the primary
+    replicas.refresh()
+    return {
+        "ok": True,
+        "configured": len(replicas.engines),
+        "healthy": len(replicas.healthy_engines()),
+        "lag_seconds": {engine.url.render_as_string(hide_password=True): replicas.lag.get(str(engine.url))
+                        for engine in replicas.engines},
+    }
+
+
+def run_probes():
+    checks = {
+        "database": check_database(),
+        "auth": check_auth(),
+        "cache": {"ok": True, "entries": cache_stats()},
+    }
+    if replicas.engines:
+        checks["replicas"] = check_replicas()
+    return {
+        "status": "ready" if all(c["ok"] for c in checks.values()) else "unavailable",
+        "checks": checks,
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+# Liveness: the worker is up and serving requests. Never touches dependencies.
+@health_bp.route("/health", methods=["GET"])
+@health_bp.route("/health/live", methods=["GET"])
+def health_check():
+    return jsonify({"status": "healthy"})
+
+
+# Readiness: dependencies reachable and the pool has room for more requests
+@health_bp.route("/health/ready", methods=["GET"])
+def readiness_check():
+    result = _probe_cache.get("ready")
+    cached = result is not None
+    if result is None:
+        with _probe_lock:
+            # Another request may have refreshed the result while we waited
+            result = _probe_cache.get("ready")
+            cached = result is not None
+            if result is None:
+                result = run_probes()
+                _probe_cache.set("ready", result)
+
+    status_code = 200 if result["status"] == "ready" else 503
+    return jsonify(dict(result, cached=cached)), status_code
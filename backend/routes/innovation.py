@@ -2,6 +2,12 @@ from flask import Blueprint, request, jsonify
 from models.innovation import Innovation
 from database import SessionLocal
 from utils.auth import token_required, role_required
+from utils.querycheck import query_budget
+from utils.stats import refresh_user_stats
+from utils.response_cache import cached_response, invalidate_responses
+from utils.sync import delta_response
+from utils.bulk import bulk_delete, bulk_delete_response
+from utils.updates import update_owned_record, parse_version
 
 innovation_bp = Blueprint("innovations", __name__, url_prefix="/api/v1/innovations")
 
@@ -13,11 +19,30 @@ def get_db():
     finally:
         db.close()
 
+def innovation_to_json(i):
+    return {
+        "innovation_id": i.innovation_id,
+        "title": i.title,
+        "description": i.description,
+        "domain": i.domain,
+        "level": i.level,
+        "status": i.status,
+        "submitted_on": str(i.submitted_on),
+        "user_id": str(i.user_id),
+        "updated_at": str(i.updated_at) if i.updated_at else None,
+    }
+
 # Admin or User: View innovations
 @innovation_bp.route("/", methods=["GET"])
+@query_budget(4)
 @token_required
+@cached_response("innovations")
 def get_all_innovations():
     db = next(get_db())
+    # Incremental sync: only what changed since the client's last sync
+    if "updated_since" in request.args:
+        return delta_response(db, Innovation, Innovation.innovation_id, "innovation", innovation_to_json, request.user)
+
     role = request.user["role"]
     user_id = request.user["id"]
 
@@ -26,16 +51,7 @@ def get_all_innovations():
     else:
         innovations = db.query(Innovation).filter(Innovation.user_id == user_id).all()
 
-    return jsonify([{
-        "innovation_id": i.innovation_id,
-        "title": i.title,
-        "description": i.description,
-        "domain": i.domain,
-        "level": i.level,
-        "status": i.status,
-        "submitted_on": str(i.submitted_on),
-        "user_id": str(i.user_id),
-    } for i in innovations])
+    return jsonify([innovation_to_json(i) for i in innovations])
 
 # Add innovation
 @innovation_bp.route("/add-innovation", methods=["POST"])
@@ -55,7 +71,9 @@ def add_innovation():
     )
 
     db.add(new_innovation)
+    refresh_user_stats(db, user_id)
     db.commit()
+    invalidate_responses(user_id, "innovations", "profile")
     db.refresh(new_innovation)
 
     return jsonify({"message": "Innovation created", "innovation_id": new_innovation.innovation_id})
@@ -66,28 +84,34 @@ def add_innovation():
 @role_required("admin")
 def update_innovation(innovation_id):
     db = next(get_db())
-    user_id = request.user["id"]
-    role = request.user["role"]
-
-    innovation = db.query(Innovation).filter(Innovation.innovation_id == innovation_id).first()
-    if not innovation:
-        return jsonify({"error": "Innovation not found"}), 404
-
-    if role != "admin" and innovation.user_id != user_id:
-        return jsonify({"error": "Unauthorized"}), 403
-
     data = request.json
+
+    # `updated_at` is not writable: it carries the version the client last saw
     allowed_fields = ["title", "description", "domain", "level", "status"]
+    values = {}
     for key, value in data.items():
         if key in allowed_fields:
-            setattr(innovation, key, value)
-        else:
+            values[key] = value
+        elif key != "updated_at":
             return jsonify({"error": f"Invalid Field - Cannot update: {key}"}), 400
 
+    try:
+        expected_updated_at = parse_version(data.get("updated_at"))
+    except ValueError:
+        return jsonify({"error": "Invalid updated_at"}), 400
+
+    innovation, error = update_owned_record(
+        db, Innovation, Innovation.innovation_id, innovation_id, values, request.user,
+        expected_updated_at=expected_updated_at, not_found="Innovation not found"
+    )
+    if error:
+        db.rollback()
+        return error
+
     db.commit()
-    db.refresh(innovation)
+    invalidate_responses(innovation.user_id, "innovations")
 
-    return jsonify({"message": "Innovation updated"})
+    return jsonify({"message": "Innovation updated", "updated_at": str(innovation.updated_at) if innovation.updated_at else None})
 
 # Delete innovation (Admin only)
 @innovation_bp.route("/delete-innovation/<int:innovation_id>", methods=["DELETE"])
@@ -95,11 +119,15 @@ def update_innovation(innovation_id):
 @role_required("admin")
 def delete_innovation(innovation_id):
     db = next(get_db())
-    innovation = db.query(Innovation).filter(Innovation.innovation_id == innovation_id).first()
-    if not innovation:
+    result = bulk_delete(db, "innovation", [innovation_id])
+    if not result["deleted"]:
         return jsonify({"error": "Innovation not found"}), 404
-
-    db.delete(innovation)
-    db.commit()
-
     return jsonify({"message": "Innovation deleted"})
+
+# Bulk delete innovations (Admin only); large batches run as a background job
+@innovation_bp.route("/bulk-delete", methods=["POST"])
+@token_required
+@role_required("admin")
+def bulk_delete_innovations():
+    db = next(get_db())
+    return bulk_delete_response(db, "innovation")
@@ -1,14 +1,28 @@
 from flask import Blueprint, request, jsonify
 from database import supabase
 from models.research import ResearchPaper
+from models.author import Author, PaperAuthor
 from database import SessionLocal
 from utils.auth import token_required, role_required
+from utils.ratelimit import rate_limited
+from utils.singleflight import coalesced
+from utils.querycheck import query_budget
+from utils.stats import refresh_user_stats
+from utils.response_cache import cached_response, invalidate_responses
+from utils.sync import delta_response
+from utils.bulk import bulk_delete, bulk_delete_response
+from utils.updates import update_owned_record, parse_version
+from utils.metrics import track_external
+from utils.authors import normalize_author_name, sync_paper_authors
+from utils.dedup import find_duplicates, index_paper_signature
+from config import REJECT_DUPLICATE_PAPERS
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import datetime
 import time
 import random
 import os
-import requests
+from utils.http import http
 
 research_bp = Blueprint("research", __name__, url_prefix="/api/v1/research")
 
@@ -16,6 +30,7 @@ research_bp = Blueprint("research", __name__, url_prefix="/api/v1/research")
 SERPAPI_KEY = os.getenv("SERPAPI_KEY", "serpapi_key_here")
 SERPAPI_BASE_URL = "https://serpapi.com/search"
 
+@coalesced("serpapi_search")
 def serpapi_search_author(author_name, num_results=10):
     """Search for author using SerpAPI Google Scholar API"""
     params = {
@@ -26,7 +41,8 @@ def serpapi_search_author(author_name, num_results=10):
     }
     
     try:
-        response = requests.get(SERPAPI_BASE_URL, params=params)
+        with track_external("serpapi"):
+            response = http.get(SERPAPI_BASE_URL, params=params)
         if response.status_code == 200:
             return response.json()
         else:
@@ -34,6 +50,7 @@ def serpapi_search_author(author_name, num_results=10):
     except Exception as e:
         return None
 
+@coalesced("serpapi_author")
 def serpapi_get_author_details(author_id):
     """Get detailed author information using SerpAPI"""
     params = {
@@ -43,7 +60,8 @@ def serpapi_get_author_details(author_id):
     }
     
     try:
-        response = requests.get(SERPAPI_BASE_URL, params=params)
+        with track_external("serpapi"):
+            response = http.get(SERPAPI_BASE_URL, params=params)
         if response.status_code == 200:
             return response.json()
         else:
@@ -106,6 +124,7 @@ def format_serpapi_paper(p, scholar_id=None):
 # Search by name
 @research_bp.route("/fetch-by-name", methods=["GET"])
 @token_required
+@rate_limited("scholar")
 def fetch_by_name():
     name = request.args.get("name")
     if not name:
@@ -190,6 +209,7 @@ def fetch_by_name():
 # Search by Scholar ID
 @research_bp.route("/fetch-by-id/<string:scholar_id>", methods=["GET"])
 @token_required
+@rate_limited("scholar")
 def fetch_by_scholar_id(scholar_id):
     try:
         if not SERPAPI_KEY or SERPAPI_KEY == "your_serpapi_key_here":
@@ -231,11 +251,31 @@ def fetch_by_scholar_id(scholar_id):
     except Exception as e:
         return jsonify({"error": "Failed to fetch data"}), 500
 
+def paper_to_json(p):
+    return {
+        "paper_id": p.paper_id,
+        "title": p.title,
+        "abstract": p.abstract,
+        "authors": p.authors,
+        "publication_date": str(p.publication_date) if p.publication_date else None,
+        "doi": p.doi,
+        "status": p.status,
+        "created_at": str(p.created_at) if p.created_at else None,
+        "updated_at": str(p.updated_at) if p.updated_at else None,
+        "user_id": p.user_id,
+    }
+
 # Database operations
 @research_bp.route("/", methods=["GET"])
+@query_budget(4)
 @token_required
+@cached_response("research")
 def get_all_research_papers():
     db = next(get_db())
+    # Incremental sync: only what changed since the client's last sync
+    if "updated_since" in request.args:
+        return delta_response(db, ResearchPaper, ResearchPaper.paper_id, "research", paper_to_json, request.user)
+
     role = request.user["role"]
     user_id = request.user["id"]
 
@@ -244,18 +284,71 @@ def get_all_research_papers():
     else:
         papers = db.query(ResearchPaper).filter(ResearchPaper.user_id == user_id).all()
 
+    return jsonify([paper_to_json(p) for p in papers])
+
+# Papers by an author, using the normalized author index
+@research_bp.route("/by-author", methods=["GET"])
+@token_required
+def get_papers_by_author():
+    name = request.args.get("name")
+    if not name or not normalize_author_name(name):
+        return jsonify({"error": "Please provide an author name"}), 400
+
+    db = next(get_db())
+    query = (
+        db.query(ResearchPaper)
+        .join(PaperAuthor, PaperAuthor.paper_id == ResearchPaper.paper_id)
+        .join(Author, Author.author_id == PaperAuthor.author_id)
+        .filter(Author.normalized_name == normalize_author_name(name))
+    )
+    if request.user["role"] != "admin":
+        query = query.filter(ResearchPaper.user_id == request.user["id"])
+
     return jsonify([{
         "paper_id": p.paper_id,
         "title": p.title,
-        "abstract": p.abstract,
         "authors": p.authors,
         "publication_date": str(p.publication_date) if p.publication_date else None,
         "doi": p.doi,
         "status": p.status,
-        "created_at": str(p.created_at) if p.created_at else None,
-        "updated_at": str(p.updated_at) if p.updated_at else None,
+        "citations": p.citations,
         "user_id": p.user_id,
-    } for p in papers])
+    } for p in query.all()])
+
+# Co-authors of an author with the number of shared papers
+@research_bp.route("/coauthors", methods=["GET"])
+@token_required
+def get_coauthors():
+    name = request.args.get("name")
+    if not name or not normalize_author_name(name):
+        return jsonify({"error": "Please provide an author name"}), 400
+
+    db = next(get_db())
+    author_papers = (
+        db.query(PaperAuthor.paper_id)
+        .join(Author, Author.author_id == PaperAuthor.author_id)
+        .filter(Author.normalized_name == normalize_author_name(name))
+    )
+    if request.user["role"] != "admin":
+        author_papers = author_papers.join(
+            ResearchPaper, ResearchPaper.paper_id == PaperAuthor.paper_id
+        ).filter(ResearchPaper.user_id == request.user["id"])
+
+    coauthors = (
+        db.query(Author.author_id, Author.name, func.count(PaperAuthor.paper_id).label("shared_papers"))
+        .join(PaperAuthor, PaperAuthor.author_id == Author.author_id)
+        .filter(PaperAuthor.paper_id.in_(author_papers.scalar_subquery()))
+        .filter(Author.normalized_name != normalize_author_name(name))
+        .group_by(Author.author_id, Author.name)
+        .order_by(func.count(PaperAuthor.paper_id).desc())
+        .all()
+    )
+
+    return jsonify([{
+        "author_id": c.author_id,
+        "name": c.name,
+        "shared_papers": c.shared_papers,
+    } for c in coauthors])
 
 @research_bp.route("/add-paper", methods=["POST"])
 @token_required
@@ -264,6 +357,20 @@ def add_research_paper():
     data = request.json
     user_id = request.user["id"]
 
+    # Likely duplicates are reported; with REJECT_DUPLICATE_PAPERS they are refused
+    # unless the client confirms with "allow_duplicate" (body or query string).
+    # Both accept true, "true" or "1"; "false", "0" and the like do not skip the check.
+    flag = data.get("allow_duplicate", request.args.get("allow_duplicate", ""))
+    allow_duplicate = flag is True or str(flag).lower() in ("1", "true")
+    duplicates = [] if allow_duplicate else find_duplicates(
+        db, user_id, data.get("title"), doi=data.get("doi"), scholar_id=data.get("scholar_id")
+    )
+    if duplicates and REJECT_DUPLICATE_PAPERS:
+        return jsonify({
+            "error": "Possible duplicate research paper",
+            "duplicates": duplicates
+        }), 409
+
     new_paper = ResearchPaper(
         title=data.get("title"),
         abstract=data.get("abstract"),
@@ -271,52 +378,78 @@ def add_research_paper():
         publication_date=data.get("publication_date"),
         doi=data.get("doi"),
         status=data.get("status"),
+        citations=data.get("citations"),
+        scholar_id=data.get("scholar_id"),
+        source=data.get("source", "manual"),
         created_at=data.get("created_at"),
-        updated_at=data.get("updated_at"),
         user_id=user_id
     )
     db.add(new_paper)
+    db.flush()
+    sync_paper_authors(db, new_paper.paper_id, new_paper.authors)
+    index_paper_signature(db, new_paper.paper_id, user_id, new_paper.title)
+    refresh_user_stats(db, user_id)
     db.commit()
+    invalidate_responses(user_id, "research", "profile")
     db.refresh(new_paper)
 
-    return jsonify({"message": "Research paper created", "paper_id": new_paper.paper_id})
+    return jsonify({"message": "Research paper created", "paper_id": new_paper.paper_id,
+                    "possible_duplicates": duplicates})
 
 @research_bp.route("/update-paper/<int:paper_id>", methods=["PUT"])
 @token_required
 def update_research_paper(paper_id):
     db = next(get_db())
-    user_id = request.user["id"]
-    role = request.user["role"]
-
-    paper = db.query(ResearchPaper).filter(ResearchPaper.paper_id == paper_id).first()
-    if not paper:
-        return jsonify({"error": "Research paper not found"}), 404
-
-    if role != "admin" and paper.user_id != user_id:
-        return jsonify({"error": "Unauthorized"}), 403
-
     data = request.json
-    allowed_fields = ["title", "abstract", "authors", "publication_date", "doi", "status", "created_at", "updated_at"]
+
+    # `updated_at` is not writable: it carries the version the client last saw
+    allowed_fields = ["title", "abstract", "authors", "publication_date", "doi", "status"]
+    values = {}
     for key, value in data.items():
         if key in allowed_fields:
-            setattr(paper, key, value)
-        else:
+            values[key] = value
+        elif key != "updated_at":
             return jsonify({"error": f"Invalid Field - Cannot update: {key}"}), 400
 
+    try:
+        expected_updated_at = parse_version(data.get("updated_at"))
+    except ValueError:
+        return jsonify({"error": "Invalid updated_at"}), 400
+
+    paper, error = update_owned_record(
+        db, ResearchPaper, ResearchPaper.paper_id, paper_id, values, request.user,
+        expected_updated_at=expected_updated_at, not_found="Research paper not found"
+    )
+    if error:
+        db.rollback()
+        return error
+
+    if "authors" in values:
+        sync_paper_authors(db, paper.paper_id, paper.authors)
+    if "title" in values:
+        index_paper_signature(db, paper.paper_id, paper.user_id, paper.title)
+    # The yearly stats only depend on the date column
+    if "publication_date" in values:
+        refresh_user_stats(db, paper.user_id)
     db.commit()
-    db.refresh(paper)
+    invalidate_responses(paper.user_id, "research")
 
-    return jsonify({"message": "Research paper updated"})
+    return jsonify({"message": "Research paper updated", "updated_at": str(paper.updated_at) if paper.updated_at else None})
 
 @research_bp.route("/delete-paper/<int:paper_id>", methods=["DELETE"])
 @token_required
 @role_required("admin")
 def delete_research_paper(paper_id):
     db = next(get_db())
-    paper = db.query(ResearchPaper).filter(ResearchPaper.paper_id == paper_id).first()
-    if not paper:
+    result = bulk_delete(db, "research", [paper_id])
+    if not result["deleted"]:
         return jsonify({"error": "Research paper not found"}), 404
-
-    db.delete(paper)
-    db.commit()
     return jsonify({"message": "Research paper deleted"})
+
+# Bulk delete research papers (Admin only); large batches run as a background job
+@research_bp.route("/bulk-delete", methods=["POST"])
+@token_required
+@role_required("admin")
+def bulk_delete_research_papers():
+    db = next(get_db())
+    return bulk_delete_response(db, "research")
@@ -1,9 +1,19 @@
 from flask import Blueprint, request, jsonify
 from database import supabase
 from models.startup import Startup
+from models.IPR import IPR
 from database import SessionLocal
 from utils.auth import token_required, role_required
-from sqlalchemy.orm import Session
+from utils.querycheck import query_budget
+from utils.stats import refresh_user_stats
+from utils.response_cache import cached_response, invalidate_responses
+from utils.sync import delta_response
+from utils.bulk import bulk_delete, bulk_delete_response
+from utils.updates import update_owned_record, parse_version
+from utils.pagination import page_args, paginate, page_meta, MAX_PAGE_SIZE
+from routes.IPR import ipr_to_json
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session, aliased, with_parent
 
 startup_bp = Blueprint("startups", __name__, url_prefix="/api/v1/startups")
 
@@ -15,11 +25,30 @@ def get_db():
     finally:
         db.close()
 
+def startup_to_json(s):
+    return {
+        "startup_id": s.startup_id,
+        "name": s.name,
+        "description": s.description,
+        "founder": s.founder,
+        "industry": s.industry,
+        "status": s.status,
+        "founded_date": str(s.founded_date),
+        "user_id": str(s.user_id),
+        "updated_at": str(s.updated_at) if s.updated_at else None,
+    }
+
 # Admin or User: View startups
 @startup_bp.route("/", methods=["GET"])
+@query_budget(4)
 @token_required
+@cached_response("startups")
 def get_all_startups():
     db = next(get_db())
+    # Incremental sync: only what changed since the client's last sync
+    if "updated_since" in request.args:
+        return delta_response(db, Startup, Startup.startup_id, "startup", startup_to_json, request.user)
+
     role = request.user["role"]  # Accessing user role from the updated user dictionary
     user_id = request.user["id"]  # Accessing user ID from the updated user dictionary
 
@@ -29,16 +58,71 @@ def get_all_startups():
         # Show only the startups created by the authenticated user
         startups = db.query(Startup).filter(Startup.user_id == user_id).all()
 
-    return jsonify([{
-        "startup_id": s.startup_id,
-        "name": s.name,
-        "description": s.description,
-        "founder": s.founder,
-        "industry": s.industry,
-        "status": s.status,
-        "founded_date": str(s.founded_date),
-        "user_id": str(s.user_id),
-    } for s in startups])
+    return jsonify([startup_to_json(s) for s in startups])
+
+def _visible_iprs(query, user):
+    """IPRs a user may see: all for admins, otherwise only their own"""
+    if user["role"] != "admin":
+        query = query.filter(IPR.user_id == user["id"])
+    return query
+
+# Admin or owner: one startup with a page of its IPRs (?ipr_page=&ipr_per_page=)
+@startup_bp.route("/<int:startup_id>", methods=["GET"])
+@query_budget(4)
+@token_required
+def get_startup(startup_id):
+    db = next(get_db())
+    startup = db.get(Startup, startup_id)
+    if not startup or (request.user["role"] != "admin" and startup.user_id != request.user["id"]):
+        return jsonify({"error": "Startup not found"}), 404
+
+    page, per_page = page_args("ipr_")
+    iprs = _visible_iprs(db.query(IPR).filter(with_parent(startup, Startup.iprs)), request.user)
+    total = iprs.count()
+    items = paginate(iprs.order_by(IPR.ipr_id), page, per_page).all()
+
+    data = startup_to_json(startup)
+    data["iprs"] = {"items": [ipr_to_json(i) for i in items], **page_meta(page, per_page, total)}
+    return jsonify(data)
+
+# Admin or User: a page of startups, each with its first `ipr_limit` IPRs and IPR count
+@startup_bp.route("/with-iprs", methods=["GET"])
+@query_budget(5)
+@token_required
+def get_startups_with_iprs():
+    db = next(get_db())
+    page, per_page = page_args()
+    ipr_limit = max(1, min(request.args.get("ipr_limit", 5, type=int), MAX_PAGE_SIZE))
+
+    startups = db.query(Startup)
+    if request.user["role"] != "admin":
+        startups = startups.filter(Startup.user_id == request.user["id"])
+    total = startups.count()
+    startups = paginate(startups.order_by(Startup.startup_id), page, per_page).all()
+
+    nested, ipr_totals = {}, {}
+    startup_ids = [s.startup_id for s in startups]
+    if startup_ids:
+        # The first `ipr_limit` IPRs of every startup on the page in one windowed query
+        rank = func.row_number().over(partition_by=IPR.related_startup_id, order_by=IPR.ipr_id).label("rank")
+        ranked = _visible_iprs(db.query(IPR, rank).filter(IPR.related_startup_id.in_(startup_ids)), request.user).subquery()
+        ranked_ipr = aliased(IPR, ranked)
+        for ipr in db.scalars(select(ranked_ipr).where(ranked.c.rank <= ipr_limit).order_by(ranked_ipr.ipr_id)):
+            nested.setdefault(ipr.related_startup_id, []).append(ipr_to_json(ipr))
+
+        counts = _visible_iprs(
+            db.query(IPR.related_startup_id, func.count()).filter(IPR.related_startup_id.in_(startup_ids)),
+            request.user,
+        ).group_by(IPR.related_startup_id)
+        ipr_totals = dict(counts.all())
+
+    items = []
+    for s in startups:
+        data = startup_to_json(s)
+        data["iprs"] = nested.get(s.startup_id, [])
+        data["ipr_total"] = ipr_totals.get(s.startup_id, 0)
+        items.append(data)
+    return jsonify({"items": items, **page_meta(page, per_page, total)})
 
 # Add startup
 @startup_bp.route("/add-startup", methods=["POST"])
@@ -58,7 +142,9 @@ def add_startup():
         user_id=user_id
     )
     db.add(new_startup)
+    refresh_user_stats(db, user_id)
     db.commit()
+    invalidate_responses(user_id, "startups", "profile")
     db.refresh(new_startup)
 
     return jsonify({"message": "Startup created", "startup_id": new_startup.startup_id})
@@ -69,31 +155,37 @@ def add_startup():
 @role_required("admin")
 def update_startup(startup_id):
     db = next(get_db())
-    user_id = request.user["id"]
-    role = request.user["role"]
-    print(user_id, role)
-
-    startup = db.query(Startup).filter(Startup.startup_id == startup_id).first()
-    if not startup:
-        return jsonify({"error": "Startup not found"}), 404
-
-    # Only admin or the owner of the startup can update it
-    if role != "admin" and startup.user_id != user_id:
-        return jsonify({"error": "Unauthorized"}), 403
-
     data = request.json
-    print(data)
+
+    # `updated_at` is not writable: it carries the version the client last saw
     allowed_fields = ["name", "description", "founder", "industry", "founded_date", "status"]
+    values = {}
     for key, value in data.items():
         if key in allowed_fields:
-            setattr(startup, key, value)
-        else:
+            values[key] = value
+        elif key != "updated_at":
             return jsonify({"error": f"Invalid Field - Cannot update: {key}"}), 400
 
+    try:
+        expected_updated_at = parse_version(data.get("updated_at"))
+    except ValueError:
+        return jsonify({"error": "Invalid updated_at"}), 400
+
+    startup, error = update_owned_record(
+        db, Startup, Startup.startup_id, startup_id, values, request.user,
+        expected_updated_at=expected_updated_at, not_found="Startup not found"
+    )
+    if error:
+        db.rollback()
+        return error
+
+    # The yearly stats only depend on the date column
+    if "founded_date" in values:
+        refresh_user_stats(db, startup.user_id)
     db.commit()
-    db.refresh(startup)
+    invalidate_responses(startup.user_id, "startups")
 
-    return jsonify({"message": "Startup updated"})
+    return jsonify({"message": "Startup updated", "updated_at": str(startup.updated_at) if startup.updated_at else None})
 
 # Delete startup (Admin only)
 @startup_bp.route("/delete-startup/<int:startup_id>", methods=["DELETE"])
@@ -101,10 +193,15 @@ def update_startup(startup_id):
 @role_required("admin")
 def delete_startup(startup_id):
     db = next(get_db())
-    startup = db.query(Startup).filter(Startup.startup_id == startup_id).first()
-    if not startup:
+    result = bulk_delete(db, "startup", [startup_id])
+    if not result["deleted"]:
         return jsonify({"error": "Startup not found"}), 404
-
-    db.delete(startup)
-    db.commit()
     return jsonify({"message": "Startup deleted"})
+
+# Bulk delete startups (Admin only); large batches run as a background job
+@startup_bp.route("/bulk-delete", methods=["POST"])
+@token_required
+@role_required("admin")
+def bulk_delete_startups():
+    db = next(get_db())
+    return bulk_delete_response(db, "startup")
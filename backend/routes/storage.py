@@ -0,0 +1,33 @@
+from flask import Blueprint, request, jsonify, send_from_directory
+from utils.storage import get_bucket, BUCKET_SIZE_LIMITS
+from utils.uploads import UploadRejected
+
+# Stand-in for the storage service when STORAGE_BACKEND=local: accepts uploads to
+# signed URLs and serves the stored files (registered only for the local backend)
+storage_bp = Blueprint("storage", __name__, url_prefix="/api/v1/storage")
+
+@storage_bp.route("/<bucket>/<path:path>", methods=["PUT"])
+def upload_object(bucket, path):
+    if bucket not in BUCKET_SIZE_LIMITS:
+        return jsonify({"error": "Not found"}), 404
+    store = get_bucket(bucket)
+    if not store.verify(path, request.args.get("expires"), request.args.get("signature")):
+        return jsonify({"error": "Invalid or expired upload URL"}), 403
+
+    # Refuse oversized bodies before reading them when the client sent a length
+    if store.max_bytes is not None and (request.content_length or 0) > store.max_bytes:
+        return jsonify({"error": "File is too large"}), 413
+    try:
+        store.save(path, request.stream)
+    except UploadRejected as e:
+        return jsonify({"error": str(e)}), e.status_code
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"path": path}), 201
+
+@storage_bp.route("/<bucket>/<path:path>", methods=["GET"])
+def get_object(bucket, path):
+    # Only configured buckets: the name is part of the directory files are served from
+    if bucket not in BUCKET_SIZE_LIMITS:
+        return jsonify({"error": "Not found"}), 404
+    return send_from_directory(get_bucket(bucket).root, path)
@@ -6,22 +6,44 @@ from models.startup import Startup
 from models.IPR import IPR
 from models.innovation import Innovation
 from models.research import ResearchPaper
-from database import SessionLocal
+from database import SessionLocal, upsert_insert
 from sqlalchemy.orm import Session
-from utils.auth import token_required,role_required
+from utils.auth import token_required, role_required, verify_token, user_identity, remember_token, forget_token, forget_users
+from utils.querycheck import query_budget
+from utils.stats import get_user_counts
+from utils.metrics import track_external
+from utils.response_cache import cached_response, invalidates_responses, invalidate_responses
 from werkzeug.utils import secure_filename
 from datetime import datetime
 from os import environ
-import requests
+from utils.http import http
+from utils.singleflight import coalesced
+from utils.pagination import page_args, paginate, page_meta
+from routes.research import paper_to_json
+from routes.IPR import ipr_to_json
+from routes.innovation import innovation_to_json
+from routes.startup import startup_to_json
+from sqlalchemy.orm import with_parent
+from sqlalchemy import select, update, delete, func, union_all, literal, cast, case, String
+from utils.storage import get_bucket
+from utils.uploads import UploadRejected, spool_upload, store_id_card
+from utils.jobs import submit_job
+from utils.verification import utcnow
+from config import ID_CARD_MAX_BYTES
 import os
+import uuid
 
 user_bp = Blueprint("users", __name__, url_prefix="/api/v1/users")
 ADMIN_SECRET_KEY = environ.get("ADMIN_SECRET")
+# Room for the multipart boundaries and headers around an ID card upload
+MULTIPART_OVERHEAD = 64 * 1024
 
 # SerpAPI configuration
 SERPAPI_KEY = os.getenv("SERPAPI_KEY", "your_serpapi_key_here")
 SERPAPI_BASE_URL = "https://serpapi.com/search"
 
+# Shares flights and results with routes/research.py
+@coalesced("serpapi_author")
 def serpapi_get_author_details(author_id):
     """Get detailed author information using SerpAPI"""
     params = {
@@ -31,7 +53,8 @@ def serpapi_get_author_details(author_id):
     }
     
     try:
-        response = requests.get(SERPAPI_BASE_URL, params=params)
+        with track_external("serpapi"):
+            response = http.get(SERPAPI_BASE_URL, params=params)
         if response.status_code == 200:
             return response.json()
         else:
@@ -57,26 +80,27 @@ def signup():
 
     try:
         db = next(get_db())
-        # Check if the user already exists in the local database
-        if db.query(User).filter_by(email=email).first():
+        # Claim the email first: the unique constraint decides between concurrent
+        # signups, so an existing user costs one statement and no Supabase call
+        user_id = _insert_user(db, email=email, name=name, role=role)
+        if user_id is None:
             return jsonify({"error": "User already exists, Kindly Login"}), 400
 
         # Sign up with Supabase
         try:
-            response = supabase.auth.sign_up({
-                "email": email,
-                "password": password
-            })
+            with track_external("supabase"):
+                response = supabase.auth.sign_up({
+                    "email": email,
+                    "password": password
+                })
+            if not response.user:
+                raise ValueError("Signup failed. No user returned.")
         except Exception as e:
+            # Release the email again so the user can retry
+            db.execute(delete(User).where(User.user_id == user_id))
+            db.commit()
             return jsonify({"error": f"Supabase signup failed: {str(e)}"}), 400
 
-        if not response.user:
-            return jsonify({"error": "Signup failed. No user returned."}), 400
-
-        new_user = User(email=email, name=name, role=role)
-        db.add(new_user)
-        db.commit()
-
         return jsonify({
             "message": "User created successfully. Please check your email to verify."
         }), 201
@@ -85,6 +109,17 @@ def signup():
         return jsonify({"error": str(e)}), 400
 
 
+def _insert_user(db, **values):
+    """INSERT ... ON CONFLICT (email) DO NOTHING; the new user_id, or None when the email is taken"""
+    user_id = db.scalar(
+        upsert_insert(User).values(**values)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.user_id)
+    )
+    db.commit()
+    return user_id
+
+
 @user_bp.route("/login", methods=["POST"])
 def login():
     db = next(get_db())
@@ -93,15 +128,12 @@ def login():
     token = request.cookies.get("access_token")
     if token:
         try:
-            user_info = supabase.auth.get_user(token)
-            email = user_info.user.email
-            role = db.query(User).filter_by(email=email).first().role
-
+            identity = verify_token(token, db)
             return jsonify({
                 "message": "Already logged in",
                 "user": {
-                    "email": email,
-                    "role": role
+                    "email": identity["email"],
+                    "role": identity["role"]
                 }
             }), 200
         except Exception:
@@ -116,10 +148,11 @@ def login():
         return jsonify({"error": "Email and password are required"}), 400
 
     try:
-        response = supabase.auth.sign_in_with_password({
-            "email": email,
-            "password": password
-        })
+        with track_external("supabase"):
+            response = supabase.auth.sign_in_with_password({
+                "email": email,
+                "password": password
+            })
 
         if not response.user or not response.session:
             return jsonify({"error": "Invalid credentials"}), 401
@@ -127,11 +160,18 @@ def login():
         user = response.user
         session = response.session
 
+        user_in_db = db.query(User).filter_by(email=user.email).first()
+        if not user_in_db:
+            return jsonify({"error": "User not found in internal DB"}), 404
+
+        # The next requests with this cookie skip the Supabase round trip and the lookup
+        remember_token(session.access_token, user_identity(user_in_db))
+
         res = make_response(jsonify({
             "message": "Login successful",
             "user": {
                 "email": user.email,
-                "role": db.query(User).filter_by(email=email).first().role,
+                "role": user_in_db.role,
             }
         }))
 
@@ -168,9 +208,11 @@ def logout():
         # Get the current token to sign out from Supabase
         token = request.cookies.get("access_token")
         if token:
+            forget_token(token)
             try:
                 # Sign out from Supabase
-                supabase.auth.sign_out()
+                with track_external("supabase"):
+                    supabase.auth.sign_out()
             except Exception as e:
                 # Continue even if Supabase logout fails
                 print(f"Supabase logout error: {str(e)}")
@@ -208,61 +250,168 @@ def logout():
         )
         return response, 200
 
-# Route to handle ID card upload for verification
-@user_bp.route("/upload_id_card", methods=["POST"])
-@token_required
-def upload_id_card():
-    # Get the uploaded file from the request
-    file = request.files.get('id_card')
-    if not file:
-        return jsonify({"error": "No file part"}), 400
+ID_CARD_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.pdf')
+id_card_bucket = get_bucket("id-card")
+
+
+def _record_id_card(db, user_id, url, thumb_url):
+    """Point the user's ID card at a stored file, queue it for verification and delete the previous card"""
+    previous = db.execute(select(User.id_card_url, User.id_card_thumb_url).where(User.user_id == user_id)).first()
+    if previous is None:
+        return False
+    db.execute(
+        update(User).where(User.user_id == user_id)
+        .values(id_card_url=url, id_card_thumb_url=thumb_url, is_verified=False,
+                verification_status="pending", id_card_submitted_at=utcnow())
+    )
+    db.commit()
+    forget_users(user_id)
+
+    # Only objects in the user's own folder; older rows may point elsewhere
+    stale = [id_card_bucket.path_from_url(old) for old in previous if old and old not in (url, thumb_url)]
+    stale = [path for path in stale if path and path.startswith(f"{user_id}/")]
+    if stale:
+        try:
+            id_card_bucket.remove(*stale)
+        except Exception as e:
+            print(f"Could not delete previous ID card of user {user_id}: {str(e)}")
+    return True
 
-    # Secure the filename to avoid issues with special characters
-    filename = secure_filename(file.filename)
-    
-    # Validate the file type (only jpg, jpeg, png, pdf)
-    if not filename.lower().endswith(('.jpg', '.jpeg', '.png', '.pdf')):
+
+def _process_id_card_job(progress, user_id, path, raw_url):
+    """
+    Validate and downscale a confirmed upload and swap the result in for the raw file,
+    unless a newer card replaced it meanwhile. A file that is not a usable card is
+    dropped and the user is back to having none.
+    """
+    rejected = None
+    url = thumb_url = None
+    try:
+        with id_card_bucket.open(path) as raw, spool_upload(raw) as upload:
+            url, thumb_url = store_id_card(id_card_bucket, user_id, upload)
+        values = {"id_card_url": url, "id_card_thumb_url": thumb_url}
+    except UploadRejected as e:
+        rejected = e
+        values = {"id_card_url": None, "id_card_thumb_url": None,
+                  "verification_status": None, "id_card_submitted_at": None}
+
+    db = SessionLocal()
+    try:
+        swapped = db.execute(
+            update(User).where(User.user_id == user_id, User.id_card_url == raw_url).values(**values)
+        ).rowcount
+        db.commit()
+    finally:
+        db.close()
+    if swapped:
+        invalidate_responses(user_id, "profile")
+
+    # The raw upload goes either way, the processed files too if nothing points at them
+    unused = [path] if swapped else [path] + [id_card_bucket.path_from_url(u) for u in (url, thumb_url) if u]
+    id_card_bucket.remove(*unused)
+    if rejected:
+        raise rejected
+    return {"id_card_url": url if swapped else None}
+
+
+# Step 1 of an ID card upload: a short-lived URL the client PUTs the file to directly
+@user_bp.route("/id-card/upload-url", methods=["POST"])
+@token_required
+def create_id_card_upload_url():
+    data = request.get_json(silent=True) or {}
+    extension = os.path.splitext(secure_filename(data.get("filename") or ""))[1].lower()
+    if extension not in ID_CARD_EXTENSIONS:
         return jsonify({"error": "Invalid file type. Only .jpg, .jpeg, .png, .pdf allowed."}), 400
 
+    # A fresh name per upload: a pending upload never overwrites the current card
+    path = f"{request.user['id']}/uploads/{uuid.uuid4().hex}{extension}"
     try:
-        # Get the user's id from the token
-        user_id = request.user['id']
-        
-        # Define the file path within the user's own folder (using user_id)
-        file_path = f"{user_id}/{filename}"  # User folder will be named with their ID
-        
-        # Upload the file to Supabase storage
-        response = supabase.storage.from_("id-card").upload(
-            file_path,
-            file,
-            {"content-type": file.content_type}  # Set content type for file
-        )
+        upload = id_card_bucket.create_upload_url(path)
+    except Exception as e:
+        return jsonify({"error": f"Error creating upload URL: {str(e)}"}), 502
+    return jsonify({**upload, "path": path, "max_bytes": ID_CARD_MAX_BYTES}), 200
 
-        # Get the file's public URL after uploading
-        file_url = supabase.storage.from_("id-card").get_public_url(file_path).get('publicURL')
+# Step 2: once the client's upload has finished, record it as pending and validate
+# and downscale it in a background job (202), which swaps in the processed file
+@user_bp.route("/id-card/confirm", methods=["POST"])
+@token_required
+@invalidates_responses("profile")
+def confirm_id_card_upload():
+    user_id = request.user["id"]
+    path = (request.get_json(silent=True) or {}).get("path") or ""
+    if not path.startswith(f"{user_id}/uploads/") or ".." in path:
+        return jsonify({"error": "Invalid upload path"}), 400
+    if not id_card_bucket.exists(path):
+        return jsonify({"error": "File has not been uploaded"}), 409
+
+    raw_url = id_card_bucket.public_url(path)
+    db = next(get_db())
+    if not _record_id_card(db, user_id, raw_url, None):
+        id_card_bucket.remove(path)
+        return jsonify({"error": "User not found"}), 404
 
-        # Retrieve the user's record from the database
-        db = SessionLocal()
-        user_in_db = db.query(User).filter_by(user_id=user_id).first()
+    job = submit_job("id_card.process", _process_id_card_job, user_id, path, raw_url, created_by=user_id)
+    return jsonify({"message": "ID card uploaded successfully. Waiting for verification.",
+                    "job_id": job["id"], "status": job["status"]}), 202
 
-        if not user_in_db:
-            db.close()
-            return jsonify({"error": "User not found"}), 404
+# Route to handle ID card upload for verification (the file passes through the
+# worker; new clients use /id-card/upload-url and /id-card/confirm instead)
+@user_bp.route("/upload_id_card", methods=["POST"])
+@token_required
+@invalidates_responses("profile")
+def upload_id_card():
+    # Oversized bodies are refused with 413 before the form is parsed
+    request.max_content_length = ID_CARD_MAX_BYTES + MULTIPART_OVERHEAD
 
-        # Update the user's ID card URL and set the verification status to False
-        user_in_db.id_card_url = file_url
-        user_in_db.is_verified = False
-        db.commit()
-        db.close()
+    # Get the uploaded file from the request
+    file = request.files.get('id_card')
+    if not file:
+        return jsonify({"error": "No file part"}), 400
 
-        return jsonify({"message": "ID card uploaded successfully. Waiting for verification."}), 200
+    # Get the user's id from the token
+    user_id = request.user['id']
 
+    try:
+        with spool_upload(file.stream) as upload:
+            url, thumb_url = store_id_card(id_card_bucket, user_id, upload)
+    except UploadRejected as e:
+        return jsonify({"error": str(e)}), e.status_code
     except Exception as e:
         return jsonify({"error": f"Error uploading ID card: {str(e)}"}), 500
+
+    # The request's session is closed at teardown, also when this fails
+    db = next(get_db())
+    if not _record_id_card(db, user_id, url, thumb_url):
+        return jsonify({"error": "User not found"}), 404
+    return jsonify({"message": "ID card uploaded successfully. Waiting for verification."}), 200
     
 
+def profile_to_json(user, counts):
+    return {
+        "name": user.name,
+        "email": user.email,
+        "role": user.role,
+        "scholar_id": user.scholar_id,
+        "h_index": user.h_index,
+        "i10_index": user.i10_index,
+        "total_citations": user.total_citations,
+        "id_card_url": user.id_card_url,
+        "id_card_thumb_url": user.id_card_thumb_url,
+        "is_verified": user.is_verified,
+        "verification_status": user.verification_status,
+        "stats": {
+            "startups": counts["startup"],
+            "ipr": counts["ipr"],
+            "innovations": counts["innovation"],
+            "research": counts["research"]
+        }
+    }
+
+
 @user_bp.route("/profile", methods=["GET"])
+@query_budget(3)
 @token_required
+@cached_response("profile", per_user=True)
 def get_profile():
     db = next(get_db())
     
@@ -279,35 +428,130 @@ def get_profile():
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    # Fetch counts for startups, IPR, innovations, and research
-    startups_count = db.query(Startup).filter_by(user_id=user.user_id).count()
-    ipr_count = db.query(IPR).filter_by(user_id=user.user_id).count()
-    innovations_count = db.query(Innovation).filter_by(user_id=user.user_id).count()
-    research_count = db.query(ResearchPaper).filter_by(user_id=user.user_id).count()
+    # Fetch counts for startups, IPR, innovations, and research from the stats table
+    counts = get_user_counts(db, user.user_id)
 
     # Return the full user profile along with counts
-    user_data = {
-        "name": user.name,
-        "email": user.email,
-        "role": user.role,
-        "scholar_id": user.scholar_id,
+    user_data = profile_to_json(user, counts)
+
+    return jsonify({
+        "message": "Profile fetched successfully",
+        "profile": user_data
+    }), 200
+
+
+# section -> (User relationship, primary key, stats entity, serializer)
+CONTRIBUTION_SECTIONS = {
+    "research": (User.research_papers, ResearchPaper.paper_id, "research", paper_to_json),
+    "ipr": (User.iprs, IPR.ipr_id, "ipr", ipr_to_json),
+    "innovations": (User.innovations, Innovation.innovation_id, "innovation", innovation_to_json),
+    "startups": (User.startups, Startup.startup_id, "startup", startup_to_json),
+}
+
+
+# All contributions of a user, one page (?page=&per_page=) per collection.
+# Admins may pass ?user_id= to view another user.
+@user_bp.route("/contributions", methods=["GET"])
+@query_budget(7)
+@token_required
+def get_contributions():
+    db = next(get_db())
+    user_id = request.user["id"]
+    if request.user["role"] == "admin":
+        user_id = request.args.get("user_id", user_id, type=int)
+
+    user = db.get(User, user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    page, per_page = page_args()
+    # Totals come from the stats table, so the query count does not grow with the sections' size
+    counts = get_user_counts(db, user.user_id)
+    result = {"user": {"user_id": user.user_id, "name": user.name, "email": user.email, "role": user.role}}
+    for section, (relation, pk, entity, serialize) in CONTRIBUTION_SECTIONS.items():
+        query = db.query(relation.mapper.class_).filter(with_parent(user, relation)).order_by(pk)
+        items = paginate(query, page, per_page).all()
+        result[section] = {"items": [serialize(r) for r in items], **page_meta(page, per_page, counts[entity])}
+    return jsonify(result)
+
+
+# section -> (model, primary key, title column) for the dashboard's recent items
+RECENT_SOURCES = {
+    "research": (ResearchPaper, ResearchPaper.paper_id, ResearchPaper.title),
+    "ipr": (IPR, IPR.ipr_id, IPR.title),
+    "innovations": (Innovation, Innovation.innovation_id, Innovation.title),
+    "startups": (Startup, Startup.startup_id, Startup.name),
+}
+DASHBOARD_RECENT_ITEMS = 5
+
+
+def _recent_items(db, user, limit):
+    """The `limit` most recently updated records of every section in one UNION ALL query"""
+    selects = []
+    for section, (model, pk, title) in RECENT_SOURCES.items():
+        # Rows never updated go last (Postgres sorts NULLs first in descending order)
+        rank = func.row_number().over(order_by=(model.updated_at.desc().nulls_last(), pk.desc()))
+        stmt = select(
+            cast(literal(section), String).label("section"), pk.label("id"), title.label("title"),
+            model.status.label("status"), model.updated_at.label("updated_at"), rank.label("rank"),
+        )
+        # Same visibility as the list endpoints
+        if user["role"] != "admin":
+            stmt = stmt.where(model.user_id == user["id"])
+        selects.append(stmt)
+
+    ranked = union_all(*selects).subquery()
+    rows = db.execute(select(ranked).where(ranked.c.rank <= limit).order_by(ranked.c.section, ranked.c.rank)).all()
+    recent = {section: [] for section in RECENT_SOURCES}
+    for row in rows:
+        recent[row.section].append({
+            "id": row.id,
+            "title": row.title,
+            "status": row.status,
+            "updated_at": str(row.updated_at) if row.updated_at else None,
+        })
+    return recent
+
+
+def _citation_metrics(db, user):
+    """Scholar metrics of the profile plus totals over the user's stored papers"""
+    papers, citations, most_cited, ten_plus = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(ResearchPaper.citations), 0),
+            func.coalesce(func.max(ResearchPaper.citations), 0),
+            func.coalesce(func.sum(case((ResearchPaper.citations >= 10, 1), else_=0)), 0),
+        ).where(ResearchPaper.user_id == user.user_id)
+    ).one()
+    return {
         "h_index": user.h_index,
         "i10_index": user.i10_index,
         "total_citations": user.total_citations,
-        "id_card_url": user.id_card_url,
-        "is_verified": user.is_verified,
-        "stats": {
-            "startups": startups_count,
-            "ipr": ipr_count,
-            "innovations": innovations_count,
-            "research": research_count
-        }
+        "papers": papers,
+        "paper_citations": int(citations),
+        "most_cited": int(most_cited),
+        "papers_with_10_citations": int(ten_plus),
     }
 
+
+# Everything the frontend needs for its first render (profile, counts, recent items
+# and citation metrics) in one request instead of profile + four list calls
+@user_bp.route("/dashboard", methods=["GET"])
+@query_budget(5)
+@token_required
+@cached_response("dashboard", per_user=True)
+def get_dashboard():
+    db = next(get_db())
+    user = db.get(User, request.user["id"])
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    counts = get_user_counts(db, user.user_id)
     return jsonify({
-        "message": "Profile fetched successfully",
-        "profile": user_data
-    }), 200
+        "profile": profile_to_json(user, counts),
+        "recent": _recent_items(db, request.user, DASHBOARD_RECENT_ITEMS),
+        "citations": _citation_metrics(db, user),
+    })
 
 
 def format_scholarly_paper(p, scholar_id=None):
@@ -338,6 +582,7 @@ def format_scholarly_paper(p, scholar_id=None):
 
 @user_bp.route("/update_profile", methods=["PUT"])
 @token_required
+@invalidates_responses("profile")
 def update_profile():
     data = request.json
     
@@ -443,6 +688,7 @@ def update_profile():
 
 @user_bp.route("/update_profile_field", methods=["PATCH"])
 @token_required
+@invalidates_responses("profile")
 def update_profile_field():
     """
     Update a specific field of the user's profile
@@ -0,0 +1,47 @@
+# scripts/backfill_authors.py
+# One-off migration: splits the comma-separated ResearchPaper.authors strings
+# into RIISE.author / RIISE.paper_author. Safe to re-run; every paper's links
+# are rebuilt from its current authors string.
+# Usage (from backend/): python -m scripts.backfill_authors
+from sqlalchemy import select
+from database import SessionLocal, Base, engine
+from models.research import ResearchPaper
+from models.author import Author, PaperAuthor
+from utils.authors import sync_paper_authors
+
+BATCH_SIZE = 500
+
+
+def main():
+    Base.metadata.create_all(bind=engine, tables=[Author.__table__, PaperAuthor.__table__])
+
+    db = SessionLocal()
+    try:
+        last_id = 0
+        migrated = 0
+        while True:
+            # Keyset pagination keeps each batch an index range scan
+            batch = db.execute(
+                select(ResearchPaper.paper_id, ResearchPaper.authors)
+                .where(ResearchPaper.paper_id > last_id)
+                .order_by(ResearchPaper.paper_id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not batch:
+                break
+
+            for paper_id, authors in batch:
+                sync_paper_authors(db, paper_id, authors)
+            db.commit()
+
+            last_id = batch[-1].paper_id
+            migrated += len(batch)
+            print(f"Migrated authors of {migrated} papers")
+
+        print("✅ Author backfill complete!")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
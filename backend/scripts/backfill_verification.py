@@ -0,0 +1,83 @@
+# scripts/backfill_verification.py
+# One-off migration for the ID card verification queue: adds the new users columns
+# and the partial index on pending rows, derives verification_status from
+# is_verified / id_card_url, and makes the review thumbnails of ID cards uploaded
+# before thumbnails existed. Safe to re-run.
+# Usage (from backend/): python -m scripts.backfill_verification
+import uuid
+from sqlalchemy import select, update
+from database import SessionLocal, engine
+from models.users import User
+from scripts import migrate_user_columns
+from utils.http import http
+from utils.storage import get_bucket
+from utils.uploads import spool_upload, sniff_content_type, make_thumbnail, UploadRejected
+from utils.verification import utcnow
+
+BATCH_SIZE = 100
+
+
+def backfill_statuses(db):
+    approved = db.execute(
+        update(User).where(User.verification_status.is_(None), User.is_verified.is_(True))
+        .values(verification_status="approved")
+    ).rowcount
+    pending = db.execute(
+        update(User).where(User.verification_status.is_(None), User.id_card_url.isnot(None))
+        .values(verification_status="pending", id_card_submitted_at=utcnow())
+    ).rowcount
+    db.commit()
+    print(f"✅ {approved} users approved, {pending} pending review")
+
+
+def backfill_thumbnails(db):
+    bucket = get_bucket("id-card")
+    last_id = 0
+    made = 0
+    while True:
+        batch = db.execute(
+            select(User.user_id, User.id_card_url)
+            .where(User.user_id > last_id, User.id_card_url.isnot(None), User.id_card_thumb_url.is_(None))
+            .order_by(User.user_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not batch:
+            break
+
+        for user_id, url in batch:
+            try:
+                with http.get(url, stream=True) as response:
+                    response.raise_for_status()
+                    response.raw.decode_content = True
+                    with spool_upload(response.raw) as card:
+                        if sniff_content_type(card) not in ("image/jpeg", "image/png"):
+                            continue  # PDFs have no thumbnail
+                        thumbnail = make_thumbnail(card)
+            except (UploadRejected, OSError) as e:
+                print(f"⚠️ Skipped user {user_id}: {e}")
+                continue
+
+            path = f"{user_id}/{uuid.uuid4().hex}.thumb.jpg"
+            bucket.upload(path, thumbnail, "image/jpeg")
+            db.execute(update(User).where(User.user_id == user_id).values(id_card_thumb_url=bucket.public_url(path)))
+            made += 1
+        db.commit()
+        last_id = batch[-1].user_id
+    print(f"✅ Made {made} thumbnails")
+
+
+def main():
+    migrate_user_columns.main()
+    for index in User.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        backfill_statuses(db)
+        backfill_thumbnails(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
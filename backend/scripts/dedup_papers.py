@@ -0,0 +1,61 @@
+# scripts/dedup_papers.py
+# Batch duplicate detection over the whole research_paper table.
+# Usage (from backend/):
+#   python -m scripts.dedup_papers               # report duplicate groups per user
+#   python -m scripts.dedup_papers --cross-user  # report duplicates across users too
+#   python -m scripts.dedup_papers --merge       # merge same-user duplicates
+#   python -m scripts.dedup_papers --reindex     # rebuild all title signatures first
+# Papers without a signature are always indexed before scanning.
+import argparse
+from sqlalchemy import select
+from database import SessionLocal, Base, engine
+from models.research import ResearchPaper
+from models.signature import PaperSignature
+from utils.dedup import find_duplicate_groups, merge_duplicate_group, index_paper_signature, index_missing_signatures
+
+
+def reindex(db):
+    rows = db.execute(select(ResearchPaper.paper_id, ResearchPaper.user_id, ResearchPaper.title)).all()
+    for paper_id, user_id, title in rows:
+        index_paper_signature(db, paper_id, user_id, title)
+    db.commit()
+    print(f"Indexed title signatures of {len(rows)} papers")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find and merge duplicate research papers")
+    parser.add_argument("--cross-user", action="store_true", help="also report duplicates between different users")
+    parser.add_argument("--merge", action="store_true", help="merge duplicates owned by the same user")
+    parser.add_argument("--reindex", action="store_true", help="rebuild RIISE.paper_signature before scanning")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine, tables=[PaperSignature.__table__])
+    for index in ResearchPaper.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        if args.reindex:
+            reindex(db)
+        else:
+            print(f"Indexed title signatures of {index_missing_signatures(db)} new papers")
+
+        groups = find_duplicate_groups(db, cross_user=args.cross_user)
+        titles = dict(db.execute(select(ResearchPaper.paper_id, ResearchPaper.title)).all())
+        print(f"Found {len(groups)} duplicate groups")
+        for group in groups:
+            print(" - " + " | ".join(f"#{paper_id} {titles[paper_id]}" for paper_id in group))
+
+        if args.merge:
+            merged = 0
+            for group in groups:
+                if merge_duplicate_group(db, group) is not None:
+                    merged += 1
+            db.commit()
+            print(f"✅ Merged {merged} duplicate groups")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
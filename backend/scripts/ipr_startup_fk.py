@@ -0,0 +1,28 @@
+# scripts/ipr_startup_fk.py
+# Recreates the ipr.related_startup_id foreign key with ON DELETE SET NULL on
+# Postgres databases created before it, so deleting a startup unlinks its IPRs in
+# the database itself. (The bulk delete also unlinks them explicitly.)
+# Usage (from backend/): python -m scripts.ipr_startup_fk
+from sqlalchemy import inspect, text
+from database import engine
+
+
+def main():
+    if engine.dialect.name != "postgresql":
+        print("Nothing to do: only Postgres databases need the migration")
+        return
+
+    foreign_keys = inspect(engine).get_foreign_keys("ipr", schema="RIISE")
+    with engine.begin() as conn:
+        for fk in foreign_keys:
+            if fk["constrained_columns"] == ["related_startup_id"]:
+                conn.execute(text(f'ALTER TABLE "RIISE".ipr DROP CONSTRAINT "{fk["name"]}"'))
+        conn.execute(text(
+            'ALTER TABLE "RIISE".ipr ADD CONSTRAINT ipr_related_startup_id_fkey '
+            'FOREIGN KEY (related_startup_id) REFERENCES "RIISE".startup (startup_id) ON DELETE SET NULL'
+        ))
+    print("✅ ipr.related_startup_id now uses ON DELETE SET NULL")
+
+
+if __name__ == "__main__":
+    main()
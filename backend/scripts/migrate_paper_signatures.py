@@ -0,0 +1,26 @@
+# scripts/migrate_paper_signatures.py
+# Deploy step for duplicate detection: creates RIISE.paper_signature and indexes the
+# titles of all papers that do not have a signature yet. Until this has run,
+# duplicates of existing papers are not detected. Safe to run repeatedly.
+# Usage (from backend/): python -m scripts.migrate_paper_signatures
+from database import SessionLocal, Base, engine
+from models.research import ResearchPaper
+from models.signature import PaperSignature
+from utils.dedup import index_missing_signatures
+
+
+def main():
+    Base.metadata.create_all(bind=engine, tables=[PaperSignature.__table__])
+    for index in ResearchPaper.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        indexed = index_missing_signatures(db)
+    finally:
+        db.close()
+    print(f"✅ Indexed title signatures of {indexed} papers")
+
+
+if __name__ == "__main__":
+    main()
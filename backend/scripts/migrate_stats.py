@@ -0,0 +1,26 @@
+# scripts/migrate_stats.py
+# Brings RIISE.contribution_stats up to date on deploy: rebuilds every row from the
+# entity tables (which also removes duplicates left by concurrent refreshes before
+# the unique index existed) and creates the unique (user, entity, year) index that
+# refresh_user_stats upserts against. Safe to run repeatedly.
+# Usage (from backend/): python -m scripts.migrate_stats
+from sqlalchemy.schema import CreateIndex
+from database import SessionLocal, engine
+from models.stats import ContributionStat
+from utils.stats import refresh_all_stats
+
+
+def main():
+    db = SessionLocal()
+    try:
+        refresh_all_stats(db)
+    finally:
+        db.close()
+    with engine.begin() as conn:
+        for index in ContributionStat.__table__.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+    print("✅ Contribution stats rebuilt and indexed!")
+
+
+if __name__ == "__main__":
+    main()
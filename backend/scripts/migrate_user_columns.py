@@ -0,0 +1,23 @@
+# scripts/migrate_user_columns.py
+# Adds the columns of models/users.py that a database created before them is
+# missing (create_all only creates whole tables). Safe to run repeatedly.
+# Usage (from backend/): python -m scripts.migrate_user_columns
+from sqlalchemy import inspect, text
+from database import engine
+from models.users import User
+
+
+def main():
+    table = User.__table__
+    existing = {c["name"] for c in inspect(engine).get_columns(table.name, schema=table.schema)}
+    missing = [c for c in table.columns if c.name not in existing]
+    with engine.begin() as conn:
+        for column in missing:
+            column_type = column.type.compile(dialect=engine.dialect)
+            conn.execute(text(f'ALTER TABLE "{table.schema}".{table.name} ADD COLUMN {column.name} {column_type}'))
+            print(f"➕ Added users.{column.name}")
+    print(f"✅ users table up to date ({len(missing)} columns added)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# scripts/prune_tombstones.py
+# Deletes tombstones older than TOMBSTONE_RETENTION_DAYS (clients that last synced
+# before that reload the full list anyway). Also creates the tombstone table and
+# the updated_at indexes used by delta sync on databases created before them.
+# Usage (from backend/): python -m scripts.prune_tombstones
+from datetime import timedelta
+from sqlalchemy import delete, select, func
+from database import SessionLocal, Base, engine
+from config import TOMBSTONE_RETENTION_DAYS
+from models.research import ResearchPaper
+from models.IPR import IPR
+from models.innovation import Innovation
+from models.startup import Startup
+from models.tombstone import Tombstone
+from utils.sync import to_utc
+
+
+def main():
+    Base.metadata.create_all(bind=engine, tables=[Tombstone.__table__])
+    for model in (ResearchPaper, IPR, Innovation, Startup):
+        for index in model.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        horizon = to_utc(db.scalar(select(func.now()))) - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+        result = db.execute(delete(Tombstone).where(Tombstone.deleted_at < horizon))
+        db.commit()
+        print(f"✅ Pruned {result.rowcount} tombstones older than {TOMBSTONE_RETENTION_DAYS} days")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
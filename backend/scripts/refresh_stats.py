@@ -0,0 +1,20 @@
+# scripts/refresh_stats.py
+# Rebuilds RIISE.contribution_stats from the entity tables.
+# Routes keep the table up to date on every write; run this on a schedule
+# (e.g. nightly cron: `python -m scripts.refresh_stats` from backend/) to
+# pick up rows changed outside the API.
+from database import SessionLocal
+from utils.stats import refresh_all_stats
+
+
+def main():
+    db = SessionLocal()
+    try:
+        refresh_all_stats(db)
+        print("✅ Contribution stats refreshed!")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
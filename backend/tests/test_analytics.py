@@ -0,0 +1,20 @@
+from datetime import date
+from models.startup import Startup
+
+
+def test_year_groups_add_up_to_the_summary(make_user, db):
+    admin, _ = make_user("admin", verified=True)
+    _, user_id = make_user()
+    db.add_all([
+        Startup(name="Owned", founded_date=date(2021, 3, 1), user_id=user_id),
+        Startup(name="Ownerless", founded_date=date(2022, 5, 1)),
+        Startup(name="Undated"),
+    ])
+    db.commit()
+
+    summary = admin.get("/api/v1/analytics/summary").get_json()
+    for entity, total in summary.items():
+        groups = admin.get(f"/api/v1/analytics/{entity}/by/year").get_json()["groups"]
+        assert sum(group["count"] for group in groups) == total, entity
+    groups = admin.get("/api/v1/analytics/startup/by/year").get_json()["groups"]
+    assert {group["value"] for group in groups} >= {2021, 2022, None}
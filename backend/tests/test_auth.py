@@ -0,0 +1,72 @@
+import pytest
+from conftest import PASSWORD, login
+from database import supabase
+from utils.auth import cached_identity, forget_users
+from utils.local_auth import LocalAuth, LocalAuthError, LocalUserStore
+
+
+def _token(client):
+    return client.get_cookie("access_token").value
+
+
+def test_login_sets_session_and_token_is_cached(make_user):
+    client, user_id = make_user()
+    response = client.get("/api/v1/users/profile")
+    assert response.status_code == 200
+    assert cached_identity(_token(client))["id"] == user_id
+
+
+def test_missing_or_forged_token_is_rejected(app):
+    assert app.test_client().get("/api/v1/users/profile").status_code == 401
+
+    client = app.test_client()
+    client.set_cookie("access_token", "not-a-jwt")
+    assert client.get("/api/v1/users/profile").status_code == 401
+
+
+def test_wrong_password_is_rejected(app, make_user):
+    client, _ = make_user()
+    email = client.get("/api/v1/users/profile").get_json()["profile"]["email"]
+    response = app.test_client().post("/api/v1/users/login", json={"email": email, "password": "wrong"})
+    assert response.status_code >= 400
+    assert "access_token" not in response.headers.get("Set-Cookie", "")
+
+
+def test_signup_with_taken_email_fails(app, make_user):
+    client, _ = make_user()
+    email = client.get("/api/v1/users/profile").get_json()["profile"]["email"]
+    response = app.test_client().post("/api/v1/users/signup", json={"name": "x", "email": email, "password": PASSWORD})
+    assert response.status_code == 400
+
+
+def test_logout_drops_cached_token(make_user):
+    client, _ = make_user()
+    token = _token(client)
+    assert cached_identity(token) is not None
+
+    assert client.post("/api/v1/users/logout").status_code == 200
+    assert cached_identity(token) is None
+    assert client.get("/api/v1/users/profile").status_code == 401
+
+
+def test_role_change_invalidates_cached_identity(app, make_user):
+    client, user_id = make_user()
+    token = _token(client)
+    forget_users(user_id)
+    assert cached_identity(token) is None
+    # The next request looks the user up again and caches the fresh identity
+    assert client.get("/api/v1/users/profile").status_code == 200
+    assert cached_identity(token)["id"] == user_id
+
+
+def test_local_tokens_are_signed_with_the_configured_secret(make_user):
+    client, _ = make_user()
+    other = LocalAuth(LocalUserStore(":memory:"), secret="some-other-secret-of-sufficient-length")
+    with pytest.raises(LocalAuthError):
+        other.get_user(_token(client))
+    assert supabase.auth.get_user(_token(client)).user.email
+
+
+def test_local_backend_requires_a_secret():
+    with pytest.raises(RuntimeError):
+        LocalAuth(LocalUserStore(":memory:"), secret=None)
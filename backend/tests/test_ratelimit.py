@@ -0,0 +1,68 @@
+import threading
+import pytest
+import routes.export as export
+import utils.ratelimit as ratelimit
+from utils.ratelimit import LocalLimiter, ROUTE_CLASSES
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_ENABLED", True)
+    return ROUTE_CLASSES["export"]
+
+
+def test_token_bucket_allows_a_burst_then_waits():
+    limiter = LocalLimiter()
+    assert [limiter.take("k", rate=1.0, burst=3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert 0 < limiter.take("k", rate=1.0, burst=3) <= 1.0
+    assert limiter.take("other", rate=1.0, burst=3) == 0.0
+
+
+def test_in_flight_limit_is_released_on_leave():
+    limiter = LocalLimiter()
+    assert limiter.enter("k", 1)
+    assert not limiter.enter("k", 1)
+    limiter.leave("k")
+    assert limiter.enter("k", 1)
+
+
+def test_requests_over_the_rate_get_429_with_retry_after(make_user, limits, monkeypatch):
+    monkeypatch.setitem(limits, "burst", 1)
+    monkeypatch.setitem(limits, "per_minute", 1)
+    client, _ = make_user()
+    other, _ = make_user()
+
+    assert client.get("/api/v1/export/user").status_code == 200
+    limited = client.get("/api/v1/export/user")
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    # Buckets are per user
+    assert other.get("/api/v1/export/user").status_code == 200
+
+
+def test_concurrent_requests_of_one_user_are_capped(app, make_user, limits, monkeypatch):
+    monkeypatch.setitem(limits, "max_in_flight_per_user", 1)
+    client, _ = make_user()
+    inside, release = threading.Event(), threading.Event()
+
+    # Hold the first request inside the route while the second one arrives
+    original = export.generate_professional_report
+
+    def held(*args, **kwargs):
+        inside.set()
+        release.wait(5)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(export, "generate_professional_report", held)
+    first = {}
+    thread = threading.Thread(target=lambda: first.setdefault("status", client.get("/api/v1/export/user").status_code))
+    thread.start()
+    assert inside.wait(5)
+    second = app.test_client()
+    second.set_cookie("access_token", client.get_cookie("access_token").value)
+    assert second.get("/api/v1/export/user").status_code == 429
+    release.set()
+    thread.join(5)
+    assert first["status"] == 200
+    # The slot is free again
+    assert second.get("/api/v1/export/user").status_code == 200
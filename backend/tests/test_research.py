@@ -0,0 +1,18 @@
+import routes.research
+
+
+def test_allow_duplicate_must_be_true(make_user, monkeypatch):
+    monkeypatch.setattr(routes.research, "REJECT_DUPLICATE_PAPERS", True)
+    client, _ = make_user()
+    paper = {"title": "Duplicate detection for research papers", "doi": "10.1000/dup"}
+    assert client.post("/api/v1/research/add-paper", json=paper).status_code == 200
+
+    for flag in (False, "false", "0", "no"):
+        response = client.post("/api/v1/research/add-paper", json={**paper, "allow_duplicate": flag})
+        assert response.status_code == 409, flag
+    assert client.post("/api/v1/research/add-paper?allow_duplicate=0", json=paper).status_code == 409
+
+    for flag in (True, "true", "1"):
+        response = client.post("/api/v1/research/add-paper", json={**paper, "allow_duplicate": flag})
+        assert response.status_code == 200, flag
+    assert client.post("/api/v1/research/add-paper?allow_duplicate=true", json=paper).status_code == 200
@@ -0,0 +1,88 @@
+from flask import Flask, request, jsonify
+from utils.response_cache import response_cache_key, invalidate_responses, cached_response
+
+
+def test_list_scopes_are_shared_by_admins_per_user_scopes_are_not():
+    admin = {"id": 1, "role": "admin"}
+    user = {"id": 2, "role": "user"}
+    assert response_cache_key("research", admin) == "research:admin"
+    assert response_cache_key("research", user) == "research:user:2"
+    assert response_cache_key("profile", admin, per_user=True) == "profile:user:1"
+    assert response_cache_key("profile", user, per_user=True) == "profile:user:2"
+
+
+def test_admins_do_not_share_profiles_or_dashboards(make_user):
+    first, _ = make_user("admin", verified=True)
+    second, _ = make_user("admin", verified=True)
+    for path in ("/api/v1/users/profile", "/api/v1/users/dashboard"):
+        mine = first.get(path).get_json()["profile"]["email"]
+        theirs = second.get(path)
+        assert theirs.headers["X-Cache"] == "MISS"
+        assert theirs.get_json()["profile"]["email"] != mine
+
+
+def test_list_is_cached_until_a_write(make_user):
+    client, _ = make_user()
+    assert client.get("/api/v1/research/").headers["X-Cache"] == "MISS"
+    cached = client.get("/api/v1/research/")
+    assert cached.headers["X-Cache"] == "HIT"
+    assert cached.get_json() == []
+
+    assert client.post("/api/v1/research/add-paper", json={"title": "Cache invalidation in practice"}).status_code == 200
+    fresh = client.get("/api/v1/research/")
+    assert fresh.headers["X-Cache"] == "MISS"
+    assert [p["title"] for p in fresh.get_json()] == ["Cache invalidation in practice"]
+
+
+def test_unchanged_response_revalidates_with_etag(make_user):
+    client, _ = make_user()
+    etag = client.get("/api/v1/research/").headers["ETag"]
+    assert client.get("/api/v1/research/", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_admin_dashboard_sees_other_users_writes(make_user):
+    admin, _ = make_user("admin", verified=True)
+    user, _ = make_user()
+    admin.get("/api/v1/users/dashboard")
+    assert admin.get("/api/v1/users/dashboard").headers["X-Cache"] == "HIT"
+
+    user.post("/api/v1/research/add-paper", json={"title": "Visible to admins"})
+    response = admin.get("/api/v1/users/dashboard")
+    assert response.headers["X-Cache"] == "MISS"
+    assert "Visible to admins" in [item["title"] for item in response.get_json()["recent"]["research"]]
+
+
+def test_read_started_before_a_write_is_not_cached():
+    app = Flask(__name__)
+    calls = []
+
+    @app.before_request
+    def _user():
+        request.user = {"id": 7, "role": "user"}
+
+    @app.route("/items")
+    @cached_response("items")
+    def items():
+        calls.append(1)
+        if len(calls) == 1:
+            invalidate_responses(7, "items")  # Another request commits while this one reads
+        return jsonify(len(calls))
+
+    client = app.test_client()
+    assert client.get("/items").get_json() == 1
+    assert client.get("/items").headers["X-Cache"] == "MISS"
+    assert client.get("/items").headers["X-Cache"] == "HIT"
+
+
+def test_cache_stats_do_not_scan_redis(monkeypatch):
+    from utils import cache
+
+    class Shared(cache.RedisCache):
+        def __init__(self):
+            pass
+
+        def __len__(self):
+            raise AssertionError("cache_stats scanned Redis")
+
+    monkeypatch.setitem(cache._registry, "shared", Shared())
+    assert "shared" not in cache.cache_stats()
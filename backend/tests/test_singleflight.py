@@ -0,0 +1,132 @@
+import threading
+import time
+import pytest
+from utils import singleflight
+from utils.singleflight import coalesced
+
+FOLLOWERS = 7
+
+
+class _Waiters(threading.Event):
+    """Event that counts the threads waiting on it"""
+    waiting = 0
+    lock = threading.Lock()
+
+    def wait(self, timeout=None):
+        with self.lock:
+            _Waiters.waiting += 1
+        return super().wait(timeout)
+
+
+@pytest.fixture
+def held(monkeypatch):
+    """Factory of coalesced lookups that block until released; (make, calls, inside, release)"""
+    monkeypatch.setattr(_Waiters, "waiting", 0)
+    monkeypatch.setattr(singleflight._Flight, "__init__", _flight_init)
+    calls, inside, release = [], threading.Event(), threading.Event()
+
+    def make(error=None):
+        @coalesced("test")
+        def lookup(key):
+            calls.append(key)
+            number = len(calls)
+            inside.set()
+            assert release.wait(5)
+            if error is not None:
+                raise error
+            return f"result {number}"
+        return lookup
+
+    return make, calls, inside, release
+
+
+def _flight_init(self):
+    self.done = _Waiters()
+    self.result = None
+    self.error = None
+
+
+def _run(func, *args):
+    """Start func(*args) in a thread; (thread, outcome dict with "result" or "error")"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = func(*args)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+
+def _wait_for_followers(count):
+    deadline = time.monotonic() + 5
+    while _Waiters.waiting < count:
+        assert time.monotonic() < deadline, "followers did not join"
+        time.sleep(0.01)
+
+
+def test_concurrent_callers_share_one_call(held):
+    make, calls, inside, release = held
+    lookup = make()
+    leader = _run(lookup, "author")
+    assert inside.wait(5)
+    followers = [_run(lookup, "author") for _ in range(FOLLOWERS)]
+    _wait_for_followers(FOLLOWERS)
+
+    release.set()
+    for thread, outcome in [leader, *followers]:
+        thread.join(5)
+        assert outcome == {"result": "result 1"}
+    assert calls == ["author"]
+    # Later calls are answered from the result cache
+    assert lookup("author") == "result 1" and calls == ["author"]
+
+
+def test_leader_error_reaches_its_followers(held):
+    make, calls, inside, release = held
+    error = RuntimeError("upstream failed")
+    lookup = make(error=error)
+    leader = _run(lookup, "author")
+    assert inside.wait(5)
+    followers = [_run(lookup, "author") for _ in range(FOLLOWERS)]
+    _wait_for_followers(FOLLOWERS)
+
+    release.set()
+    for thread, outcome in [leader, *followers]:
+        thread.join(5)
+        assert outcome == {"error": error}
+    assert calls == ["author"]
+
+
+def test_follower_calls_itself_when_the_leader_is_stuck(held, monkeypatch):
+    monkeypatch.setattr(singleflight, "COALESCE_WAIT_SECONDS", 0.05)
+    make, calls, inside, release = held
+    lookup = make()
+    leader = _run(lookup, "author")
+    assert inside.wait(5)
+
+    follower = _run(lookup, "author")
+    deadline = time.monotonic() + 5
+    while len(calls) < 2:
+        assert time.monotonic() < deadline, "follower kept waiting for the leader"
+        time.sleep(0.01)
+    release.set()
+    for thread, _ in (leader, follower):
+        thread.join(5)
+    assert leader[1] == {"result": "result 1"} and follower[1] == {"result": "result 2"}
+    assert calls == ["author", "author"]
+
+
+def test_failed_lookups_are_not_cached():
+    calls = []
+
+    @coalesced("test")
+    def lookup(key):
+        calls.append(key)
+        return None
+
+    assert lookup("author") is None and lookup("author") is None
+    assert calls == ["author", "author"]
@@ -0,0 +1,141 @@
+import io
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+from PIL import Image
+import routes.user
+from config import STORAGE_LOCAL_DIR
+from utils.jobs import get_job
+
+
+def _jpeg(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "steelblue").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _upload(client, data, filename="card.jpg"):
+    """Signed upload of `data`; (path, PUT response)"""
+    signed = client.post("/api/v1/users/id-card/upload-url", json={"filename": filename}).get_json()
+    url = urlsplit(signed["upload_url"])
+    return signed["path"], client.put(f"{url.path}?{url.query}", data=data)
+
+
+def _confirm(client, path):
+    """Confirm a signed upload and wait for its processing job; the finished job"""
+    response = client.post("/api/v1/users/id-card/confirm", json={"path": path})
+    assert response.status_code == 202, response.get_json()
+    return _wait(response.get_json()["job_id"])
+
+
+def _wait(job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while get_job(job_id)["status"] not in ("succeeded", "failed"):
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return get_job(job_id)
+
+
+def _stored_files(user_id):
+    folder = os.path.join(STORAGE_LOCAL_DIR, "id-card", str(user_id))
+    if not os.path.isdir(folder):
+        return []
+    return sorted(name for name in os.listdir(folder) if os.path.isfile(os.path.join(folder, name)))
+
+
+def test_signed_upload_is_normalized_and_recorded(make_user):
+    client, user_id = make_user()
+    path, put = _upload(client, _jpeg(3200, 2400))
+    assert put.status_code == 201
+
+    assert _confirm(client, path)["status"] == "succeeded"
+
+    profile = client.get("/api/v1/users/profile").get_json()["profile"]
+    assert profile["verification_status"] == "pending"
+    card = Image.open(io.BytesIO(client.get(urlsplit(profile["id_card_url"]).path).data))
+    assert card.format == "JPEG" and max(card.size) == 1600
+    assert profile["id_card_thumb_url"]
+    # The raw upload is gone once it has been processed
+    assert client.post("/api/v1/users/id-card/confirm", json={"path": path}).status_code == 409
+
+
+def test_new_card_replaces_the_old_files(make_user):
+    client, user_id = make_user()
+    for _ in range(2):
+        path, _ = _upload(client, _jpeg(800, 600))
+        assert _confirm(client, path)["status"] == "succeeded"
+    files = _stored_files(user_id)
+    assert len(files) == 2 and any(f.endswith(".thumb.jpg") for f in files)
+
+
+def test_confirm_returns_before_processing_finishes(make_user, monkeypatch):
+    client, _ = make_user()
+    release = threading.Event()
+    store_id_card = routes.user.store_id_card
+
+    def slow_store_id_card(*args):
+        assert release.wait(10)
+        return store_id_card(*args)
+
+    monkeypatch.setattr(routes.user, "store_id_card", slow_store_id_card)
+    path, _ = _upload(client, _jpeg(800, 600))
+    response = client.post("/api/v1/users/id-card/confirm", json={"path": path})
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+
+    # Recorded as pending with the raw upload while the job waits
+    profile = client.get("/api/v1/users/profile").get_json()["profile"]
+    assert profile["verification_status"] == "pending"
+    assert profile["id_card_url"].endswith(path) and profile["id_card_thumb_url"] is None
+    assert get_job(job_id)["status"] in ("queued", "running")
+
+    release.set()
+    assert _wait(job_id)["status"] == "succeeded"
+    profile = client.get("/api/v1/users/profile").get_json()["profile"]
+    assert profile["id_card_url"].endswith(".jpg") and "/uploads/" not in profile["id_card_url"]
+    assert profile["id_card_thumb_url"]
+
+
+def test_upload_url_signature_is_checked(make_user):
+    client, _ = make_user()
+    signed = client.post("/api/v1/users/id-card/upload-url", json={"filename": "card.jpg"}).get_json()
+    url = urlsplit(signed["upload_url"])
+    assert client.put(f"{url.path}?{url.query.replace('signature=', 'signature=0')}", data=b"x").status_code == 403
+
+
+def test_only_configured_buckets_are_served(app):
+    client = app.test_client()
+    with open(os.path.join(STORAGE_LOCAL_DIR, "leak.txt"), "w") as f:
+        f.write("secret")
+    for path in ("/api/v1/storage/../leak.txt", "/api/v1/storage/%2e%2e/leak.txt",
+                 "/api/v1/storage/other/leak.txt", "/api/v1/storage/id-card/../leak.txt"):
+        assert client.get(path).status_code == 404, path
+
+
+def test_non_image_is_rejected(make_user):
+    client, _ = make_user()
+    path, _ = _upload(client, b"MZ\x90\x00 definitely not an image")
+    job = _confirm(client, path)
+    assert job["status"] == "failed" and "Invalid file type" in job["error"]
+
+    profile = client.get("/api/v1/users/profile").get_json()["profile"]
+    assert profile["id_card_url"] is None and profile["verification_status"] is None
+    assert not os.path.exists(os.path.join(STORAGE_LOCAL_DIR, "id-card", path))
+
+
+def test_oversized_image_is_rejected_before_decoding(make_user):
+    client, _ = make_user()
+    buffer = io.BytesIO()
+    Image.new("L", (6000, 5000)).save(buffer, "PNG")  # 30 MP, but only a few KB compressed
+    path, _ = _upload(client, buffer.getvalue(), "card.png")
+    assert _confirm(client, path)["status"] == "failed"
+    assert client.get("/api/v1/users/profile").get_json()["profile"]["id_card_url"] is None
+
+
+def test_legacy_multipart_upload(make_user):
+    client, _ = make_user()
+    response = client.post("/api/v1/users/upload_id_card", content_type="multipart/form-data",
+                           data={"id_card": (io.BytesIO(b"%PDF-1.4 minimal"), "card.pdf")})
+    assert response.status_code == 200
+    assert client.get("/api/v1/users/profile").get_json()["profile"]["id_card_url"].endswith(".pdf")
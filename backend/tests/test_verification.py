@@ -0,0 +1,72 @@
+import base64
+import io
+import json
+from utils.auth import cached_identity
+
+
+def _submit_card(client):
+    response = client.post("/api/v1/users/upload_id_card", content_type="multipart/form-data",
+                           data={"id_card": (io.BytesIO(b"%PDF-1.4 card"), "card.pdf")})
+    assert response.status_code == 200
+
+
+def _pending_page(admin, **params):
+    response = admin.get("/api/v1/admin/verifications/pending", query_string=params)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_pending_list_is_paged_with_a_cursor(make_user):
+    admin, _ = make_user("admin", verified=True)
+    submitted = []
+    for _ in range(3):
+        client, user_id = make_user()
+        _submit_card(client)
+        submitted.append(user_id)
+
+    seen, cursor = [], None
+    while True:
+        page = _pending_page(admin, limit=1, **({"after": cursor} if cursor else {}))
+        seen += [item["user_id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert [user_id for user_id in seen if user_id in submitted] == submitted
+
+
+def test_malformed_cursor_is_a_bad_request(make_user):
+    admin, _ = make_user("admin", verified=True)
+    for value in ({"a": 1}, [1], "text", ["not a date", 1]):
+        cursor = base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+        response = admin.get("/api/v1/admin/verifications/pending", query_string={"after": cursor})
+        assert response.status_code == 400, value
+
+
+def test_review_updates_users_and_their_sessions(make_user):
+    admin, _ = make_user("admin", verified=True)
+    approved, approved_id = make_user()
+    rejected, rejected_id = make_user()
+    _, never_submitted_id = make_user()
+    for client in (approved, rejected):
+        _submit_card(client)
+        client.get("/api/v1/users/profile")  # Caches the session and the profile
+
+    response = admin.post("/api/v1/admin/verifications/review",
+                          json={"approve": [approved_id, never_submitted_id], "reject": [rejected_id]})
+    assert response.status_code == 200
+    assert response.get_json() == {"approved": [approved_id], "rejected": [rejected_id],
+                                   "skipped": [never_submitted_id]}
+
+    # Cached sessions and profiles do not keep the old verification state
+    assert cached_identity(approved.get_cookie("access_token").value) is None
+    profile = approved.get("/api/v1/users/profile").get_json()["profile"]
+    assert profile["is_verified"] is True and profile["verification_status"] == "approved"
+    assert rejected.get("/api/v1/users/profile").get_json()["profile"]["verification_status"] == "rejected"
+
+
+def test_review_input_is_validated(make_user):
+    admin, _ = make_user("admin", verified=True)
+    user, user_id = make_user()
+    for body in ({}, {"approve": "1"}, {"approve": [True]}, {"approve": [user_id], "reject": [user_id]}):
+        assert admin.post("/api/v1/admin/verifications/review", json=body).status_code == 400
+    assert user.post("/api/v1/admin/verifications/review", json={"approve": [user_id]}).status_code == 403
@@ -1,7 +1,104 @@
+import hashlib
+import time
 from functools import wraps
 from flask import request, jsonify
+from config import AUTH_TOKEN_CACHE_ENABLED, AUTH_TOKEN_CACHE_TTL, AUTH_TOKEN_CACHE_MAX_ENTRIES, REDIS_URL
 from database import supabase, SessionLocal
 from models.users import User
+from utils.cache import LRUCache, RedisCache, register_cache
+from utils.metrics import track_external
+
+# Verified session tokens: sha256(token) -> the identity token_required puts on the
+# request, so a token is checked with Supabase and looked up in the DB once per
+# AUTH_TOKEN_CACHE_TTL instead of on every request. Login primes it with the new
+# token and logout drops it. Only enabled where logout reaches every worker, i.e.
+# with REDIS_URL or a single worker (AUTH_TOKEN_CACHE_ENABLED).
+_tokens = register_cache(
+    "auth_tokens",
+    RedisCache(REDIS_URL, AUTH_TOKEN_CACHE_TTL, prefix="riise:auth:") if REDIS_URL
+    else LRUCache(AUTH_TOKEN_CACHE_TTL, max_entries=AUTH_TOKEN_CACHE_MAX_ENTRIES)
+)
+# user id -> when the user's role or verification last changed; identities cached
+# before that are ignored. Kept apart from the tokens so that token churn cannot
+# evict a marker while the identities it overrides are still cached.
+_changed_users = register_cache(
+    "auth_changed_users",
+    RedisCache(REDIS_URL, AUTH_TOKEN_CACHE_TTL, prefix="riise:auth-changed:") if REDIS_URL
+    else LRUCache(AUTH_TOKEN_CACHE_TTL, max_entries=AUTH_TOKEN_CACHE_MAX_ENTRIES)
+)
+
+
+class AuthError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _token_key(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def user_identity(user):
+    """The request.user dict for a User row"""
+    return {"id": user.user_id, "email": user.email, "role": user.role, "is_verified": user.is_verified}
+
+
+def remember_token(token, identity):
+    if not AUTH_TOKEN_CACHE_ENABLED:
+        return
+    _tokens.set(_token_key(token), {"user": identity, "cached_at": time.time()})
+
+
+def forget_token(token):
+    _tokens.delete(_token_key(token))
+
+
+def forget_users(*user_ids):
+    """Stop trusting cached identities of these users (call after changing role or verification)"""
+    now = time.time()
+    for user_id in user_ids:
+        _changed_users.set(str(user_id), now)
+
+
+def cached_identity(token):
+    if not AUTH_TOKEN_CACHE_ENABLED:
+        return None
+    entry = _tokens.get(_token_key(token))
+    if entry is None:
+        return None
+    changed_at = _changed_users.get(str(entry["user"]["id"]))
+    if changed_at is not None and changed_at >= entry["cached_at"]:
+        return None
+    return entry["user"]
+
+
+def verify_token(token, db=None):
+    """
+    Identity of the user a session token belongs to, from the cache or else from
+    Supabase plus one DB lookup. Raises AuthError for unknown tokens or users.
+    """
+    identity = cached_identity(token)
+    if identity is not None:
+        return identity
+
+    with track_external("supabase"):
+        user = supabase.auth.get_user(token).user
+    if not user:
+        raise AuthError("Invalid session", 401)
+
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        user_in_db = db.query(User).filter_by(email=user.email).first()
+    finally:
+        if own_session:
+            db.close()
+    if not user_in_db:
+        raise AuthError("User not found in internal DB", 404)
+
+    identity = user_identity(user_in_db)
+    remember_token(token, identity)
+    return identity
 
 
 def token_required(f):
@@ -15,33 +112,13 @@ def token_required(f):
         if not token:
             return jsonify({"error": "Session token missing"}), 401
 
-        db = SessionLocal()
         try:
-            # Get user from Supabase
-            user = supabase.auth.get_user(token).user
-            if not user:
-                return jsonify({"error": "Invalid session"}), 401
-
-            email = user.email
-
-            # Get user from local database
-            user_in_db = db.query(User).filter_by(email=email).first()
-
-            if not user_in_db:
-                return jsonify({"error": "User not found in internal DB"}), 404
-
             # Inject user identity into request context
-            request.user = {
-                "id": user_in_db.user_id,
-                "email": email,
-                "role": user_in_db.role,
-                "is_verified": user_in_db.is_verified
-            }
-
+            request.user = dict(verify_token(token))
+        except AuthError as e:
+            return jsonify({"error": str(e)}), e.status_code
         except Exception as e:
             return jsonify({"error": "Token error", "detail": str(e)}), 401
-        finally:
-            db.close()  # ✅ Always close the database connection
 
         return f(*args, **kwargs)
     return decorated
@@ -68,22 +145,13 @@ def verified_required(func):
         # Check if user context exists
         if not hasattr(request, 'user') or not request.user:
             return jsonify({"error": "User context not found"}), 401
-            
-        db = SessionLocal()
-        try:
-            user_id = request.user["id"]
-            # ✅ Fixed: Use user_id instead of id
-            user = db.query(User).filter(User.user_id == user_id).first()
-
-            if not user:
-                return jsonify({"error": "User not found"}), 404
-            if user.role != "admin":
-                return jsonify({"error": "Unauthorized, admin required"}), 403
-            if not user.is_verified:
-                return jsonify({"error": "Admin account not verified"}), 403
-
-            return func(*args, **kwargs)
-        finally:
-            db.close()  # ✅ Always close the database connection
-            
+
+        # token_required has just loaded role and verification status from the DB
+        if request.user["role"] != "admin":
+            return jsonify({"error": "Unauthorized, admin required"}), 403
+        if not request.user["is_verified"]:
+            return jsonify({"error": "Admin account not verified"}), 403
+
+        return func(*args, **kwargs)
+
     return decorated_function
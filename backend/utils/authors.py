@@ -0,0 +1,71 @@
+# utils/authors.py
+# Keeps RIISE.author / RIISE.paper_author in sync with ResearchPaper.authors
+import re
+from sqlalchemy import select, delete, insert
+from sqlalchemy.exc import IntegrityError
+from models.author import Author, PaperAuthor
+from utils.text import normalize_text
+
+# Separators used by manual entries, SerpAPI (", ") and scholarly (" and ")
+_AUTHOR_SEPARATORS = re.compile(r"\s*(?:,|;|\band\b|&)\s*", re.IGNORECASE)
+
+# Key under which spellings of the same name are matched (RIISE.author.normalized_name)
+normalize_author_name = normalize_text
+
+
+def split_authors(authors):
+    """Split a comma-joined authors string into clean, de-duplicated names (order kept)"""
+    names = []
+    seen = set()
+    for name in _AUTHOR_SEPARATORS.split(authors or ""):
+        name = name.strip(" .…")
+        key = normalize_author_name(name)
+        if key and key not in seen:
+            seen.add(key)
+            names.append(name)
+    return names
+
+
+def get_or_create_authors(db, names):
+    """Return {normalized_name: author_id} for the given names, inserting missing authors"""
+    wanted = {normalize_author_name(n): n for n in names}
+    wanted.pop("", None)
+    if not wanted:
+        return {}
+
+    rows = db.execute(
+        select(Author.normalized_name, Author.author_id).where(Author.normalized_name.in_(wanted))
+    ).all()
+    ids = dict(rows)
+
+    for key, name in wanted.items():
+        if key in ids:
+            continue
+        try:
+            # Savepoint so a concurrent insert of the same author does not abort the transaction
+            with db.begin_nested():
+                ids[key] = db.execute(
+                    insert(Author).values(name=name, normalized_name=key).returning(Author.author_id)
+                ).scalar_one()
+        except IntegrityError:
+            ids[key] = db.execute(
+                select(Author.author_id).where(Author.normalized_name == key)
+            ).scalar_one()
+    return ids
+
+
+def sync_paper_authors(db, paper_id, authors):
+    """
+    Replace the author links of one paper with the names in `authors`.
+    Runs inside the caller's transaction; commit afterwards.
+    """
+    names = split_authors(authors)
+    db.execute(delete(PaperAuthor).where(PaperAuthor.paper_id == paper_id))
+    if not names:
+        return
+
+    ids = get_or_create_authors(db, names)
+    db.execute(insert(PaperAuthor), [
+        {"paper_id": paper_id, "author_id": ids[normalize_author_name(name)], "position": position}
+        for position, name in enumerate(names)
+    ])
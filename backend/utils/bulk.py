@@ -0,0 +1,89 @@
+# utils/bulk.py
+# Set-based deletes for the admin delete endpoints. Records are removed with one
+# DELETE ... RETURNING per chunk of ids instead of loading and deleting ORM objects
+# one by one. Dependent rows go in the same transaction: author links and title
+# signatures cascade in the database, and IPRs that point at a deleted startup are
+# unlinked. Every chunk commits on its own so a large delete never holds locks on
+# the hot tables for long; requests above BULK_DELETE_SYNC_LIMIT ids run as a job.
+from flask import request, jsonify, url_for
+from sqlalchemy import delete, update
+from config import BULK_DELETE_CHUNK_SIZE, BULK_DELETE_SYNC_LIMIT, BULK_DELETE_MAX_IDS
+from database import SessionLocal
+from models.IPR import IPR
+from models.research import ResearchPaper
+from models.innovation import Innovation
+from models.startup import Startup
+from utils.jobs import submit_job
+from utils.response_cache import invalidate_responses
+from utils.stats import refresh_user_stats
+from utils.sync import record_tombstones
+
+# entity (as used for tombstones and stats) -> (model, primary key, response cache scope)
+BULK_TARGETS = {
+    "research": (ResearchPaper, ResearchPaper.paper_id, "research"),
+    "ipr": (IPR, IPR.ipr_id, "ipr"),
+    "innovation": (Innovation, Innovation.innovation_id, "innovations"),
+    "startup": (Startup, Startup.startup_id, "startups"),
+}
+
+
+def _delete_chunk(db, entity, ids):
+    model, pk, scope = BULK_TARGETS[entity]
+
+    unlinked_owners = []
+    if entity == "startup":
+        # Also covers databases whose foreign key predates ON DELETE SET NULL
+        unlinked_owners = db.scalars(
+            update(IPR).where(IPR.related_startup_id.in_(ids))
+            .values(related_startup_id=None).returning(IPR.user_id)
+        ).all()
+
+    rows = db.execute(delete(model).where(pk.in_(ids)).returning(pk, model.user_id)).all()
+    record_tombstones(db, entity, rows)
+    owners = {user_id for _, user_id in rows if user_id is not None}
+    refresh_user_stats(db, *owners)
+    db.commit()
+
+    for owner in owners:
+        invalidate_responses(owner, scope, "profile")
+    for owner in set(unlinked_owners):
+        invalidate_responses(owner, "ipr")
+    return [record_id for record_id, _ in rows]
+
+
+def bulk_delete(db, entity, ids, progress=None):
+    """Delete the given records in chunks; returns the deleted count and the ids that did not exist"""
+    ids = sorted(set(ids))
+    deleted = set()
+    for start in range(0, len(ids), BULK_DELETE_CHUNK_SIZE):
+        deleted.update(_delete_chunk(db, entity, ids[start:start + BULK_DELETE_CHUNK_SIZE]))
+        if progress:
+            progress(min(start + BULK_DELETE_CHUNK_SIZE, len(ids)))
+    return {"deleted": len(deleted), "not_found": [i for i in ids if i not in deleted]}
+
+
+def _bulk_delete_job(progress, entity, ids):
+    db = SessionLocal()
+    try:
+        return bulk_delete(db, entity, ids, progress)
+    finally:
+        db.close()
+
+
+def bulk_delete_response(db, entity):
+    """Handle a bulk delete request body {"ids": [...]}: inline when small, otherwise as a job (202)"""
+    ids = (request.get_json(silent=True) or {}).get("ids")
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return jsonify({"error": "ids must be a non-empty list of integers"}), 400
+    if len(ids) > BULK_DELETE_MAX_IDS:
+        return jsonify({"error": f"At most {BULK_DELETE_MAX_IDS} ids per request"}), 400
+
+    if len(ids) <= BULK_DELETE_SYNC_LIMIT:
+        return jsonify(bulk_delete(db, entity, ids))
+
+    job = submit_job(f"bulk_delete.{entity}", _bulk_delete_job, entity, ids,
+                     total=len(set(ids)), created_by=request.user["id"])
+    status_url = url_for("admin.get_job", job_id=job["id"])
+    response = jsonify({"job_id": job["id"], "status": job["status"], "status_url": status_url})
+    response.headers["Location"] = status_url
+    return response, 202
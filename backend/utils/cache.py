@@ -0,0 +1,177 @@
+# utils/cache.py
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+try:
+    import redis
+except ImportError:  # Optional: only needed when REDIS_URL is configured
+    redis = None
+
+# Named in-process caches, reported by the readiness probe
+_registry = {}
+
+
+def register_cache(name, cache):
+    _registry[name] = cache
+    return cache
+
+
+def cache_stats():
+    """Number of live entries per registered in-process cache. Redis-backed caches are
+    left out: counting them SCANs the shared keyspace, too slow for a readiness probe."""
+    return {name: len(cache) for name, cache in _registry.items() if not isinstance(cache, RedisCache)}
+
+
+class TTLCache:
+    """Small thread-safe in-process cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, ttl, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                self._evict_expired()
+                if len(self._data) >= self.max_entries:
+                    # Drop the entry closest to expiry
+                    self._data.pop(min(self._data, key=lambda k: self._data[k][0]))
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at < now]:
+            del self._data[key]
+
+
+def ttl_cache(ttl, max_entries=256):
+    """Memoize a function's return value per arguments for `ttl` seconds"""
+    def decorator(func):
+        cache = register_cache(f"{func.__module__}.{func.__name__}", TTLCache(ttl, max_entries))
+        missing = object()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            value = cache.get(key, missing)
+            if value is missing:
+                value = func(*args, **kwargs)
+                cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+class LRUCache:
+    """Thread-safe in-process cache evicting the least recently used entry; entries also expire"""
+
+    def __init__(self, ttl, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    """Same interface backed by a Redis-compatible server, shared by all workers; values are JSON.
+    Each cache needs its own `prefix`: clear() and len() cover every key under it."""
+
+    def __init__(self, url, ttl, prefix):
+        if redis is None:
+            raise RuntimeError("REDIS_URL is set but the redis package is not installed")
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key, default=None):
+        try:
+            raw = self.client.get(self.prefix + key)
+        except redis.RedisError:
+            return default  # An unreachable cache is a miss, never an error
+        return default if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        try:
+            self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(self.ttl if ttl is None else ttl)))
+        except redis.RedisError:
+            pass
+
+    def delete(self, *keys):
+        try:
+            self.client.delete(*(self.prefix + key for key in keys))
+        except redis.RedisError:
+            pass
+
+    def clear(self):
+        try:
+            keys = list(self.client.scan_iter(match=self.prefix + "*"))
+            if keys:
+                self.client.delete(*keys)
+        except redis.RedisError:
+            pass
+
+    def __len__(self):
+        try:
+            return sum(1 for _ in self.client.scan_iter(match=self.prefix + "*"))
+        except redis.RedisError:
+            return 0
@@ -0,0 +1,100 @@
+# utils/compression.py
+# Negotiated response compression. JSON, text and PDF bodies above
+# COMPRESS_MIN_SIZE are sent gzip- or brotli-encoded depending on the client's
+# Accept-Encoding. Generator responses are compressed chunk by chunk so they
+# keep streaming. Responses with an ETag (e.g. from the response cache) always
+# have the same body, so their compressed variants are kept and reused.
+import gzip
+import zlib
+from flask import request
+from config import COMPRESS_MIN_SIZE, COMPRESS_LEVEL, BROTLI_QUALITY
+from utils.cache import LRUCache, register_cache
+from utils.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # In requirements.txt; without it responses are gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = {"application/json", "application/pdf", "application/javascript", "image/svg+xml"}
+ENCODINGS = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+# (etag, encoding) -> compressed body
+_variants = register_cache("compressed_variants", LRUCache(ttl=3600, max_entries=256))
+
+
+def _compressible(response):
+    mimetype = response.mimetype or ""
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_LEVEL)
+
+
+def compress_stream(chunks, encoding):
+    """Compress an iterable of byte chunks, flushing after each so clients see data as it is produced"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+def _encoded_chunks(iterable):
+    for chunk in iterable:
+        yield chunk.encode() if isinstance(chunk, str) else chunk
+
+
+def init_compression(app):
+    @app.after_request
+    def _compress_response(response):
+        if (request.method == "HEAD" or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or "Content-Encoding" in response.headers or not _compressible(response)
+                or "no-transform" in response.headers.get("Cache-Control", "")):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(ENCODINGS)
+        if encoding is None:
+            return response
+
+        # Generators stream; anything else (lists, BytesIO, files) is read at once
+        if response.is_streamed and not hasattr(response.response, "read") and not response.direct_passthrough:
+            response.response = compress_stream(_encoded_chunks(response.response), encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            if response.direct_passthrough or hasattr(response.response, "read"):
+                response.direct_passthrough = False
+                response.set_data(b"".join(_encoded_chunks(response.response)))
+            if response.content_length is not None and response.content_length < COMPRESS_MIN_SIZE:
+                return response
+
+            etag, is_weak = response.get_etag()
+            body = _variants.get((etag, encoding)) if etag else None
+            if body is None:
+                original = response.get_data()
+                body = compress(original, encoding)
+                if etag:
+                    _variants.set((etag, encoding), body)
+            registry.inc("riise_response_uncompressed_bytes_total", (("encoding", encoding),), response.content_length)
+            registry.inc("riise_response_compressed_bytes_total", (("encoding", encoding),), len(body))
+            response.set_data(body)
+
+        response.headers["Content-Encoding"] = encoding
+        etag, is_weak = response.get_etag()
+        if etag and not is_weak:
+            # The encoded bytes differ from the identity body; a weak tag still matches If-None-Match
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,234 @@
+# utils/dedup.py
+# Duplicate detection for research papers.
+# Candidates are blocked by exact DOI / Scholar ID and by MinHash LSH buckets of
+# the normalized title trigrams (RIISE.paper_signature), so a check only compares
+# against a handful of rows instead of the whole table.
+import hashlib
+import random
+from sqlalchemy import select, delete, insert, or_, exists
+from models.research import ResearchPaper
+from models.signature import PaperSignature
+from utils.authors import sync_paper_authors
+from utils.text import normalize_text
+from utils.stats import refresh_user_stats
+from utils.sync import record_tombstones
+
+SHINGLE_SIZE = 3
+NUM_BANDS = 8
+ROWS_PER_BAND = 4
+NUM_PERMUTATIONS = NUM_BANDS * ROWS_PER_BAND
+# Trigram Jaccard similarity from which two titles count as the same paper
+DUPLICATE_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_BUCKET = (1 << 63) - 1
+_rng = random.Random(1729)  # Fixed seed: stored buckets must stay stable across processes
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def title_shingles(title):
+    """Character trigrams of the normalized title"""
+    text = normalize_text(title)
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def minhash_signature(shingles):
+    hashes = [_hash64(s) for s in shingles]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_buckets(title):
+    """LSH bucket per band for a title; empty when the title has no usable text"""
+    shingles = title_shingles(title)
+    if not shingles:
+        return []
+    signature = minhash_signature(shingles)
+    buckets = []
+    for band in range(NUM_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        buckets.append(_hash64(",".join(map(str, rows))) & _MAX_BUCKET)
+    return buckets
+
+
+def index_paper_signature(db, paper_id, user_id, title):
+    """Store the title buckets of a paper (inside the caller's transaction)"""
+    db.execute(delete(PaperSignature).where(PaperSignature.paper_id == paper_id))
+    buckets = band_buckets(title)
+    if buckets:
+        db.execute(insert(PaperSignature), [
+            {"paper_id": paper_id, "band": band, "bucket": bucket, "user_id": user_id}
+            for band, bucket in enumerate(buckets)
+        ])
+
+
+def index_missing_signatures(db, batch_size=1000):
+    """Index papers that have no title signature yet (e.g. created before signatures existed); commits per batch"""
+    indexed, after = 0, 0
+    while True:
+        rows = db.execute(
+            select(ResearchPaper.paper_id, ResearchPaper.user_id, ResearchPaper.title)
+            .where(ResearchPaper.paper_id > after,
+                   ~exists().where(PaperSignature.paper_id == ResearchPaper.paper_id))
+            .order_by(ResearchPaper.paper_id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return indexed
+        for paper_id, user_id, title in rows:
+            index_paper_signature(db, paper_id, user_id, title)
+        db.commit()
+        indexed += len(rows)
+        after = rows[-1].paper_id
+
+
+def _match_reason(title_shingles_, doi, scholar_id, candidate):
+    if doi and candidate.doi == doi:
+        return "doi", 1.0
+    if scholar_id and candidate.scholar_id == scholar_id:
+        return "scholar_id", 1.0
+    similarity = jaccard(title_shingles_, title_shingles(candidate.title))
+    if similarity >= DUPLICATE_THRESHOLD:
+        return "title", round(similarity, 3)
+    return None, similarity
+
+
+def find_duplicates(db, user_id, title, doi=None, scholar_id=None, exclude_paper_id=None):
+    """Existing papers of `user_id` that look like the same paper as the given fields"""
+    conditions = []
+    if doi:
+        conditions.append(ResearchPaper.doi == doi)
+    if scholar_id:
+        conditions.append(ResearchPaper.scholar_id == scholar_id)
+
+    buckets = band_buckets(title)
+    if buckets:
+        candidate_ids = select(PaperSignature.paper_id).where(
+            PaperSignature.user_id == user_id,
+            or_(*[
+                (PaperSignature.band == band) & (PaperSignature.bucket == bucket)
+                for band, bucket in enumerate(buckets)
+            ]),
+        )
+        conditions.append(ResearchPaper.paper_id.in_(candidate_ids))
+
+    if not conditions:
+        return []
+
+    query = select(
+        ResearchPaper.paper_id, ResearchPaper.title, ResearchPaper.doi, ResearchPaper.scholar_id
+    ).where(ResearchPaper.user_id == user_id, or_(*conditions))
+    if exclude_paper_id is not None:
+        query = query.where(ResearchPaper.paper_id != exclude_paper_id)
+
+    shingles = title_shingles(title)
+    duplicates = []
+    for candidate in db.execute(query).all():
+        reason, similarity = _match_reason(shingles, doi, scholar_id, candidate)
+        if reason:
+            duplicates.append({
+                "paper_id": candidate.paper_id,
+                "title": candidate.title,
+                "reason": reason,
+                "similarity": similarity,
+            })
+    return duplicates
+
+
+def find_duplicate_groups(db, cross_user=False):
+    """
+    Scan the whole table and return groups of paper ids that are duplicates of each other.
+    Pairs are only compared when they share a DOI, Scholar ID or LSH bucket.
+    Unless `cross_user` is set, only papers of the same user are grouped.
+    """
+    papers = {}
+    blocks = {}
+    rows = db.execute(select(
+        ResearchPaper.paper_id, ResearchPaper.user_id, ResearchPaper.title,
+        ResearchPaper.doi, ResearchPaper.scholar_id,
+    )).all()
+    for row in rows:
+        papers[row.paper_id] = row
+        scope = None if cross_user else row.user_id
+        keys = [("title", band, bucket) for band, bucket in enumerate(band_buckets(row.title))]
+        if row.doi:
+            keys.append(("doi", row.doi))
+        if row.scholar_id:
+            keys.append(("scholar_id", row.scholar_id))
+        for key in keys:
+            blocks.setdefault((scope, key), []).append(row.paper_id)
+
+    # Union-find over verified pairs
+    parent = {paper_id: paper_id for paper_id in papers}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    shingle_cache = {}
+    checked = set()
+    for members in blocks.values():
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                pair = (first, second)
+                if pair in checked or find(first) == find(second):
+                    continue
+                checked.add(pair)
+                a, b = papers[first], papers[second]
+                if a.title not in shingle_cache:
+                    shingle_cache[a.title] = title_shingles(a.title)
+                reason, _ = _match_reason(shingle_cache[a.title], a.doi, a.scholar_id, b)
+                if reason:
+                    parent[find(second)] = find(first)
+
+    groups = {}
+    for paper_id in papers:
+        groups.setdefault(find(paper_id), []).append(paper_id)
+    return [sorted(ids) for ids in groups.values() if len(ids) > 1]
+
+
+def merge_duplicate_group(db, paper_ids):
+    """
+    Keep the most complete paper of a group, copy missing fields into it from the
+    others and delete the rest. Only papers owned by the same user are merged.
+    Returns the id of the kept paper, or None when the group spans several users.
+    """
+    papers = db.query(ResearchPaper).filter(ResearchPaper.paper_id.in_(paper_ids)).all()
+    if len(papers) < 2 or len({p.user_id for p in papers}) > 1:
+        return None
+
+    mergeable = ["abstract", "authors", "publication_date", "doi", "status", "scholar_id"]
+
+    def completeness(p):
+        return (sum(getattr(p, f) is not None for f in mergeable), p.citations or 0, -p.paper_id)
+
+    papers.sort(key=completeness, reverse=True)
+    keep, others = papers[0], papers[1:]
+    for other in others:
+        for field in mergeable:
+            if getattr(keep, field) is None and getattr(other, field) is not None:
+                setattr(keep, field, getattr(other, field))
+        keep.citations = max(keep.citations or 0, other.citations or 0)
+        db.delete(other)
+
+    record_tombstones(db, "research", [(other.paper_id, other.user_id) for other in others])
+    db.flush()
+    sync_paper_authors(db, keep.paper_id, keep.authors)
+    refresh_user_stats(db, keep.user_id)
+    return keep.paper_id
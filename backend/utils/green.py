@@ -0,0 +1,54 @@
+# utils/green.py
+# Cooperative Postgres I/O for gevent workers. gevent's monkey patching covers
+# sockets used by requests/httpx, but psycopg2 talks to the server from C and
+# would block the whole worker while a query runs. The wait callback below
+# (the psycogreen recipe) makes psycopg2 yield to other greenlets instead.
+
+
+def gevent_wait_callback(conn, timeout=None):
+    from psycopg2 import extensions, OperationalError
+    from gevent.socket import wait_read, wait_write
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state!r}")
+
+
+def patch_psycopg():
+    """Install the callback; returns False when psycopg2 or gevent is missing"""
+    try:
+        from psycopg2 import extensions
+        import gevent  # noqa: F401
+    except ImportError:
+        return False
+    extensions.set_wait_callback(gevent_wait_callback)
+    return True
+
+
+try:
+    from gunicorn.workers.ggevent import GeventWorker as _GunicornGeventWorker
+except ImportError:  # gunicorn/gevent are only installed on servers
+    _GunicornGeventWorker = None
+
+if _GunicornGeventWorker is not None:
+    class GeventWorker(_GunicornGeventWorker):
+        """
+        gunicorn's gevent worker without the aggressive monkey patching, which
+        deletes select.epoll and breaks importing trio (pulled in by httpx for
+        the Supabase client). Also makes psycopg2 cooperative.
+        """
+
+        def patch(self):
+            from gevent import monkey, socket
+            monkey.patch_all(aggressive=False)
+            # Same listener re-wrapping as the parent class
+            self.sockets = [socket.socket(s.FAMILY, socket.SOCK_STREAM, fileno=s.sock.fileno())
+                            for s in self.sockets]
+            patch_psycopg()
@@ -0,0 +1,19 @@
+# utils/http.py
+# Shared HTTP client for outbound API calls. Reusing one session keeps TLS
+# connections to SerpAPI alive between requests, and every call gets a timeout
+# so a slow upstream cannot hold a worker (or greenlet) forever.
+import requests
+from requests.adapters import HTTPAdapter
+from config import HTTP_TIMEOUT, HTTP_POOL_SIZE
+
+
+class TimeoutSession(requests.Session):
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+http = TimeoutSession()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=HTTP_POOL_SIZE)
+http.mount("https://", _adapter)
+http.mount("http://", _adapter)
@@ -0,0 +1,55 @@
+# utils/jobs.py
+# Background jobs for work that is too slow for a request (e.g. large bulk deletes).
+# Jobs run on a small thread pool inside the worker that accepted them (greenlets
+# under the gevent worker). Their status lives in the shared cache when REDIS_URL
+# is set, so any worker can answer GET /api/v1/admin/jobs/<id>; without it only
+# the accepting worker knows about the job.
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from config import JOB_WORKERS, JOB_RETENTION_SECONDS, REDIS_URL
+from utils.cache import LRUCache, RedisCache, register_cache
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="riise-job")
+_jobs = register_cache(
+    "jobs",
+    RedisCache(REDIS_URL, JOB_RETENTION_SECONDS, prefix="riise:job:") if REDIS_URL
+    else LRUCache(JOB_RETENTION_SECONDS, max_entries=1024)
+)
+
+
+def get_job(job_id):
+    return _jobs.get(job_id)
+
+
+def _update(job_id, **fields):
+    state = dict(_jobs.get(job_id) or {})
+    state.update(fields)
+    _jobs.set(job_id, state)
+    return state
+
+
+def _run(job_id, func, args):
+    _update(job_id, status="running", started_at=time.time())
+    try:
+        result = func(lambda done: _update(job_id, done=done), *args)
+    except Exception as e:
+        traceback.print_exc()
+        _update(job_id, status="failed", error=str(e), finished_at=time.time())
+    else:
+        _update(job_id, status="succeeded", result=result, finished_at=time.time())
+
+
+def submit_job(kind, func, *args, total=None, created_by=None):
+    """
+    Run func(progress, *args) in the background and return the job's initial state.
+    `progress(done)` records how many of `total` items are finished.
+    """
+    job_id = uuid.uuid4().hex
+    state = _update(
+        job_id, id=job_id, kind=kind, status="queued", total=total, done=0,
+        result=None, error=None, created_by=created_by, created_at=time.time(),
+    )
+    _executor.submit(_run, job_id, func, args)
+    return state
@@ -0,0 +1,160 @@
+# utils/local_auth.py
+# Stand-in for the Supabase client when AUTH_BACKEND=local (database.py picks it).
+# It offers the part of `supabase.auth` the app uses (sign_up, sign_in_with_password,
+# get_user, sign_out and admin.create_user) with accounts in SQLite (LOCAL_AUTH_DB),
+# PBKDF2 password hashes and HS256 access tokens shaped like Supabase's, so the app,
+# the benchmarks and tests run without network access. Files go through the local
+# bucket of utils/storage.py (STORAGE_BACKEND=local).
+import hashlib
+import hmac
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import jwt
+from config import LOCAL_AUTH_DB, LOCAL_AUTH_SECRET, LOCAL_AUTH_TOKEN_TTL, LOCAL_AUTH_HASH_ITERATIONS
+
+# Audience and role Supabase puts in the access tokens of signed-in users
+AUDIENCE = "authenticated"
+
+
+class LocalAuthError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def hash_password(password, iterations=LOCAL_AUTH_HASH_ITERATIONS):
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${salt.hex()}${digest.hex()}"
+
+
+def check_password(password, stored):
+    try:
+        _, iterations, salt, digest = stored.split("$")
+        candidate = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(candidate.hex(), digest)
+
+
+class LocalUserStore:
+    """Accounts in one SQLite table, behind a single connection guarded by a lock"""
+
+    def __init__(self, path=LOCAL_AUTH_DB):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA busy_timeout = 5000")  # A file may be shared by several workers
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS auth_users ("
+                "id TEXT PRIMARY KEY, email TEXT NOT NULL UNIQUE, password_hash TEXT NOT NULL, created_at TEXT NOT NULL)"
+            )
+
+    def create(self, email, password_hash):
+        user = {"id": str(uuid.uuid4()), "email": email, "password_hash": password_hash,
+                "created_at": datetime.now(timezone.utc).isoformat()}
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO auth_users (id, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+                    (user["id"], user["email"], user["password_hash"], user["created_at"]),
+                )
+            except sqlite3.IntegrityError:
+                raise LocalAuthError("User already registered", 422)
+        return user
+
+    def find(self, email):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, email, password_hash, created_at FROM auth_users WHERE email = ?", (email,)
+            ).fetchone()
+        return dict(zip(("id", "email", "password_hash", "created_at"), row)) if row else None
+
+
+def _normalize_email(email):
+    # Supabase stores addresses in lower case
+    if not email or "@" not in email:
+        raise LocalAuthError("Invalid email address", 400)
+    return email.strip().lower()
+
+
+def _public_user(user):
+    return SimpleNamespace(id=user["id"], email=user["email"], role=AUDIENCE, aud=AUDIENCE,
+                           created_at=user.get("created_at"))
+
+
+class LocalAuthAdmin:
+    def __init__(self, auth):
+        self._auth = auth
+
+    def create_user(self, attributes):
+        """Create a confirmed account, like supabase.auth.admin.create_user"""
+        return SimpleNamespace(user=_public_user(self._auth._create(attributes)))
+
+
+class LocalAuth:
+    def __init__(self, store, secret=LOCAL_AUTH_SECRET, token_ttl=LOCAL_AUTH_TOKEN_TTL):
+        if not secret:
+            raise RuntimeError("AUTH_BACKEND=local needs LOCAL_AUTH_SECRET to sign access tokens")
+        self.store = store
+        self.secret = secret
+        self.token_ttl = token_ttl
+        self.admin = LocalAuthAdmin(self)
+        # Compared against when the email is unknown, so both failures take as long
+        self._dummy_hash = hash_password(uuid.uuid4().hex)
+
+    def _create(self, credentials):
+        email = _normalize_email(credentials.get("email"))
+        password = credentials.get("password")
+        if not password:
+            raise LocalAuthError("Password is required", 400)
+        return self.store.create(email, hash_password(password))
+
+    def _session(self, user):
+        now = int(time.time())
+        claims = {"sub": user["id"], "email": user["email"], "aud": AUDIENCE, "role": AUDIENCE,
+                  "iat": now, "exp": now + self.token_ttl}
+        return SimpleNamespace(
+            access_token=jwt.encode(claims, self.secret, algorithm="HS256"),
+            token_type="bearer", expires_in=self.token_ttl, expires_at=now + self.token_ttl,
+            refresh_token=None, user=_public_user(user),
+        )
+
+    def sign_up(self, credentials):
+        # Accounts are confirmed right away, as in a project with email confirmation off
+        user = self._create(credentials)
+        return SimpleNamespace(user=_public_user(user), session=self._session(user))
+
+    def sign_in_with_password(self, credentials):
+        user = self.store.find(_normalize_email(credentials.get("email")))
+        password = credentials.get("password") or ""
+        valid = check_password(password, user["password_hash"] if user else self._dummy_hash)
+        if not user or not valid:
+            raise LocalAuthError("Invalid login credentials", 400)
+        return SimpleNamespace(user=_public_user(user), session=self._session(user))
+
+    def get_user(self, jwt_token=None):
+        try:
+            claims = jwt.decode(jwt_token or "", self.secret, algorithms=["HS256"], audience=AUDIENCE)
+        except jwt.InvalidTokenError as e:
+            raise LocalAuthError(f"invalid JWT: {e}", 403)
+        return SimpleNamespace(user=_public_user({"id": claims["sub"], "email": claims["email"]}))
+
+    def sign_out(self, options=None):
+        pass  # Access tokens are stateless and simply expire
+
+
+class LocalClient:
+    """Takes the place of the Supabase client; files are handled by utils/storage.py"""
+
+    def __init__(self, store_path=LOCAL_AUTH_DB):
+        self.auth = LocalAuth(LocalUserStore(store_path))
+
+    @property
+    def storage(self):
+        raise RuntimeError("The local auth backend has no storage client; set STORAGE_BACKEND=local")
@@ -0,0 +1,188 @@
+# utils/metrics.py
+# Lightweight request instrumentation: per-route latency histograms, SQL query
+# count/time, outbound HTTP time and connection pool wait. Exposed in Prometheus
+# text format on /metrics and per response in the Server-Timing header.
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, request, has_request_context, Response
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool, NullPool
+from config import METRICS_TOKEN
+
+# Upper bounds (seconds) of the histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Process-wide histograms and counters, keyed by (metric name, label tuple)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            key = (name, labels)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name in sorted({n for n, _ in self.counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (n, labels), value in sorted(self.counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{_labels(labels)} {value}")
+            for name in sorted({n for n, _ in self.histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (n, labels), h in sorted(self.histograms.items()):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(h.buckets + ("+Inf",), h.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {h.total:.6f}")
+                    lines.append(f"{name}_count{_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in labels) + "}"
+
+
+registry = MetricsRegistry()
+
+
+def _request_timings():
+    """Per-request accumulator, or None outside of a request"""
+    if not has_request_context():
+        return None
+    timings = g.get("_timings")
+    if timings is None:
+        timings = g._timings = {"db": 0.0, "db_count": 0, "external": {}, "pool_wait": 0.0}
+    return timings
+
+
+@contextmanager
+def track_external(service):
+    """Time an outbound call, e.g. `with track_external("serpapi"): requests.get(...)`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe("riise_external_request_seconds", (("service", service),), elapsed)
+        timings = _request_timings()
+        if timings is not None:
+            timings["external"][service] = timings["external"].get(service, 0.0) + elapsed
+
+
+class _TimedCheckout:
+    """Pool mixin that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.observe("riise_db_pool_wait_seconds", (), elapsed)
+            timings = _request_timings()
+            if timings is not None:
+                timings["pool_wait"] += elapsed
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedNullPool(_TimedCheckout, NullPool):
+    """NullPool whose "wait" is the time to open a fresh connection"""
+
+
+
+def instrument_engine(engine):
+    """Count and time every SQL statement executed through `engine`"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["_query_start"].pop()
+        registry.observe("riise_db_query_seconds", (), elapsed)
+        timings = _request_timings()
+        if timings is not None:
+            timings["db"] += elapsed
+            timings["db_count"] += 1
+
+
+def init_metrics(app):
+    """Register the timing hooks and the /metrics endpoint on the Flask app"""
+
+    @app.before_request
+    def _start_timer():
+        g._request_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop("_request_start", None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        labels = (("method", request.method), ("route", route), ("status", str(response.status_code)))
+        registry.observe("riise_request_seconds", labels, elapsed)
+
+        timings = _request_timings()
+        registry.inc("riise_db_queries_total", (("route", route),), timings["db_count"])
+
+        server_timing = [
+            f"app;dur={elapsed * 1000:.1f}",
+            f'db;dur={timings["db"] * 1000:.1f};desc="{timings["db_count"]} queries"',
+        ]
+        if timings["pool_wait"]:
+            server_timing.append(f"pool;dur={timings['pool_wait'] * 1000:.1f}")
+        for service, seconds in timings["external"].items():
+            server_timing.append(f"{service};dur={seconds * 1000:.1f}")
+        response.headers["Server-Timing"] = ", ".join(server_timing)
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+            return Response("Forbidden", status=403)
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
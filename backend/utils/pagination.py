@@ -0,0 +1,41 @@
+# utils/pagination.py
+# ?page=&per_page= handling shared by the paginated views. A prefix lets a view
+# page a nested collection independently, e.g. ?ipr_page=2&ipr_per_page=10.
+# Long, frequently changing lists use keyset pagination with an opaque cursor instead.
+import base64
+import json
+from flask import request
+
+MAX_PAGE_SIZE = 100
+
+
+def page_args(prefix="", default_size=20):
+    """(page, per_page) from the query string, clamped to 1..MAX_PAGE_SIZE"""
+    page = max(1, request.args.get(f"{prefix}page", 1, type=int))
+    per_page = max(1, min(request.args.get(f"{prefix}per_page", default_size, type=int), MAX_PAGE_SIZE))
+    return page, per_page
+
+
+def paginate(query, page, per_page):
+    """Apply LIMIT/OFFSET for the requested page"""
+    return query.limit(per_page).offset((page - 1) * per_page)
+
+
+def page_meta(page, per_page, total):
+    return {"page": page, "per_page": per_page, "total": total, "pages": -(-total // per_page)}
+
+
+def encode_cursor(*values):
+    """Opaque ?after= token for keyset pagination from the sort key of the last row"""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(token, size):
+    """The `size` values passed to encode_cursor(); ValueError for a malformed token"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,88 @@
+# utils/pooling.py
+# Named connection pool profiles and the disconnect handling that replaces
+# pool_pre_ping (a SELECT 1 round-trip on every checkout).
+#
+#   pooler  PgBouncer / Supabase transaction pooler: the external pooler already
+#           keeps server connections, so we do not pool on our side (NullPool).
+#   direct  Direct Postgres connection: small LIFO QueuePool, so idle extra
+#           connections age out, recycled before typical idle timeouts.
+#   legacy  The settings used before profiles existed (pre-ping on every checkout).
+#
+# Without pre-ping a connection that died while idle fails on its first statement.
+# SQLAlchemy then invalidates it and every older pooled connection; the request
+# gets a 503 with Retry-After and the retry uses a fresh connection. Where that 503
+# is not acceptable (e.g. a firewall that silently drops idle connections),
+# DB_POOL_PRE_PING=1 turns pre-ping back on for the direct profile.
+from flask import jsonify
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from config import (DB_POOL_PROFILE, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+                    DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_RETRY_AFTER)
+from utils.metrics import TimedQueuePool, TimedNullPool, registry
+
+POOL_PROFILES = {
+    "pooler": {
+        "poolclass": TimedNullPool,
+    },
+    "direct": {
+        "poolclass": TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_use_lifo": True,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    },
+    "legacy": {
+        "poolclass": TimedQueuePool,
+        "pool_pre_ping": True,
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_recycle": 3600,
+        "pool_timeout": 30,
+    },
+}
+
+def resolve_profile(url, profile=DB_POOL_PROFILE):
+    """Profile name for `url`; "auto" recognises transaction pooler URLs"""
+    if profile != "auto":
+        if profile not in POOL_PROFILES:
+            raise ValueError(f"Unknown DB_POOL_PROFILE '{profile}', expected one of {sorted(POOL_PROFILES)}")
+        return profile
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return "direct"
+    # Supabase's transaction pooler listens on 6543 at *.pooler.supabase.com
+    if url.port == 6543 or "pooler" in (url.host or "") or "pgbouncer" in str(url.query).lower():
+        return "pooler"
+    return "direct"
+
+
+def engine_options(url, profile=DB_POOL_PROFILE):
+    """create_engine() keyword arguments for the selected profile"""
+    return dict(POOL_PROFILES[resolve_profile(url, profile)])
+
+
+def install_disconnect_handling(engine):
+    """Count disconnects"""
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        if context.is_disconnect:
+            registry.inc("riise_db_disconnects_total", ())
+
+
+def init_disconnect_handler(app, reset_sessions):
+    """Turn dropped database connections into a retryable 503"""
+
+    @app.errorhandler(DBAPIError)
+    def _database_error(e):
+        if not e.connection_invalidated:
+            raise e
+        # This request's sessions still hold a transaction on the dead connection
+        reset_sessions()
+        response = jsonify({"error": "Database connection lost, please retry"})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(DB_RETRY_AFTER)
+        return response
@@ -0,0 +1,132 @@
+# utils/querycheck.py
+# Development/test helper that watches every SQL statement of a request and
+# warns about N+1 patterns (the same statement repeated many times), slow
+# queries and routes that exceed their query budget.
+# Enabled with QUERY_DEBUG=1; QUERY_BUDGET_STRICT=1 turns budget overruns into errors.
+import logging
+import os
+import re
+import time
+import traceback
+from contextlib import contextmanager
+from flask import g, request, has_request_context, current_app
+from sqlalchemy import event
+from config import QUERY_DEBUG, SLOW_QUERY_MS, N_PLUS_ONE_THRESHOLD, QUERY_BUDGET_STRICT
+
+logger = logging.getLogger("riise.queries")
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*,?)+\)", re.IGNORECASE)
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+# Collected statements of the active `count_queries()` blocks
+_active_counters = []
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def fingerprint(statement):
+    """Normalize a statement so repeated executions with other parameters compare equal"""
+    statement = _IN_LIST.sub("IN (...)", statement)
+    statement = _LITERALS.sub("?", statement)
+    return _SPACES.sub(" ", statement).strip()
+
+
+def _caller_location():
+    """First stack frame inside the backend code that is not this module"""
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if (filename.startswith(_BACKEND_DIR) and filename != _THIS_FILE
+                and os.sep + "site-packages" + os.sep not in filename):
+            return f"{os.path.relpath(filename, _BACKEND_DIR)}:{frame.lineno} in {frame.name}"
+    return "<unknown>"
+
+
+def query_budget(max_queries):
+    """
+    Declare how many SQL statements a route may issue (checked when QUERY_DEBUG is on).
+    The budget is read from the registered view function, so put it right below the
+    route decorator; decorators in between must use functools.wraps, which copies it.
+    """
+    def decorator(func):
+        func._query_budget = max_queries
+        return func
+    return decorator
+
+
+@contextmanager
+def count_queries():
+    """
+    Collect the statements executed inside the block, e.g. in a test:
+        with count_queries() as queries:
+            client.get("/api/v1/research/")
+        assert len(queries) <= 2
+    """
+    queries = []
+    _active_counters.append(queries)
+    try:
+        yield queries
+    finally:
+        _active_counters.remove(queries)
+
+
+def install_query_checker(engine):
+    """Attach the statement listeners to `engine`"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_querycheck_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["_querycheck_start"].pop()) * 1000
+        for queries in _active_counters:
+            queries.append(statement)
+
+        if elapsed_ms >= SLOW_QUERY_MS:
+            route = f"{request.method} {request.path}" if has_request_context() else "<no request>"
+            logger.warning("Slow query (%.0f ms) at %s [%s]: %s",
+                           elapsed_ms, _caller_location(), route, _SPACES.sub(" ", statement)[:500])
+
+        if not has_request_context():
+            return
+        log = g.setdefault("_query_log", {})
+        key = fingerprint(statement)
+        entry = log.get(key)
+        if entry is None:
+            log[key] = {"count": 1, "ms": elapsed_ms, "location": _caller_location()}
+        else:
+            entry["count"] += 1
+            entry["ms"] += elapsed_ms
+
+
+def init_query_checker(app, engine):
+    """Install the listeners and the per-request report (no-op unless QUERY_DEBUG is set)"""
+    if not QUERY_DEBUG:
+        return
+    install_query_checker(engine)
+
+    @app.after_request
+    def _report_queries(response):
+        log = g.pop("_query_log", None) or {}
+        route = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+
+        for statement, entry in log.items():
+            if entry["count"] >= N_PLUS_ONE_THRESHOLD:
+                logger.warning("Possible N+1: %d x (%.0f ms total) at %s [%s]: %s",
+                               entry["count"], entry["ms"], entry["location"], route, statement[:300])
+
+        view = current_app.view_functions.get(request.endpoint)
+        budget = getattr(view, "_query_budget", None)
+        total = sum(entry["count"] for entry in log.values())
+        response.headers["X-Query-Count"] = str(total)
+        if budget is not None and total > budget:
+            message = f"{route} issued {total} queries, budget is {budget}"
+            if QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,191 @@
+# utils/ratelimit.py
+# Admission control for expensive routes (SerpAPI lookups, PDF exports). Each route
+# class has a token bucket per user: `burst` requests at once, refilled at `per_minute`.
+# On top of that a class may only run `max_in_flight` requests at once per worker and
+# `max_in_flight_per_user` per user. A request over any limit is answered right away
+# with 429 and Retry-After instead of waiting for a busy worker. Buckets and per-user
+# counts live in Redis when REDIS_URL is set, so the limits hold across workers; the
+# per-worker cap always counts only this worker's requests.
+import math
+import threading
+import time
+from functools import wraps
+from flask import request, jsonify
+from config import (REDIS_URL, RATE_LIMIT_ENABLED,
+                    RATE_LIMIT_SCHOLAR_PER_MINUTE, RATE_LIMIT_SCHOLAR_BURST,
+                    RATE_LIMIT_EXPORT_PER_MINUTE, RATE_LIMIT_EXPORT_BURST,
+                    CONCURRENCY_LIMIT_SCHOLAR, CONCURRENCY_LIMIT_SCHOLAR_PER_USER,
+                    CONCURRENCY_LIMIT_EXPORT, CONCURRENCY_LIMIT_EXPORT_PER_USER)
+from utils.cache import LRUCache, register_cache
+from utils.metrics import registry
+
+try:
+    import redis
+except ImportError:  # Optional: only needed when REDIS_URL is configured
+    redis = None
+
+ROUTE_CLASSES = {
+    "scholar": {"per_minute": RATE_LIMIT_SCHOLAR_PER_MINUTE, "burst": RATE_LIMIT_SCHOLAR_BURST,
+                "max_in_flight": CONCURRENCY_LIMIT_SCHOLAR,
+                "max_in_flight_per_user": CONCURRENCY_LIMIT_SCHOLAR_PER_USER},
+    "export": {"per_minute": RATE_LIMIT_EXPORT_PER_MINUTE, "burst": RATE_LIMIT_EXPORT_BURST,
+               "max_in_flight": CONCURRENCY_LIMIT_EXPORT,
+               "max_in_flight_per_user": CONCURRENCY_LIMIT_EXPORT_PER_USER},
+}
+
+# Safety expiry of a shared in-flight count, in case a worker dies mid-request
+IN_FLIGHT_TTL = 300
+
+# Refill the bucket for the time since the last request, then take a token. Returns
+# the seconds to wait for the next token (0 when this request may go ahead).
+TOKEN_BUCKET_SCRIPT = """
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = math.min(burst, (tonumber(state[1]) or burst) + (now - (tonumber(state[2]) or now)) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class LocalLimiter:
+    """Token buckets and in-flight counts of this worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # A bucket left alone until it is full again is the same as a new one, so
+        # entries expire after the time a full refill takes
+        self._buckets = register_cache("rate_limit_buckets", LRUCache(ttl=3600, max_entries=100000))
+        self._in_flight = {}
+
+    def take(self, key, rate, burst):
+        with self._lock:
+            now = time.monotonic()
+            tokens, at = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - at) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets.set(key, (tokens, now), ttl=burst / rate)
+            return wait
+
+    def enter(self, key, limit):
+        """Count one more request under `key` unless `limit` are already running"""
+        with self._lock:
+            if self._in_flight.get(key, 0) >= limit:
+                return False
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+            return True
+
+    def leave(self, key):
+        with self._lock:
+            count = self._in_flight.get(key, 0) - 1
+            if count > 0:
+                self._in_flight[key] = count
+            else:
+                self._in_flight.pop(key, None)
+
+
+class RedisLimiter:
+    """Token buckets and per-user in-flight counts shared by all workers"""
+
+    def __init__(self, url, prefix="riise:rl:"):
+        if redis is None:
+            raise RuntimeError("REDIS_URL is set but the redis package is not installed")
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.prefix = prefix
+        self._take = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def take(self, key, rate, burst):
+        return float(self._take(keys=[self.prefix + key], args=[rate, burst]))
+
+    def enter(self, key, limit):
+        key = self.prefix + key
+        with self.client.pipeline() as pipe:
+            count, _ = pipe.incr(key).expire(key, IN_FLIGHT_TTL).execute()
+        if count > limit:
+            self.client.decr(key)
+            return False
+        return True
+
+    def leave(self, key):
+        self.client.decr(self.prefix + key)
+
+
+_local = LocalLimiter()
+_shared = RedisLimiter(REDIS_URL) if REDIS_URL else None
+
+# Recent duration (seconds) per route class, used as Retry-After when a cap is hit
+_durations = {}
+
+
+def _shared_or_local(method, *args):
+    """(result, limiter that gave it): Redis when configured and reachable, else this worker"""
+    if _shared is not None:
+        try:
+            return getattr(_shared, method)(*args), _shared
+        except redis.RedisError:
+            pass  # An unreachable Redis falls back to this worker's own limits
+    return getattr(_local, method)(*args), _local
+
+
+def _leave(limiter, key):
+    try:
+        limiter.leave(key)
+    except Exception:
+        pass  # A shared count left behind expires after IN_FLIGHT_TTL
+
+
+def _too_many(route_class, reason, retry_after):
+    registry.inc("riise_rate_limited_total", (("class", route_class), ("reason", reason)))
+    retry_after = max(1, math.ceil(retry_after))
+    response = jsonify({"error": "Too many requests, please retry later", "retry_after": retry_after})
+    response.headers["Retry-After"] = str(retry_after)
+    return response, 429
+
+
+def rate_limited(route_class):
+    """
+    Admit the request under the limits of `route_class` (see ROUTE_CLASSES) or answer
+    429. Goes below token_required, as the limits are per user.
+    """
+    limits = ROUTE_CLASSES[route_class]
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not RATE_LIMIT_ENABLED:
+                return f(*args, **kwargs)
+
+            user_key = f"{route_class}:{request.user['id']}"
+            wait, _ = _shared_or_local("take", user_key, limits["per_minute"] / 60, limits["burst"])
+            if wait > 0:
+                return _too_many(route_class, "rate", wait)
+
+            expected = _durations.get(route_class, 1.0)
+            if not _local.enter(route_class, limits["max_in_flight"]):
+                return _too_many(route_class, "worker_busy", expected)
+            try:
+                user_flight_key = f"{user_key}:in_flight"
+                # Leave on the limiter that admitted the request, even if Redis
+                # comes back or goes away in between
+                admitted, limiter = _shared_or_local("enter", user_flight_key, limits["max_in_flight_per_user"])
+                if not admitted:
+                    return _too_many(route_class, "user_busy", expected)
+                start = time.monotonic()
+                try:
+                    return f(*args, **kwargs)
+                finally:
+                    # Moving average, so Retry-After follows how long these requests take
+                    _durations[route_class] = 0.8 * expected + 0.2 * (time.monotonic() - start)
+                    _leave(limiter, user_flight_key)
+            finally:
+                _local.leave(route_class)
+        return decorated
+    return decorator
@@ -0,0 +1,108 @@
+# utils/replicas.py
+# Read-replica selection for database.RoutingSession.
+import random
+import threading
+import time
+from flask import request, g, has_request_context
+from sqlalchemy import text
+from config import REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_INTERVAL, READ_YOUR_WRITES_SECONDS
+
+# Cookie telling every worker to read from the primary for a while after a user's write
+PRIMARY_COOKIE = "read_primary_until"
+
+_PG_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaSet:
+    """Replica engines plus a periodically refreshed view of which ones are fresh enough"""
+
+    def __init__(self, engines):
+        self.engines = list(engines)
+        self.lag = {}  # engine url -> seconds behind the primary, None when unreachable
+        self._healthy = list(self.engines)
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def measure_lag(self, engine):
+        if engine.dialect.name != "postgresql":
+            return 0.0  # Local SQLite replicas used in tests are never behind
+        with engine.connect() as conn:
+            return float(conn.execute(_PG_LAG_QUERY).scalar() or 0)
+
+    def refresh(self):
+        healthy = []
+        for engine in self.engines:
+            try:
+                lag = self.measure_lag(engine)
+            except Exception:
+                lag = None
+            self.lag[str(engine.url)] = lag
+            if lag is not None and lag <= REPLICA_MAX_LAG_SECONDS:
+                healthy.append(engine)
+        self._healthy = healthy
+        self._checked_at = time.monotonic()
+
+    def healthy_engines(self):
+        if time.monotonic() - self._checked_at >= REPLICA_LAG_CHECK_INTERVAL:
+            # Only one thread refreshes; the others keep using the previous result
+            if self._lock.acquire(blocking=False):
+                try:
+                    self.refresh()
+                finally:
+                    self._lock.release()
+        return self._healthy
+
+    def choose(self):
+        """A replica engine that is within the allowed lag, or None"""
+        engines = self.healthy_engines()
+        return random.choice(engines) if engines else None
+
+    def for_request(self):
+        """Replica for the current request (chosen once per request), or None for the primary"""
+        if not request_prefers_replica():
+            return None
+        if "_db_replica" not in g:
+            g._db_replica = self.choose()
+        return g._db_replica
+
+
+def request_prefers_replica():
+    """Safe (GET/HEAD) requests go to a replica unless the client wrote recently"""
+    if not has_request_context() or request.method not in ("GET", "HEAD"):
+        return False
+    try:
+        primary_until = float(request.cookies.get(PRIMARY_COOKIE, 0))
+    except ValueError:
+        primary_until = 0
+    return primary_until < time.time()
+
+
+def mark_request_wrote():
+    """Called when a session commits writes; the response will pin reads to the primary"""
+    if has_request_context():
+        g._wrote_to_primary = True
+
+
+def init_replica_routing(app):
+    @app.after_request
+    def _set_primary_cookie(response):
+        if g.pop("_wrote_to_primary", False):
+            response.set_cookie(
+                key=PRIMARY_COOKIE,
+                value=str(time.time() + READ_YOUR_WRITES_SECONDS),
+                max_age=int(READ_YOUR_WRITES_SECONDS) + 1,
+                httponly=True,
+                secure=True,
+                samesite="None",
+                path='/'
+            )
+        return response
+
+
+def use_primary():
+    """Send the remaining reads of this request to the primary"""
+    if has_request_context():
+        g._db_replica = None
@@ -0,0 +1,126 @@
+# utils/response_cache.py
+# Cached GET responses for role-scoped endpoints. List scopes are stored under
+# "<scope>:admin" for admins (who see every record) or "<scope>:user:<id>" for
+# everyone else; per-user scopes (profile, dashboard) always under "<scope>:user:<id>".
+# invalidate_responses() drops them once a write commits and leaves a timestamped
+# "<key>:invalidated" marker, so a read that started before the write cannot put
+# the old data back. Admins' per-user views also show every record (the dashboard),
+# so they are checked against "<scope>:admin:invalidated" as well.
+# Invalidation only reaches other workers through the shared cache (REDIS_URL), which
+# is why the cache is off by default for several workers without it (see config.py).
+# Every cached response carries an ETag, so unchanged data is answered with 304.
+import hashlib
+import time
+from functools import wraps
+from flask import request, current_app, g, Response
+from config import (RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES, REDIS_URL,
+                    REPLICA_MAX_LAG_SECONDS)
+from utils.cache import LRUCache, RedisCache, register_cache
+
+response_cache = register_cache(
+    "responses",
+    RedisCache(REDIS_URL, RESPONSE_CACHE_TTL, prefix="riise:resp:") if REDIS_URL
+    else LRUCache(RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES)
+)
+
+# Scopes registered with cached_response(per_user=True)
+PER_USER_SCOPES = set()
+
+
+def response_cache_key(scope, user, per_user=False):
+    if user["role"] == "admin" and not per_user:
+        return f"{scope}:admin"
+    return f"{scope}:user:{user['id']}"
+
+
+def invalidate_responses(user_id, *scopes):
+    """Drop the cached responses of `scopes` that include records owned by `user_id`"""
+    keys, markers = [], []
+    # The dashboard combines all the other scopes
+    for scope in set(scopes) | {"dashboard"}:
+        keys.append(f"{scope}:user:{user_id}")
+        if scope not in PER_USER_SCOPES:
+            keys.append(f"{scope}:admin")
+        # Admins' per-user views are keyed by their own id and only see this marker
+        markers += [f"{scope}:user:{user_id}", f"{scope}:admin"]
+    response_cache.delete(*keys)
+    now = time.time()
+    for key in markers:
+        response_cache.set(f"{key}:invalidated", now, ttl=RESPONSE_CACHE_TTL + REPLICA_MAX_LAG_SECONDS)
+
+
+def _invalidated_at(scope, key, user, per_user):
+    """When the data behind `key` last changed, as far as the markers still know"""
+    markers = [f"{key}:invalidated"]
+    if per_user and user["role"] == "admin":
+        markers.append(f"{scope}:admin:invalidated")
+    return max((response_cache.get(marker) or 0 for marker in markers), default=0)
+
+
+def _response_from_entry(entry):
+    response = Response(entry["body"], status=entry["status"], mimetype=entry["mimetype"])
+    response.set_etag(entry["etag"])
+    return response
+
+
+def cached_response(scope, per_user=False):
+    """
+    Cache a GET view per role/user (apply below @token_required). Requests with
+    query parameters are passed through uncached. Views showing the current user's
+    own data (`per_user`) are cached per user for admins too.
+    """
+    if per_user:
+        PER_USER_SCOPES.add(scope)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not RESPONSE_CACHE_ENABLED or request.args:
+                return view(*args, **kwargs)
+
+            key = response_cache_key(scope, request.user, per_user)
+            entry = response_cache.get(key)
+            if entry is not None and entry.get("cached_at", 0) <= _invalidated_at(scope, key, request.user, per_user):
+                entry = None
+            if entry is not None:
+                response = _response_from_entry(entry)
+                response.headers["X-Cache"] = "HIT"
+            else:
+                started = time.time()
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+                body = response.get_data(as_text=True)
+                entry = {
+                    "body": body,
+                    "status": response.status_code,
+                    "mimetype": response.mimetype,
+                    "etag": hashlib.sha1(body.encode()).hexdigest(),
+                    "cached_at": started,
+                }
+                # Keep the response only if no write committed since the read began; a
+                # replica may also lag behind writes from up to REPLICA_MAX_LAG_SECONDS before
+                read_from = started - (REPLICA_MAX_LAG_SECONDS if g.get("_db_replica") else 0)
+                if _invalidated_at(scope, key, request.user, per_user) < read_from:
+                    response_cache.set(key, entry)
+                response = _response_from_entry(entry)
+                response.headers["X-Cache"] = "MISS"
+
+            # Browsers may keep the body but must revalidate it with If-None-Match
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def invalidates_responses(*scopes):
+    """Invalidate the current user's cached `scopes` after a successful write view"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code < 400:
+                invalidate_responses(request.user["id"], *scopes)
+            return response
+        return wrapper
+    return decorator
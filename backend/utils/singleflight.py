@@ -0,0 +1,136 @@
+# utils/singleflight.py
+# Request coalescing for slow upstream lookups such as SerpAPI author profiles. When
+# a shared scholar link brings many users at once, only the first request per key
+# (the leader) calls upstream; concurrent identical requests wait for its result.
+# Within a worker they wait on an event. Across workers the leader holds a lock in
+# Redis (REDIS_URL) and publishes the result in the shared cache, where the others
+# pick it up. Results are kept for COALESCE_RESULT_TTL, so a burst that outlasts one
+# lookup still makes a single upstream call. Failed lookups (None) are not kept.
+import threading
+import time
+import uuid
+from functools import wraps
+from config import REDIS_URL, COALESCE_RESULT_TTL, COALESCE_WAIT_SECONDS
+from utils.cache import LRUCache, RedisCache, register_cache
+from utils.metrics import registry
+
+try:
+    import redis
+except ImportError:  # Optional: only needed when REDIS_URL is configured
+    redis = None
+
+# How often a request waiting on another worker's lookup checks for the result
+POLL_INTERVAL = 0.05
+
+# Delete the lock only if this leader still owns it (it may have expired meanwhile)
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+return 0
+"""
+
+_results = register_cache(
+    "coalesced_results",
+    RedisCache(REDIS_URL, COALESCE_RESULT_TTL, prefix="riise:sf:") if REDIS_URL
+    else LRUCache(COALESCE_RESULT_TTL, max_entries=1024)
+)
+_redis = redis.Redis.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5) if REDIS_URL else None
+_release = _redis.register_script(RELEASE_SCRIPT) if _redis is not None else None
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _count(namespace, outcome):
+    registry.inc("riise_coalesced_calls_total", (("namespace", namespace), ("outcome", outcome)))
+
+
+def _wait_for_other_worker(key, lock_key):
+    """Result published by the worker holding `lock_key`, or None if it gave up or failed"""
+    deadline = time.monotonic() + COALESCE_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        result = _results.get(key)
+        if result is not None:
+            return result
+        if not _redis.exists(lock_key):
+            return _results.get(key)
+    return None
+
+
+def _lead(namespace, key, func, args):
+    """Run the upstream call for this worker, unless another worker already is"""
+    lock_key = f"riise:sf-lock:{key}"  # Outside the "riise:sf:" results keyspace
+    token = None
+    if _redis is not None:
+        try:
+            token = uuid.uuid4().hex
+            if not _redis.set(lock_key, token, nx=True, px=int(COALESCE_WAIT_SECONDS * 1000)):
+                token = None
+                result = _wait_for_other_worker(key, lock_key)
+                if result is not None:
+                    _count(namespace, "shared")
+                    return result
+        except redis.RedisError:
+            token = None  # Without the shared lock each worker simply makes its own call
+
+    try:
+        _count(namespace, "upstream")
+        result = func(*args)
+        if result is not None:
+            _results.set(key, result)
+        return result
+    finally:
+        if token is not None:
+            try:
+                _release(keys=[lock_key], args=[token])
+            except redis.RedisError:
+                pass  # The lock expires on its own
+
+
+def coalesced(namespace):
+    """
+    Share one call of the decorated function among concurrent and recent calls with
+    the same (string-convertible) arguments, in this worker and across workers.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            key = ":".join([namespace, *map(str, args)])
+            result = _results.get(key)
+            if result is not None:
+                _count(namespace, "cached")
+                return result
+
+            with _flights_lock:
+                flight = _flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _flights[key] = _Flight()
+
+            if not leader:
+                if flight.done.wait(COALESCE_WAIT_SECONDS):
+                    _count(namespace, "joined")
+                    if flight.error is not None:
+                        raise flight.error
+                    return flight.result
+                return func(*args)  # The leader is stuck; do not wait any longer
+
+            try:
+                flight.result = _lead(namespace, key, func, args)
+                return flight.result
+            except Exception as e:
+                flight.error = e
+                raise
+            finally:
+                with _flights_lock:
+                    _flights.pop(key, None)
+                flight.done.set()
+        return wrapper
+    return decorator
@@ -0,0 +1,120 @@
+# utils/stats.py
+# Maintains the RIISE.contribution_stats aggregate table (per user, per entity, per year counts)
+from datetime import datetime, timezone
+from sqlalchemy import select, delete, insert, func, extract, cast, literal, union_all, Integer, String, TIMESTAMP
+from database import upsert_insert
+from models.stats import ContributionStat, STAT_KEY
+from models.IPR import IPR
+from models.research import ResearchPaper
+from models.innovation import Innovation
+from models.startup import Startup
+
+# entity name -> (model, date column used to bucket records by year)
+STAT_SOURCES = {
+    "ipr": (IPR, IPR.filing_date),
+    "research": (ResearchPaper, ResearchPaper.publication_date),
+    "innovation": (Innovation, Innovation.submitted_on),
+    "startup": (Startup, Startup.founded_date),
+}
+
+STAT_COLUMNS = ["user_id", "entity", "year", "total", "refreshed_at"]
+
+
+def _grouped_counts(user_ids=None, refreshed_at=None):
+    """Build a single UNION ALL select of counts grouped by user, entity and year"""
+    selects = []
+    for entity, (model, date_col) in STAT_SOURCES.items():
+        year = cast(extract("year", date_col), Integer)
+        stmt = (
+            select(model.user_id, cast(literal(entity), String), year, func.count(),
+                   literal(refreshed_at, TIMESTAMP))
+            .where(model.user_id.isnot(None))
+            .group_by(model.user_id, year)
+        )
+        if user_ids is not None:
+            stmt = stmt.where(model.user_id.in_(user_ids))
+        selects.append(stmt)
+    return union_all(*selects)
+
+
+def refresh_user_stats(db, *user_ids):
+    """
+    Recompute the stats rows of the given users inside the caller's transaction.
+    Call it after making changes and before db.commit().
+    """
+    user_ids = [uid for uid in set(user_ids) if uid is not None]
+    if not user_ids:
+        return
+
+    db.flush()
+    # Upsert instead of delete-then-insert: concurrent refreshes of the same user
+    # meet on the unique (user, entity, year) index instead of both inserting
+    refreshed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    stmt = upsert_insert(ContributionStat).from_select(STAT_COLUMNS, _grouped_counts(user_ids, refreshed_at))
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=list(STAT_KEY),
+        set_={"total": stmt.excluded.total, "refreshed_at": stmt.excluded.refreshed_at},
+    ))
+    # Buckets that no longer have any records
+    db.execute(delete(ContributionStat).where(
+        ContributionStat.user_id.in_(user_ids), ContributionStat.refreshed_at < refreshed_at,
+    ))
+
+
+def refresh_all_stats(db):
+    """Rebuild the whole stats table (used by the scheduled refresh job)"""
+    db.execute(delete(ContributionStat))
+    refreshed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    db.execute(insert(ContributionStat).from_select(STAT_COLUMNS, _grouped_counts(refreshed_at=refreshed_at)))
+    db.commit()
+
+
+def get_entity_totals(db):
+    """Total records per entity, including records without an owner"""
+    rows = db.execute(union_all(*(
+        select(cast(literal(entity), String), func.count()).select_from(model)
+        for entity, (model, _) in STAT_SOURCES.items()
+    ))).all()
+    return {entity: total for entity, total in rows}
+
+
+def get_user_counts(db, user_id):
+    """Total records per entity for one user, e.g. {"ipr": 2, "research": 5, ...}"""
+    counts = {entity: 0 for entity in STAT_SOURCES}
+    rows = db.execute(
+        select(ContributionStat.entity, func.sum(ContributionStat.total))
+        .where(ContributionStat.user_id == user_id)
+        .group_by(ContributionStat.entity)
+    ).all()
+    for entity, total in rows:
+        counts[entity] = int(total or 0)
+    return counts
+
+
+def get_all_user_counts(db):
+    """Total records per entity for every user, keyed by user_id"""
+    counts = {}
+    rows = db.execute(
+        select(ContributionStat.user_id, ContributionStat.entity, func.sum(ContributionStat.total))
+        .group_by(ContributionStat.user_id, ContributionStat.entity)
+    ).all()
+    for user_id, entity, total in rows:
+        counts.setdefault(user_id, {e: 0 for e in STAT_SOURCES})[entity] = int(total or 0)
+    return counts
+
+
+def get_user_timeline(db, user_id, entities=None):
+    """Year by year counts for one user, e.g. {2023: {"ipr": 1, "research": 3, ...}}"""
+    entities = entities or list(STAT_SOURCES)
+    timeline = {}
+    rows = db.execute(
+        select(ContributionStat.year, ContributionStat.entity, ContributionStat.total)
+        .where(
+            ContributionStat.user_id == user_id,
+            ContributionStat.year.isnot(None),
+            ContributionStat.entity.in_(entities),
+        )
+    ).all()
+    for year, entity, total in rows:
+        timeline.setdefault(year, {e: 0 for e in entities})[entity] += total
+    return timeline
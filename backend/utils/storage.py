@@ -0,0 +1,174 @@
+# utils/storage.py
+# File storage for uploads such as ID cards. Clients upload straight to the bucket
+# with a short-lived signed URL, so the file never passes through a Flask worker;
+# the API only signs the URL and afterwards records the uploaded path.
+# STORAGE_BACKEND=supabase uses Supabase Storage. STORAGE_BACKEND=local keeps the
+# files in STORAGE_LOCAL_DIR and serves the signed uploads from routes/storage.py,
+# so the flow can be run and tested without Supabase.
+import hashlib
+import hmac
+import io
+import os
+import time
+from flask import url_for, has_request_context
+from werkzeug.security import safe_join
+from config import STORAGE_BACKEND, STORAGE_LOCAL_DIR, STORAGE_SIGNING_SECRET, UPLOAD_URL_TTL, ID_CARD_MAX_BYTES
+from database import supabase
+from utils.http import http
+from utils.metrics import track_external
+from utils.uploads import UploadRejected, copy_limited
+
+# Supabase signed upload URLs are valid for two hours
+SUPABASE_UPLOAD_URL_TTL = 7200
+# Lifetime of the signed URL open() streams a download from
+SUPABASE_DOWNLOAD_URL_TTL = 60
+
+# The buckets the app uses, with the largest object each accepts (like the file
+# size limit of a Supabase bucket)
+BUCKET_SIZE_LIMITS = {"id-card": ID_CARD_MAX_BYTES}
+
+
+def _path_from_url(bucket_name, url):
+    """Object path in `bucket_name` of a URL from public_url(), or None"""
+    marker = f"/{bucket_name}/"
+    if not url or marker not in url:
+        return None
+    return url.split(marker, 1)[1].split("?", 1)[0] or None
+
+
+class SupabaseBucket:
+    def __init__(self, name):
+        self.name = name
+        self.max_bytes = BUCKET_SIZE_LIMITS.get(name)
+
+    def _bucket(self):
+        return supabase.storage.from_(self.name)
+
+    def create_upload_url(self, path):
+        with track_external("supabase"):
+            signed = self._bucket().create_signed_upload_url(path)
+        return {"upload_url": signed["signed_url"], "method": "PUT", "expires_in": SUPABASE_UPLOAD_URL_TTL}
+
+    def exists(self, path):
+        with track_external("supabase"):
+            return self._bucket().exists(path)
+
+    def upload(self, path, file, content_type=None):
+        # The client only takes bytes or real files; bodies are size-limited by the caller
+        data = file if isinstance(file, bytes) else file.read()
+        with track_external("supabase"):
+            self._bucket().upload(path, data, {"content-type": content_type})
+
+    def open(self, path):
+        """Stream an object; refused with 413 up front when it is larger than the bucket allows"""
+        with track_external("supabase"):
+            signed = self._bucket().create_signed_url(path, SUPABASE_DOWNLOAD_URL_TTL)
+            response = http.get(signed["signedURL"], stream=True)
+        try:
+            response.raise_for_status()
+            if self.max_bytes is not None and int(response.headers.get("Content-Length") or 0) > self.max_bytes:
+                raise UploadRejected(f"File is larger than {self.max_bytes // (1024 * 1024)} MB", 413)
+        except Exception:
+            response.close()
+            raise
+        response.raw.decode_content = True
+        return response.raw
+
+    def remove(self, *paths):
+        with track_external("supabase"):
+            self._bucket().remove(list(paths))
+
+    def public_url(self, path):
+        url = self._bucket().get_public_url(path)
+        # Older storage clients return {"publicURL": ...}
+        return url.get("publicURL") if isinstance(url, dict) else url
+
+    def path_from_url(self, url):
+        return _path_from_url(self.name, url)
+
+
+class LocalBucket:
+    """A directory below STORAGE_LOCAL_DIR; uploads are PUT to a URL signed with HMAC"""
+
+    def __init__(self, name, root=STORAGE_LOCAL_DIR, secret=STORAGE_SIGNING_SECRET, ttl=UPLOAD_URL_TTL):
+        if not secret:
+            raise RuntimeError("STORAGE_BACKEND=local needs STORAGE_SIGNING_SECRET to sign upload URLs")
+        self.name = name
+        self.max_bytes = BUCKET_SIZE_LIMITS.get(name)
+        self.root = os.path.join(root, name)
+        self.secret = secret.encode()
+        self.ttl = ttl
+
+    def _signature(self, path, expires):
+        message = f"{self.name}/{path}:{expires}".encode()
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    def _file(self, path):
+        full_path = safe_join(self.root, path)
+        if full_path is None:
+            raise ValueError(f"Invalid storage path: {path}")
+        return full_path
+
+    def create_upload_url(self, path):
+        expires = int(time.time()) + self.ttl
+        url = url_for("storage.upload_object", bucket=self.name, path=path, expires=expires,
+                      signature=self._signature(path, expires), _external=True)
+        return {"upload_url": url, "method": "PUT", "expires_in": self.ttl}
+
+    def verify(self, path, expires, signature):
+        """True when `signature` was issued for this path and has not expired"""
+        try:
+            expires = int(expires)
+        except (TypeError, ValueError):
+            return False
+        return expires >= time.time() and hmac.compare_digest(self._signature(path, expires), signature or "")
+
+    def save(self, path, stream):
+        """Store a stream chunk by chunk; a body over the bucket's size limit is discarded"""
+        full_path = self._file(path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        try:
+            with open(full_path, "wb") as f:
+                copy_limited(stream, f, self.max_bytes)
+        except Exception:
+            os.remove(full_path)
+            raise
+
+    def exists(self, path):
+        try:
+            return os.path.isfile(self._file(path))
+        except ValueError:
+            return False
+
+    def upload(self, path, file, content_type=None):
+        self.save(path, io.BytesIO(file) if isinstance(file, bytes) else file)
+
+    def open(self, path):
+        return open(self._file(path), "rb")
+
+    def remove(self, *paths):
+        for path in paths:
+            try:
+                os.remove(self._file(path))
+            except (ValueError, FileNotFoundError):
+                pass
+
+    def public_url(self, path):
+        if not has_request_context():  # Scripts: no host to build an absolute URL from
+            return f"/api/v1/storage/{self.name}/{path}"
+        return url_for("storage.get_object", bucket=self.name, path=path, _external=True)
+
+    def path_from_url(self, url):
+        return _path_from_url(self.name, url)
+
+
+_buckets = {}
+
+
+def get_bucket(name):
+    """The bucket `name` of the configured STORAGE_BACKEND; KeyError for unknown buckets"""
+    if name not in BUCKET_SIZE_LIMITS:
+        raise KeyError(f"Unknown storage bucket: {name}")
+    if name not in _buckets:
+        _buckets[name] = LocalBucket(name) if STORAGE_BACKEND == "local" else SupabaseBucket(name)
+    return _buckets[name]
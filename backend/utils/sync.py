@@ -0,0 +1,64 @@
+# utils/sync.py
+# Incremental sync for the list endpoints. Deletes leave a tombstone row, so a
+# client that last synced at T can ask for `?updated_since=T` and receive the
+# records changed since then plus the ids deleted since then.
+from datetime import datetime, timedelta, timezone
+from flask import request, jsonify
+from sqlalchemy import select, func, insert
+from config import TOMBSTONE_RETENTION_DAYS
+from models.tombstone import Tombstone
+from utils.replicas import use_primary
+
+# Rows are matched from slightly before the client's timestamp: a transaction that
+# started before T but committed after the client synced is still picked up.
+# Clients upsert by id, so the overlap only causes harmless repeats. For the same
+# reason (updated_at is the transaction start time) full lists are not given a
+# Last-Modified: a row committed later could carry an older time; the ETag covers them.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def to_utc(value):
+    """Naive UTC datetime from a datetime or an ISO 8601 string (as stored in the DB)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def record_tombstones(db, entity, records):
+    """Remember deleted records as (record_id, user_id) pairs; flushed with the caller's commit"""
+    records = list(records)
+    if records:
+        db.execute(insert(Tombstone), [
+            {"entity": entity, "record_id": record_id, "user_id": user_id} for record_id, user_id in records
+        ])
+
+
+def delta_response(db, model, pk_column, entity, serialize, user):
+    """Response for `?updated_since=`: changed items, deleted ids and the time to sync from next"""
+    try:
+        since = to_utc(request.args["updated_since"])
+    except ValueError:
+        return jsonify({"error": "Invalid updated_since, expected an ISO 8601 timestamp"}), 400
+
+    # A replica may not have the latest writes; the delta must not skip them for good
+    use_primary()
+    server_time = to_utc(db.scalar(select(func.now())))
+    if since < server_time - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+        return jsonify({"error": "updated_since is older than the sync history, reload the full list"}), 410
+
+    cutoff = since - SYNC_OVERLAP
+    items = db.query(model).filter(model.updated_at > cutoff)
+    deleted = select(Tombstone.record_id).where(Tombstone.entity == entity, Tombstone.deleted_at > cutoff)
+    if user["role"] != "admin":
+        items = items.filter(model.user_id == user["id"])
+        deleted = deleted.where(Tombstone.user_id == user["id"])
+
+    return jsonify({
+        "items": [serialize(row) for row in items.order_by(pk_column).all()],
+        "deleted": sorted(set(db.scalars(deleted).all())),
+        "server_time": server_time.isoformat() + "Z",
+    })
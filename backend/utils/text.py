@@ -0,0 +1,15 @@
+# utils/text.py
+# Text normalization shared by author matching and duplicate detection
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Lowercase, strip accents and punctuation, collapse whitespace: "José  García-López" -> "jose garcia lopez" """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _NON_WORD.sub(" ", text.lower())
+    return _SPACES.sub(" ", text).strip()
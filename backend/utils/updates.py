@@ -0,0 +1,61 @@
+# utils/updates.py
+from datetime import datetime
+from flask import jsonify
+from sqlalchemy import update, select, func
+from config import REQUIRE_UPDATE_VERSION
+
+# Columns the server maintains; never taken from a client's update
+SERVER_OWNED_COLUMNS = {"user_id", "created_at", "updated_at"}
+
+
+def parse_version(value):
+    """Parse the `updated_at` a client last saw (ISO format, as returned by the list routes)"""
+    if value in (None, "", "None"):
+        return None
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+def update_owned_record(db, model, pk_column, record_id, values, user, expected_updated_at=None,
+                        not_found="Record not found"):
+    """
+    Update a record in a single round-trip:
+        UPDATE ... SET ..., updated_at = now()
+        WHERE pk = :id [AND user_id = :me] [AND updated_at = :expected]
+        RETURNING *
+    Non-admins can only touch their own rows. When `expected_updated_at` is given the
+    update only applies if nobody changed the row since (optimistic concurrency). The
+    check is opt-in: without a version the last write wins, unless REQUIRE_UPDATE_VERSION
+    is set, in which case the update is refused with 428. Server-owned columns (the
+    primary key, owner and timestamps) are never written.
+
+    Returns (row, None) on success or (None, error_response) otherwise. The extra
+    lookup to tell 404 / 403 / 409 apart only runs when the update matched nothing.
+    """
+    if expected_updated_at is None and REQUIRE_UPDATE_VERSION:
+        return None, (jsonify({"error": "updated_at of the version being edited is required"}), 428)
+    values = {k: v for k, v in values.items() if k not in SERVER_OWNED_COLUMNS and k != pk_column.key}
+
+    conditions = [pk_column == record_id]
+    if user["role"] != "admin":
+        conditions.append(model.user_id == user["id"])
+    if expected_updated_at is not None:
+        conditions.append(model.updated_at == expected_updated_at)
+
+    row = db.execute(
+        update(model)
+        .where(*conditions)
+        .values(**values, updated_at=func.now())
+        .returning(*model.__table__.columns)
+    ).first()
+    if row is not None:
+        return row, None
+
+    current = db.execute(select(model.user_id, model.updated_at).where(pk_column == record_id)).first()
+    if current is None:
+        return None, (jsonify({"error": not_found}), 404)
+    if user["role"] != "admin" and current.user_id != user["id"]:
+        return None, (jsonify({"error": "Unauthorized"}), 403)
+    return None, (jsonify({
+        "error": "Record was modified by someone else, reload and try again",
+        "updated_at": str(current.updated_at) if current.updated_at else None
+    }), 409)
@@ -0,0 +1,117 @@
+# utils/uploads.py
+# Validation and normalization of uploaded ID cards with bounded memory. The body
+# is copied in chunks into a spooled temporary file (kept on disk beyond 1 MB) and
+# refused as soon as it passes the size limit; the type is sniffed from the magic
+# bytes rather than trusted from the file name; images are re-encoded as JPEG no
+# larger than ID_CARD_MAX_DIMENSION, with a thumbnail for the admin review list.
+import io
+import tempfile
+import uuid
+from PIL import Image, ImageOps, UnidentifiedImageError
+from config import (ID_CARD_MAX_BYTES, ID_CARD_MAX_DIMENSION, ID_CARD_THUMB_DIMENSION, ID_CARD_JPEG_QUALITY,
+                    ID_CARD_MAX_PIXELS)
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_SIZE = 1024 * 1024
+
+MAGIC_NUMBERS = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"%PDF-", "application/pdf"),
+]
+
+
+class UploadRejected(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def copy_limited(src, dst, max_bytes):
+    """Copy in chunks, failing with 413 as soon as more than `max_bytes` have been read"""
+    total = 0
+    while True:
+        chunk = src.read(CHUNK_SIZE)
+        if not chunk:
+            return total
+        total += len(chunk)
+        if max_bytes is not None and total > max_bytes:
+            raise UploadRejected(f"File is larger than {max_bytes // (1024 * 1024)} MB", 413)
+        dst.write(chunk)
+
+
+def spool_upload(stream, max_bytes=ID_CARD_MAX_BYTES):
+    """Size-checked copy of `stream` in a spooled temporary file, rewound for reading"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    try:
+        copy_limited(stream, spooled, max_bytes)
+    except Exception:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return spooled
+
+
+def sniff_content_type(file):
+    head = file.read(16)
+    file.seek(0)
+    for magic, content_type in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return content_type
+    return None
+
+
+def _jpeg(image):
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=ID_CARD_JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def _open_rgb(file, size):
+    """Decode an image for output no larger than `size`, upright and in RGB"""
+    try:
+        with Image.open(file) as image:
+            # Only the header has been read so far: refuse huge PNGs before decoding them
+            if image.width * image.height > ID_CARD_MAX_PIXELS:
+                raise UploadRejected(f"Image is larger than {ID_CARD_MAX_PIXELS // 1_000_000} megapixels", 413)
+            # JPEGs are decoded at a reduced scale right away, so a 12 MP phone
+            # photo never needs its full-resolution bitmap in memory
+            image.draft("RGB", size)
+            image = ImageOps.exif_transpose(image).convert("RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise UploadRejected(f"Unreadable image: {e}", 415)
+    image.thumbnail(size)
+    return image
+
+
+def normalize_image(file):
+    """(JPEG bytes with at most ID_CARD_MAX_DIMENSION pixels per side, thumbnail JPEG bytes)"""
+    image = _open_rgb(file, (ID_CARD_MAX_DIMENSION, ID_CARD_MAX_DIMENSION))
+    thumbnail = image.copy()
+    thumbnail.thumbnail((ID_CARD_THUMB_DIMENSION, ID_CARD_THUMB_DIMENSION))
+    return _jpeg(image), _jpeg(thumbnail)
+
+
+def make_thumbnail(file):
+    """Thumbnail JPEG bytes of an image file"""
+    return _jpeg(_open_rgb(file, (ID_CARD_THUMB_DIMENSION, ID_CARD_THUMB_DIMENSION)))
+
+
+def store_id_card(bucket, user_id, file):
+    """
+    Validate and normalize an ID card and upload it (plus a thumbnail for images)
+    under the user's folder. Returns (file URL, thumbnail URL or None).
+    """
+    content_type = sniff_content_type(file)
+    if content_type is None:
+        raise UploadRejected("Invalid file type. Only JPEG, PNG and PDF files are allowed.", 415)
+
+    name = f"{user_id}/{uuid.uuid4().hex}"
+    if content_type == "application/pdf":
+        bucket.upload(f"{name}.pdf", file, content_type)
+        return bucket.public_url(f"{name}.pdf"), None
+
+    body, thumbnail = normalize_image(file)
+    bucket.upload(f"{name}.jpg", body, "image/jpeg")
+    bucket.upload(f"{name}.thumb.jpg", thumbnail, "image/jpeg")
+    return bucket.public_url(f"{name}.jpg"), bucket.public_url(f"{name}.thumb.jpg")
@@ -0,0 +1,55 @@
+# utils/verification.py
+# ID card verification queue. An upload puts the user in the "pending" state; admins
+# page through the queue in submission order (served by the partial index on pending
+# rows) and approve or reject users in batches, one UPDATE per decision in a single
+# transaction. The thumbnails shown in the queue are made once at upload time.
+from datetime import datetime, timezone
+from sqlalchemy import select, update, func, or_, and_
+from models.users import User
+from utils.auth import forget_users
+from utils.response_cache import invalidate_responses
+from utils.sync import to_utc
+
+
+def utcnow():
+    """Naive UTC now, set from Python so keyset cursors compare equal on every dialect"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def pending_page(db, limit, after=None):
+    """Up to `limit` pending users after the (submitted_at, user_id) cursor, and whether more follow"""
+    query = select(
+        User.user_id, User.name, User.email, User.id_card_url, User.id_card_thumb_url, User.id_card_submitted_at,
+    ).where(User.verification_status == "pending")
+    if after:
+        submitted_at, user_id = to_utc(str(after[0])), int(after[1])
+        query = query.where(or_(
+            User.id_card_submitted_at > submitted_at,
+            and_(User.id_card_submitted_at == submitted_at, User.user_id > user_id),
+        ))
+    rows = db.execute(query.order_by(User.id_card_submitted_at, User.user_id).limit(limit + 1)).all()
+    return rows[:limit], len(rows) > limit
+
+
+def pending_count(db):
+    return db.scalar(select(func.count()).select_from(User).where(User.verification_status == "pending"))
+
+
+def review(db, approve=(), reject=()):
+    """Approve and reject pending users in one transaction; users not pending are skipped"""
+    result = {"approved": [], "rejected": []}
+    for status, user_ids, verified in (("approved", approve, True), ("rejected", reject, False)):
+        if user_ids:
+            result[status] = db.scalars(
+                update(User)
+                .where(User.user_id.in_(user_ids), User.verification_status == "pending")
+                .values(verification_status=status, is_verified=verified)
+                .returning(User.user_id)
+            ).all()
+    db.commit()
+
+    reviewed = result["approved"] + result["rejected"]
+    forget_users(*reviewed)  # Cached sessions still carry the old is_verified
+    for user_id in reviewed:
+        invalidate_responses(user_id, "profile")
+    return result